@@ -3,11 +3,7 @@ set -euo pipefail
 
 source .venv/bin/activate
 
-python scripts/deploy_openapi.py demo-api
-
-python ./scripts/deploy_lambda.py status
-python ./scripts/deploy_lambda.py echo
-python ./scripts/deploy_lambda.py time
-python ./scripts/deploy_lambda.py seed-sales-data
+# Builds/publishes every Lambda referenced by the spec in parallel, then the spec
+python ./scripts/deploy_stack.py demo-api
 
 deactivate
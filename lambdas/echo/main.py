@@ -1,5 +1,11 @@
-def handler(event, context):
-    return {
-        "statusCode": 200,
-        "body": event.get("body", "{}")
+from datetime import datetime, timezone
+
+from openapi_runtime import endpoint
+
+
+@endpoint
+def handler(event, context, body):
+    return 200, {
+        "input": body,
+        "received_at": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
     }
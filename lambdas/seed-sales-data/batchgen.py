@@ -0,0 +1,304 @@
+"""
+Vectorized order generation for seed-sales-data.
+
+Draws a whole batch of orders (customers, vendors, timestamps, item counts,
+product picks, quantities, price drift, status rolls) as NumPy arrays and only
+drops into Python to assemble the final documents. The schema and the
+distributions match the original per-order loop in main.generate_orders.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from pools import ListPool
+
+# ============================================================
+# Distribution constants (mirroring the scalar implementation)
+# ============================================================
+MAX_LINE_ITEMS = 5
+MAX_QTY = 5
+PRODUCT_PICK_TRIES = 5
+PRICE_DRIFT = 0.05
+DAY_JITTER = (-10, 25)
+MIN_ORDERS_PER_DAY = 20
+
+PAYMENT_METHODS = ["visa", "mastercard", "amex", "paypal"]
+SALES_CHANNELS = ["web", "mobile", "phone", "store"]
+
+# status_roll in [1, 100]: >90 CANCELLED, >70 SHIPPED, >40 PAID, else NEW
+STATUS_THRESHOLDS = [90, 70, 40]
+STATUSES = ["CANCELLED", "SHIPPED", "PAID", "NEW"]
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Seeded runs cut each day into blocks of this many orders, each with its own
+# RNG stream. Changing it changes the generated data for a given seed.
+SEED_BLOCK_SIZE = 5000
+
+
+ORDER_ID_PREFIX = "SO-"
+
+
+def format_order_id(seq):
+    return f"{ORDER_ID_PREFIX}{str(seq).zfill(8)}"
+
+
+def parse_order_seq(order_id):
+    return int(order_id[len(ORDER_ID_PREFIX):])
+
+
+def day_rng(seed, day, stream):
+    """Independent generator for one (seed, calendar day, stream) triple."""
+    return np.random.default_rng([seed, day.toordinal(), stream])
+
+
+def seeded_day_counts(days, weekday_base, weekend_base, scale, seed):
+    """day_order_counts with each day's jitter drawn from that day's own stream."""
+    jitter = np.fromiter(
+        (day_rng(seed, d, 0).integers(DAY_JITTER[0], DAY_JITTER[1] + 1) for d in days),
+        dtype=np.int64,
+        count=len(days),
+    )
+    return _scaled_counts(days, weekday_base, weekend_base, scale, jitter)
+
+
+def _scaled_counts(days, weekday_base, weekend_base, scale, jitter):
+    weekend = np.fromiter((d.weekday() >= 5 for d in days), dtype=bool, count=len(days))
+    base = np.where(weekend, weekend_base, weekday_base)
+    counts = np.maximum(base + jitter, MIN_ORDERS_PER_DAY)
+    if scale != 1.0:
+        counts = np.maximum(np.rint(counts * scale), 1).astype(np.int64)
+    return counts
+
+
+class OrderBatchGenerator:
+    """
+    Pre-extracts the entity lists into arrays once, then generates orders in
+    batches. `customers` is either a list of customer docs or a pool (see
+    pools.py). `rng` is a numpy Generator; pass a seeded one for reproducible
+    output.
+    """
+
+    def __init__(self, customers, vendors, products, rng=None):
+        if not customers or not vendors or not products:
+            raise ValueError("Need customers, vendors, and products to generate orders.")
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.customers = customers if hasattr(customers, "draw") else ListPool.from_docs(customers)
+        self.vendor_ids = [v["vendor_id"] for v in vendors]
+        self.product_ids = [p["product_id"] for p in products]
+        self.product_prices = np.asarray([p["unit_price"] for p in products], dtype=np.float64)
+
+    # --------------------------------------------------------
+    # Volume
+    # --------------------------------------------------------
+    def day_order_counts(self, days, weekday_base, weekend_base, scale=1.0):
+        """
+        Number of orders for each day in `days` (list of day-start datetimes).
+        `scale` multiplies the whole per-day volume, jitter and floor included.
+        """
+        jitter = self.rng.integers(DAY_JITTER[0], DAY_JITTER[1] + 1, size=len(days))
+        return _scaled_counts(days, weekday_base, weekend_base, scale, jitter)
+
+    # --------------------------------------------------------
+    # Line items
+    # --------------------------------------------------------
+    def _pick_products(self, n_items, rng):
+        """
+        Product index per (order, slot), shape (n, MAX_LINE_ITEMS), -1 for unused
+        slots. Reproduces the scalar retry loop: up to PRODUCT_PICK_TRIES draws
+        per slot, keep the first product not already in the order, otherwise
+        keep the last draw.
+        """
+        n = len(n_items)
+        n_products = len(self.product_ids)
+        picks = np.full((n, MAX_LINE_ITEMS), -1, dtype=np.int64)
+
+        for slot in range(MAX_LINE_ITEMS):
+            active = np.flatnonzero(n_items > slot)
+            if active.size == 0:
+                break
+            cand = rng.integers(0, n_products, size=(active.size, PRODUCT_PICK_TRIES))
+            if slot == 0:
+                picks[active, 0] = cand[:, 0]
+                continue
+            prev = picks[active, :slot]
+            dup = (cand[:, :, None] == prev[:, None, :]).any(axis=2)
+            fresh = ~dup
+            first_fresh = np.where(fresh.any(axis=1), fresh.argmax(axis=1), PRODUCT_PICK_TRIES - 1)
+            picks[active, slot] = cand[np.arange(active.size), first_fresh]
+
+        return picks
+
+    # --------------------------------------------------------
+    # Batch generation
+    # --------------------------------------------------------
+    def generate(self, day_starts, first_seq, rng=None, min_offsets=None):
+        """
+        Generate one order per entry of `day_starts` (datetime64[us] array of
+        day starts). Each order lands at a random second within 24h of its day
+        start, or no earlier than `min_offsets` seconds into it when given.
+        Order ids run from `first_seq` in array order.
+        """
+        rng = rng if rng is not None else self.rng
+        n = len(day_starts)
+        if n == 0:
+            return []
+
+        cust_ids, cust_addrs = self.customers.draw(n, rng)
+        vend_idx = rng.integers(0, len(self.vendor_ids), size=n)
+        if min_offsets is None:
+            offsets = rng.integers(0, SECONDS_PER_DAY, size=n)
+        else:
+            offsets = rng.integers(min_offsets, SECONDS_PER_DAY)
+        offsets = offsets.astype("timedelta64[s]")
+        order_dates = (day_starts + offsets).tolist()
+
+        n_items = rng.integers(1, MAX_LINE_ITEMS + 1, size=n)
+        picks = self._pick_products(n_items, rng)
+        slot_mask = picks >= 0
+        item_prod = picks[slot_mask]  # row-major: grouped by order
+        m = item_prod.size
+
+        qty = rng.integers(1, MAX_QTY + 1, size=m)
+        drift = np.round(rng.random(m) * (2 * PRICE_DRIFT) - PRICE_DRIFT, 4)
+        unit_price = self.product_prices[item_prod] * (1 + drift)
+        extended = qty * unit_price
+
+        order_of_item = np.repeat(np.arange(n), n_items)
+        totals = np.round(np.bincount(order_of_item, weights=extended, minlength=n), 2)
+
+        rolls = rng.integers(1, 101, size=n)
+        status_idx = np.select(
+            [rolls > t for t in STATUS_THRESHOLDS],
+            list(range(len(STATUS_THRESHOLDS))),
+            default=len(STATUS_THRESHOLDS),
+        )
+        pay_idx = rng.integers(0, len(PAYMENT_METHODS), size=n)
+        chan_idx = rng.integers(0, len(SALES_CHANNELS), size=n)
+
+        return self._build_docs(
+            first_seq,
+            cust_ids,
+            cust_addrs,
+            vend_idx.tolist(),
+            order_dates,
+            n_items.tolist(),
+            item_prod.tolist(),
+            qty.tolist(),
+            np.round(unit_price, 2).tolist(),
+            np.round(extended, 2).tolist(),
+            totals.tolist(),
+            status_idx.tolist(),
+            pay_idx.tolist(),
+            chan_idx.tolist(),
+        )
+
+    def _build_docs(
+        self,
+        first_seq,
+        cust_ids,
+        cust_addrs,
+        vend_idx,
+        order_dates,
+        n_items,
+        item_prod,
+        qty,
+        unit_price,
+        extended,
+        totals,
+        status_idx,
+        pay_idx,
+        chan_idx,
+    ):
+        vendor_ids = self.vendor_ids
+        product_ids = self.product_ids
+
+        docs = []
+        pos = 0
+        for i, count in enumerate(n_items):
+            end = pos + count
+            line_items = [
+                {
+                    "product_id": product_ids[item_prod[j]],
+                    "quantity": qty[j],
+                    "unit_price": unit_price[j],
+                    "extended_price": extended[j],
+                }
+                for j in range(pos, end)
+            ]
+            pos = end
+
+            addr = cust_addrs[i]
+            order_date = order_dates[i]
+            docs.append(
+                {
+                    "order_id": format_order_id(first_seq + i),
+                    "customer_id": cust_ids[i],
+                    "vendor_id": vendor_ids[vend_idx[i]],
+                    "order_date": order_date,
+                    "status": STATUSES[status_idx[i]],
+                    "line_items": line_items,
+                    "order_total": totals[i],
+                    "currency": "USD",
+                    "payment_method": PAYMENT_METHODS[pay_idx[i]],
+                    "sales_channel": SALES_CHANNELS[chan_idx[i]],
+                    "shipping_address": addr,
+                    "billing_address": addr,
+                    "created_at": order_date,
+                    "updated_at": order_date,
+                }
+            )
+        return docs
+
+    def generate_day(self, day, count, first_seq):
+        """Generate `count` orders on `day` (a day-start datetime)."""
+        day_starts = np.full(count, np.datetime64(day, "us"))
+        return self.generate(day_starts, first_seq)
+
+    def generate_days(self, days, counts, first_seq):
+        """Generate all orders for several days in one vectorized batch."""
+        day_starts = np.repeat(np.asarray(days, dtype="datetime64[us]"), counts)
+        return self.generate(day_starts, first_seq)
+
+    def iter_chunks(self, days, counts, first_seq, chunk_size, first_day_from=0):
+        """
+        Stream the orders for `days` in chunks of at most `chunk_size` docs.
+        Chunks cut across day boundaries, so memory is bounded by the chunk
+        size rather than by the busiest day. Orders on the first day land no
+        earlier than `first_day_from` seconds into it (the rest of a day that
+        already has orders).
+        """
+        day_starts = np.asarray(days, dtype="datetime64[us]")
+        ends = np.cumsum(counts)
+        total = int(ends[-1]) if len(ends) else 0
+
+        for lo in range(0, total, chunk_size):
+            hi = min(lo + chunk_size, total)
+            day_idx = np.searchsorted(ends, np.arange(lo, hi), side="right")
+            min_offsets = np.where(day_idx == 0, first_day_from, 0) if first_day_from else None
+            yield self.generate(day_starts[day_idx], first_seq + lo, min_offsets=min_offsets)
+
+    def iter_seeded(self, days, counts, first_seq, seed, block_size=SEED_BLOCK_SIZE):
+        """
+        Deterministic counterpart of iter_chunks. Each day is cut into blocks
+        of `block_size` orders and every block draws from its own stream keyed
+        by (seed, calendar day, block), so the output for a day depends only
+        on the seed, the customer pool and the day's first order sequence,
+        never on which other days are generated alongside it.
+        """
+        seq = first_seq
+        for day, count in zip(days, counts):
+            start = np.datetime64(day, "us")
+            count = int(count)
+            for block, lo in enumerate(range(0, count, block_size)):
+                n = min(block_size, count - lo)
+                yield self.generate(np.full(n, start), seq, rng=day_rng(seed, day, block + 1))
+                seq += n
+
+
+def day_range(start, days_back):
+    """Day-start datetimes for `days_back` consecutive days from `start`."""
+    return [start + timedelta(days=d) for d in range(days_back)]
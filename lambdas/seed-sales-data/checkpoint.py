@@ -0,0 +1,84 @@
+"""
+Progress tracking for resumable seed runs.
+
+Each run is one document in the `seed_runs` collection, keyed by its
+continuation token. It holds the run's resolved options (including the seed,
+so resumed days regenerate exactly), the current phase, the next day index
+and order sequence to generate, and running totals. The handler saves it at
+every checkpoint and when it stops ahead of the Lambda deadline; the next
+invocation with the same token picks up from there.
+
+Phases run in order:
+  - reference  reference data sync and synthetic customers
+  - orders     day-by-day order generation
+  - finalize   order indexes, staging swap, optional snapshot
+  - done
+"""
+
+import uuid
+from datetime import datetime
+
+RUNS_COLLECTION = "seed_runs"
+PHASES = ("reference", "orders", "finalize", "done")
+
+
+class RunNotFound(Exception):
+    pass
+
+
+class Deadline:
+    """
+    Wraps a Lambda context's remaining-time clock. Without a context (local
+    runs) the deadline is never near.
+    """
+
+    def __init__(self, context, margin_ms):
+        self._remaining = getattr(context, "get_remaining_time_in_millis", None)
+        self.margin_ms = margin_ms
+
+    def remaining_ms(self):
+        return self._remaining() if self._remaining is not None else None
+
+    def near(self):
+        remaining = self.remaining_ms()
+        return remaining is not None and remaining < self.margin_ms
+
+
+def start_run(db, options, run_id=None, now=None):
+    now = now or datetime.utcnow()
+    run = {
+        "_id": run_id or uuid.uuid4().hex,
+        "status": "running",
+        "phase": PHASES[0],
+        "options": options,
+        "next_day": 0,
+        "next_seq": 1,
+        "orders_written": 0,
+        "invocations": 1,
+        "started_at": now,
+        "updated_at": now,
+    }
+    db[RUNS_COLLECTION].insert_one(run)
+    return run
+
+
+def find_run(db, run_id):
+    return db[RUNS_COLLECTION].find_one({"_id": run_id})
+
+
+def load_run(db, token, now=None):
+    """Fetch the run for a continuation token and count this invocation."""
+    run = find_run(db, token)
+    if run is None:
+        raise RunNotFound(f"No seed run for continuation token {token!r}")
+    if run["status"] != "complete":
+        run["invocations"] += 1
+        save_run(db, run, now=now, status="running")
+    return run
+
+
+def save_run(db, run, now=None, **changes):
+    run.update(changes)
+    run["updated_at"] = now or datetime.utcnow()
+    db[RUNS_COLLECTION].replace_one({"_id": run["_id"]}, run)
+    return run
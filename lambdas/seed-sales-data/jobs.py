@@ -0,0 +1,126 @@
+"""
+Seed jobs behind the HTTP API.
+
+POST/GET /seed-sales-data records a job in the `seed_jobs` collection and
+returns 202 right away; the seed itself runs out-of-band (see
+main.dispatch_job). The worker updates the job after every invocation with
+its status, the accumulated per-phase metrics and, once finished, the
+result. A checkpointed job shares its id with its `seed_runs` document, so
+GET /seed-sales-data/jobs/{job_id} can report live progress while it runs.
+
+Job statuses: queued -> running -> succeeded | failed
+"""
+
+import uuid
+from datetime import datetime
+
+JOBS_COLLECTION = "seed_jobs"
+
+# Options a caller may set through the API; everything else (sinks, output
+# paths, snapshots) stays with whoever configures the function.
+JOB_OPTIONS = (
+    "mode",
+    "scale_factor",
+    "days_back",
+    "chunk_size",
+    "seed",
+    "start_date",
+    "workers",
+    "mongo_profile",
+)
+
+FINISHED = ("succeeded", "failed")
+
+
+def job_request(params):
+    return {k: params[k] for k in JOB_OPTIONS if params.get(k) is not None}
+
+
+def create_job(db, request, now=None):
+    now = now or datetime.utcnow()
+    job = {
+        "_id": uuid.uuid4().hex,
+        "status": "queued",
+        "request": request,
+        "invocations": 0,
+        "phases": {},
+        "created_at": now,
+        "updated_at": now,
+    }
+    db[JOBS_COLLECTION].insert_one(job)
+    return job
+
+
+def get_job(db, job_id):
+    return db[JOBS_COLLECTION].find_one({"_id": job_id})
+
+
+def mark_running(db, job_id, now=None):
+    now = now or datetime.utcnow()
+    db[JOBS_COLLECTION].update_one(
+        {"_id": job_id, "status": "queued"},
+        {"$set": {"status": "running", "started_at": now, "updated_at": now}},
+    )
+
+
+def merge_phases(total, summary):
+    """Add one invocation's metrics summary (numeric totals only) into `total`."""
+    for phase, values in summary.items():
+        entry = total.setdefault(phase, {})
+        for metric, value in values.items():
+            if isinstance(value, (int, float)):
+                entry[metric] = round(entry.get(metric, 0) + value, 3)
+    return total
+
+
+def record_invocation(db, job_id, result, now=None):
+    """
+    Fold one worker invocation's result into the job. An "incomplete" result
+    keeps the job running; anything else finishes it.
+    """
+    now = now or datetime.utcnow()
+    job = get_job(db, job_id)
+    if job is None:
+        return None
+
+    update = {
+        "phases": merge_phases(job.get("phases") or {}, result.get("metrics") or {}),
+        "invocations": job.get("invocations", 0) + 1,
+        "updated_at": now,
+    }
+    if result.get("status") == "incomplete":
+        update["status"] = "running"
+        update["progress"] = result.get("progress")
+    else:
+        update["status"] = "succeeded" if result.get("status") == "ok" else "failed"
+        update["finished_at"] = now
+        update["result"] = {k: v for k, v in result.items() if k != "metrics"}
+
+    db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": update})
+    job.update(update)
+    return job
+
+
+def job_view(job, run=None):
+    """The job as returned by the status endpoint; `run` adds live progress."""
+    view = {
+        "job_id": job["_id"],
+        "status": job["status"],
+        "request": job.get("request", {}),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "invocations": job.get("invocations", 0),
+        "progress": job.get("progress"),
+        "phases": job.get("phases", {}),
+    }
+    if run is not None and job["status"] not in FINISHED:
+        view["progress"] = {
+            "phase": run["phase"],
+            "days_done": run["next_day"],
+            "days_total": run["options"]["n_days"],
+            "orders_written": run["orders_written"],
+        }
+    if "result" in job:
+        view["result"] = job["result"]
+    return view
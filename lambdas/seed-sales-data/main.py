@@ -1,21 +1,38 @@
 import os
 import json
 import random
+import base64
 import logging
+import threading
+import time
+import importlib.util
 from datetime import datetime, timedelta
 
 import boto3
+import numpy as np
 from botocore.exceptions import ClientError
-from pymongo import MongoClient, UpdateOne
+import pymongo
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.errors import BulkWriteError
+
+import metrics
+from batchgen import SECONDS_PER_DAY, OrderBatchGenerator, day_range, format_order_id, parse_order_seq, seeded_day_counts
+from checkpoint import Deadline, RunNotFound, find_run, load_run, save_run, start_run
+from jobs import create_job, get_job, job_request, job_view, mark_running, record_invocation
+from pools import load_customer_pool
+from refsync import SyncSpec, forget_hashes, sync_collection
+from shards import FANOUTS, merge_stats, run_in_lambdas, run_in_processes, split_days
+from sinks import SinkError, check_sink, open_sink
+from snapshot import SnapshotError, restore_snapshot, write_snapshot
+from ssm_runtime import InvalidRuntimeValue, ParameterNotFound, default_resolver, runtime_param
+from writer import PipelinedWriter
 
 # ============================================================
-# Logging / AWS clients
+# Logging
 # ============================================================
 log = logging.getLogger()
 log.setLevel(logging.INFO)
 
-ssm = boto3.client("ssm")
-
 # ============================================================
 # Constants (mirroring the Node.js script)
 # ============================================================
@@ -24,6 +41,62 @@ WEEKDAY_BASE_ORDERS = 80
 WEEKEND_BASE_ORDERS = 40
 EXTRA_SYNTHETIC_CUSTOMERS = 200
 
+# Synthetic customers occupy a fixed ID range right after the baseline
+# customers (C100001-C100005), generated in chunks with a per-chunk seed.
+SYNTHETIC_CUSTOMER_START = 6
+SYNTHETIC_CUSTOMER_SEED = 100000
+CUSTOMER_CHUNK_SIZE = 10000
+SYNTHETIC_CITIES = ["Chicago", "New York", "Los Angeles", "Dallas"]
+SYNTHETIC_STATES = ["IL", "NY", "CA", "TX"]
+LOYALTY_LEVELS = ["bronze", "silver", "gold", "platinum"]
+
+# Volume knobs (overridable per run via event or env, see scale_options).
+# Scale factor 1.0 reproduces the constants above; order volume and synthetic
+# customers scale linearly with it.
+SCALE_FACTOR = 1.0
+ORDER_CHUNK_SIZE = 5000
+# Above this many customers, order generation samples customers per chunk
+# instead of holding a compact in-memory pool.
+CUSTOMER_POOL_MAX = 1_000_000
+
+# Order insert pipeline (overridable per run via event or env, see writer_options)
+WRITER_THREADS = 4
+WRITER_QUEUE_DEPTH = 8
+WRITER_BATCH_SIZE = 1000
+WRITER_TARGET_BATCH_MS = 250
+
+# "full" wipes and regenerates DAYS_BACK days in place; "rebuild" regenerates
+# them into an unindexed staging collection, indexes it once and swaps it in;
+# "incremental" appends only the days since the newest existing order;
+# "restore" skips generation and reloads a snapshot (see snapshot.py).
+SEED_MODES = ("full", "rebuild", "incremental", "restore")
+
+# Local directory or s3://bucket/prefix. Generating modes write a snapshot
+# there after seeding; "restore" reads it back.
+SNAPSHOT_URI = None
+
+# Where generated orders go: "mongo" (default) or a file sink from sinks.py,
+# written under OUTPUT_DIR. Reference data is always synced to Mongo.
+SINK = "mongo"
+OUTPUT_DIR = "/tmp/seed-sales-data"
+
+ORDERS_STAGING = "orders_staging"
+ORDER_INDEXES = [
+    IndexModel([("order_id", ASCENDING)], unique=True),
+    IndexModel([("customer_id", ASCENDING), ("order_date", DESCENDING)]),
+    IndexModel([("line_items.product_id", ASCENDING), ("order_date", DESCENDING)]),
+]
+
+# Resumable runs (see checkpoint.py): progress is saved at most every
+# CHECKPOINT_INTERVAL_S, and a run stops once less than DEADLINE_MARGIN_MS of
+# the Lambda's time remains.
+CHECKPOINT_INTERVAL_S = 30
+DEADLINE_MARGIN_MS = 60_000
+
+# Connection profiles for get_mongo (see mongo_client_options)
+MONGO_PROFILES = ("default", "bulk")
+MONGO_WARM_TIMEOUT_S = 2  # bounds the init ping well inside Lambda's 10s init phase
+
 DB_NAME = "sales"
 
 
@@ -34,36 +107,130 @@ class ConfigError(Exception):
 # ============================================================
 # Helpers
 # ============================================================
-def rand_choice(arr):
-    return random.choice(arr)
-
-
 def rand_int(min_v, max_v):
     return random.randint(min_v, max_v)
 
 
-def rand_float(min_v, max_v, decimals=2):
-    v = random.random() * (max_v - min_v) + min_v
-    return round(v, decimals)
+def format_sync(stats):
+    return ", ".join(f"{v} {k}" for k, v in stats.items())
 
 
-def make_date_in_day(day):
-    """Given a datetime at midnight, add random hour/min/sec."""
-    return day + timedelta(
-        hours=rand_int(0, 23),
-        minutes=rand_int(0, 59),
-        seconds=rand_int(0, 59),
-    )
+def sync_writes(stats):
+    """Documents written according to one or more sync_collection results."""
+    if "inserted" in stats:
+        return {"Documents": stats["inserted"] + stats["updated"]}
+    return {"Documents": sum(s["inserted"] + s["updated"] for s in stats.values())}
+
+
+def get_setting(event, key, default, cast=int):
+    """Event key wins, then env var KEY (upper-cased), then the default."""
+    value = (event or {}).get(key)
+    if value is None:
+        value = os.environ.get(key.upper())
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError) as e:
+        raise ConfigError(f"Invalid value for {key}: {value!r}") from e
+
+
+def scale_options(event):
+    scale = get_setting(event, "scale_factor", SCALE_FACTOR, float)
+    days_back = get_setting(event, "days_back", DAYS_BACK)
+    chunk_size = get_setting(event, "chunk_size", ORDER_CHUNK_SIZE)
+    if scale <= 0 or days_back <= 0 or chunk_size <= 0:
+        raise ConfigError("scale_factor, days_back and chunk_size must be positive")
+    return {
+        "scale": scale,
+        "days_back": days_back,
+        "chunk_size": chunk_size,
+        "synthetic_customers": int(round(EXTRA_SYNTHETIC_CUSTOMERS * scale)),
+        "customer_pool_max": get_setting(event, "customer_pool_max", CUSTOMER_POOL_MAX),
+    }
+
+
+def seed_mode(event):
+    mode = get_setting(event, "mode", "full", str)
+    if mode not in SEED_MODES:
+        raise ConfigError(f"mode must be one of {', '.join(SEED_MODES)}, got {mode!r}")
+    return mode
+
+
+def sink_options(event, mode):
+    sink = get_setting(event, "sink", SINK, str)
+    try:
+        check_sink(sink)
+    except SinkError as e:
+        raise ConfigError(str(e)) from e
+    if sink != "mongo" and mode == "incremental":
+        raise ConfigError("incremental mode needs the mongo sink (it appends after existing orders)")
+    return {"sink": sink, "output_dir": get_setting(event, "output_dir", OUTPUT_DIR, str)}
+
+
+def snapshot_uri(event, mode, sink):
+    uri = get_setting(event, "snapshot_uri", SNAPSHOT_URI, str)
+    if mode == "restore" and not uri:
+        raise ConfigError("restore mode needs snapshot_uri")
+    if uri and sink != "mongo":
+        raise ConfigError("snapshots are taken from Mongo and need the mongo sink")
+    return uri
+
+
+def shard_options(event, mode, sink):
+    seed = get_setting(event, "seed", None)
+    workers = get_setting(event, "workers", 1)
+    start_date = get_setting(event, "start_date", None, datetime.fromisoformat)
+    in_lambda = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+    fanout = get_setting(event, "fanout", "lambda" if in_lambda else "process", str)
+
+    if workers < 1:
+        raise ConfigError("workers must be at least 1")
+    if fanout not in FANOUTS:
+        raise ConfigError(f"fanout must be one of {', '.join(FANOUTS)}, got {fanout!r}")
+    if seed is None and (workers > 1 or start_date is not None):
+        # Shards only line up on a shared seed; it is returned with the
+        # stats so the run can be repeated.
+        seed = random.randrange(2**31)
+    if seed is not None and mode == "incremental":
+        raise ConfigError("seeded runs regenerate whole day ranges; use full or rebuild mode")
+    if workers > 1 and fanout == "lambda" and sink != "mongo":
+        raise ConfigError("lambda fan-out writes through Mongo; file sinks need fanout=process")
+    return {"seed": seed, "start_date": start_date, "workers": workers, "fanout": fanout}
+
+
+def checkpoint_options(event, mode, workers):
+    token = get_setting(event, "continuation_token", None, str)
+    # Opt-in with {"checkpoint": 1}; on by default only for API jobs, which
+    # dispatch their own continuations
+    is_job = bool((event or {}).get("job_id"))
+    default = int(is_job and workers == 1 and mode in ("full", "rebuild"))
+    enabled = bool(token) or bool(get_setting(event, "checkpoint", default))
+    if enabled and not token and (workers > 1 or mode not in ("full", "rebuild")):
+        raise ConfigError("checkpointed runs need workers=1 and full or rebuild mode")
+    return {
+        "token": token,
+        "enabled": enabled,
+        "margin_ms": get_setting(event, "deadline_margin_ms", DEADLINE_MARGIN_MS),
+    }
+
+
+def writer_options(event):
+    return {
+        "writers": get_setting(event, "writer_threads", WRITER_THREADS),
+        "queue_depth": get_setting(event, "writer_queue_depth", WRITER_QUEUE_DEPTH),
+        "batch_size": get_setting(event, "writer_batch_size", WRITER_BATCH_SIZE),
+        "target_batch_ms": get_setting(event, "writer_target_batch_ms", WRITER_TARGET_BATCH_MS),
+    }
 
 
 # ============================================================
 # Source / Mongo resolution (generic)
 # ============================================================
-_SOURCE_RUNTIME_CACHE = None
-_MONGO_CLIENT = None
-_DB = None
+_MONGO_CACHE = {}  # profile, or (profile, writers) for a resized bulk pool -> (MongoClient, Database)
 
 
+@metrics.instrument("load_source_runtime")
 def load_source_runtime():
     """
     Resolve a generic source runtime description from SSM.
@@ -80,54 +247,85 @@ def load_source_runtime():
     For clickhouse, we expect the JSON to include either:
       - "mongo_rs_uri" (preferred), or
       - "mongo_uri"
-    """
-    global _SOURCE_RUNTIME_CACHE
-    if _SOURCE_RUNTIME_CACHE is not None:
-        return _SOURCE_RUNTIME_CACHE
 
+    Lookups go through the shared resolver, so the value is cached for
+    IAC_RUNTIME_TTL seconds and the SSM client is only created on a miss.
+    """
     src_nickname = os.environ.get("SRC_NICKNAME")
     if not src_nickname:
         raise ConfigError("SRC_NICKNAME environment variable is required")
 
     src_type = os.environ.get("SRC_TYPE", "clickhouse")
-    iac_prefix = os.environ.get("IAC_PREFIX", "/iac")
-
-    param_name = os.environ.get(
-        "SRC_RUNTIME_PARAM",
-        f"{iac_prefix}/{src_type}/{src_nickname}/runtime",
-    )
-
-    log.info("Resolving source runtime from SSM param %s", param_name)
+    param_name = os.environ.get("SRC_RUNTIME_PARAM") or runtime_param(src_type, src_nickname)
 
     try:
-        resp = ssm.get_parameter(Name=param_name, WithDecryption=True)
-    except ClientError as e:
+        return default_resolver().get(param_name)
+    except InvalidRuntimeValue as e:
+        log.error("Invalid JSON in SSM param %s: %s", param_name, e, exc_info=True)
+        raise ConfigError(f"Invalid source runtime JSON at {param_name}") from e
+    except (ClientError, ParameterNotFound) as e:
         log.error("Failed to read SSM param %s: %s", param_name, e, exc_info=True)
         raise ConfigError(f"Unable to load source runtime from {param_name}") from e
 
-    try:
-        value = json.loads(resp["Parameter"]["Value"])
-    except (KeyError, json.JSONDecodeError) as e:
-        log.error("Invalid JSON in SSM param %s: %s", param_name, e, exc_info=True)
-        raise ConfigError(f"Invalid source runtime JSON at {param_name}") from e
 
-    _SOURCE_RUNTIME_CACHE = value
-    return value
+def wire_compressors():
+    """zstd/snappy when their modules are installed, zlib (stdlib) always."""
+    names = [
+        name
+        for name, module in (("zstd", "zstandard"), ("snappy", "snappy"))
+        if importlib.util.find_spec(module) is not None
+    ]
+    return ",".join(names + ["zlib"])
 
 
-def get_mongo():
+def mongo_client_options(profile, writers=None):
     """
-    Build and cache a MongoClient + DB.
+    MongoClient keyword options for a connection profile.
+
+    "default" is a plain client. "bulk" is tuned for seed runs: wire
+    compression (the server picks the first it also supports), a pool sized
+    to the writer threads and kept warm, w=1 without waiting for the journal,
+    and retryable writes so a failover mid-load doesn't fail the run.
+    `writers` is the run's writer thread count (default: env/WRITER_THREADS).
+    """
+    if profile == "default":
+        return {}
+    if profile == "bulk":
+        writers = writers or get_setting(None, "writer_threads", WRITER_THREADS)
+        return {
+            "compressors": wire_compressors(),
+            "zlibCompressionLevel": 1,
+            "maxPoolSize": writers + 2,
+            "minPoolSize": writers,
+            "w": 1,
+            "journal": False,
+            "retryWrites": True,
+        }
+    raise ConfigError(f"mongo_profile must be one of {', '.join(MONGO_PROFILES)}, got {profile!r}")
+
+
+@metrics.instrument("get_mongo")
+def get_mongo(profile=None, writers=None):
+    """
+    Build and cache a MongoClient + DB per connection profile.
 
     Resolution order:
       1. If MONGO_URI env is set, use it directly.
       2. Otherwise:
          - Resolve source runtime via SRC_NICKNAME/SRC_TYPE/IAC_PREFIX
          - For src_type == "clickhouse", expect mongo_rs_uri or mongo_uri.
+
+    `profile` defaults to env MONGO_PROFILE, then "default". `writers` is
+    the run's writer thread count; a bulk run that overrides it gets its own
+    client with a pool sized to match.
     """
-    global _MONGO_CLIENT, _DB
-    if _MONGO_CLIENT is not None and _DB is not None:
-        return _MONGO_CLIENT, _DB
+    profile = profile or os.environ.get("MONGO_PROFILE", "default")
+    if profile != "bulk" or writers == get_setting(None, "writer_threads", WRITER_THREADS):
+        writers = None
+    key = (profile, writers) if writers else profile
+    if key in _MONGO_CACHE:
+        return _MONGO_CACHE[key]
+    options = mongo_client_options(profile, writers)
 
     mongo_uri = os.environ.get("MONGO_URI")
     if mongo_uri:
@@ -147,19 +345,38 @@ def get_mongo():
             raise ConfigError(f"Unsupported SRC_TYPE for Mongo resolution: {src_type}")
 
     db_name = os.environ.get("DB_NAME", DB_NAME)
-    log.info("Connecting to MongoDB: uri=%s db=%s", mongo_uri, db_name)
+    log.info("Connecting to MongoDB: uri=%s db=%s profile=%s", mongo_uri, db_name, profile)
 
-    client = MongoClient(mongo_uri)
+    client = MongoClient(mongo_uri, **options)
     db = client[db_name]
 
-    _MONGO_CLIENT = client
-    _DB = db
+    _MONGO_CACHE[key] = (client, db)
     return client, db
 
 
+def warm_mongo():
+    """
+    Connect during Lambda init so the first invocation skips server
+    discovery and, for the bulk profile, starts with minPoolSize sockets.
+    The ping gives up after MONGO_WARM_TIMEOUT_S (server selection
+    included); failures are logged and retried lazily by the handler.
+    """
+    if os.environ.get("MONGO_WARM_ON_INIT", "1") != "1":
+        return
+    if not (os.environ.get("MONGO_URI") or os.environ.get("SRC_NICKNAME")):
+        return
+    try:
+        client, _ = get_mongo()
+        with pymongo.timeout(MONGO_WARM_TIMEOUT_S):
+            client.admin.command("ping")
+    except Exception as e:
+        log.warning("Mongo warm-up during init failed: %s", e)
+
+
 # ============================================================
 # Seed functions
 # ============================================================
+@metrics.instrument("ensure_base_customers", measure=sync_writes)
 def ensure_base_customers(db):
     coll = db.customers
     print("[seed] Ensuring baseline customers...")
@@ -277,33 +494,25 @@ def ensure_base_customers(db):
         },
     ]
 
-    now = datetime.utcnow()
-    ops = []
-    for c in base_customers:
-        c.setdefault("created_at", now)
-        c["updated_at"] = now
-        ops.append(
-            UpdateOne(
-                {"customer_id": c["customer_id"]},
-                {"$set": c},
-                upsert=True,
-            )
-        )
-
-    coll.bulk_write(ops)
-    print("[seed] Baseline customers upserted.")
+    stats = sync_collection(db, SyncSpec(coll.name, ("customer_id",), base_customers))
+    print(f"[seed] Baseline customers synced: {format_sync(stats)}")
+    return stats
 
 
-def add_synthetic_customers(db, extra_count):
-    coll = db.customers
-    base_count = coll.count_documents({})
-    print(f"[seed] Adding ~{extra_count} synthetic customers (current count: {base_count})...")
+def synthetic_customer_docs(lo, hi, now):
+    """
+    Customers numbered [lo, hi). Attributes are drawn from an RNG seeded by
+    the range start, so a range always regenerates identically.
+    """
+    rng = np.random.default_rng([SYNTHETIC_CUSTOMER_SEED, lo])
+    n_docs = hi - lo
+    cities = rng.integers(0, len(SYNTHETIC_CITIES), size=n_docs).tolist()
+    states = rng.integers(0, len(SYNTHETIC_STATES), size=n_docs).tolist()
+    levels = rng.integers(0, len(LOYALTY_LEVELS), size=n_docs).tolist()
+    opt_in = (rng.integers(0, 101, size=n_docs) < 60).tolist()
 
     docs = []
-    now = datetime.utcnow()
-
-    for i in range(extra_count):
-        n = base_count + i + 1
+    for i, n in enumerate(range(lo, hi)):
         docs.append(
             {
                 "customer_id": f"C{100000 + n}",
@@ -316,26 +525,71 @@ def add_synthetic_customers(db, extra_count):
                         "address_id": f"ADDR-{n}",
                         "type": "shipping",
                         "line1": f"{100 + (n % 900)} Demo St",
-                        "city": rand_choice(["Chicago", "New York", "Los Angeles", "Dallas"]),
-                        "state": rand_choice(["IL", "NY", "CA", "TX"]),
+                        "city": SYNTHETIC_CITIES[cities[i]],
+                        "state": SYNTHETIC_STATES[states[i]],
                         "postal_code": "60601",
                         "country": "US",
                         "is_default": True,
                     }
                 ],
                 "status": "active",
-                "loyalty_level": rand_choice(["bronze", "silver", "gold", "platinum"]),
-                "marketing_opt_in": rand_int(0, 100) < 60,
+                "loyalty_level": LOYALTY_LEVELS[levels[i]],
+                "marketing_opt_in": opt_in[i],
                 "created_at": now,
                 "updated_at": now,
             }
         )
+    return docs
+
 
-    if docs:
-        coll.insert_many(docs)
-        print(f"[seed] Inserted {len(docs)} synthetic customers.")
+@metrics.instrument("add_synthetic_customers", measure=lambda n: {"Documents": n})
+def add_synthetic_customers(db, extra_count, chunk_size=CUSTOMER_CHUNK_SIZE):
+    """
+    Ensure synthetic customers SYNTHETIC_CUSTOMER_START .. +extra_count exist.
+
+    IDs are allocated from a fixed range rather than from a collection count,
+    and the range is walked in chunks: chunks already fully present are
+    skipped with one indexed count, so re-runs are cheap and the customer
+    count stays stable.
+    """
+    coll = db.customers
+    coll.create_index([("customer_id", ASCENDING)], unique=True)
+
+    first = SYNTHETIC_CUSTOMER_START
+    last = first + extra_count
+    print(f"[seed] Ensuring {extra_count} synthetic customers (C{100000 + first}..C{100000 + last - 1})...")
+
+    now = datetime.utcnow()
+    inserted = 0
+    for lo in range(first, last, chunk_size):
+        hi = min(lo + chunk_size, last)
+        ids = [f"C{100000 + n}" for n in range(lo, hi)]
+
+        present = coll.count_documents({"customer_id": {"$in": ids}})
+        if present == len(ids):
+            continue
+
+        docs = synthetic_customer_docs(lo, hi, now)
+        if present:
+            existing = {
+                d["customer_id"]
+                for d in coll.find({"customer_id": {"$in": ids}}, {"_id": 0, "customer_id": 1})
+            }
+            docs = [d for d in docs if d["customer_id"] not in existing]
 
+        try:
+            coll.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Another run filled part of the range concurrently; duplicates are fine
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        inserted += len(docs)
 
+    print(f"[seed] Inserted {inserted} synthetic customers.")
+    return inserted
+
+
+@metrics.instrument("ensure_vendors", measure=sync_writes)
 def ensure_vendors(db):
     coll = db.vendors
     print("[seed] Ensuring vendors...")
@@ -364,23 +618,12 @@ def ensure_vendors(db):
         },
     ]
 
-    now = datetime.utcnow()
-    ops = []
-    for v in vendors:
-        v.setdefault("created_at", now)
-        v["updated_at"] = now
-        ops.append(
-            UpdateOne(
-                {"vendor_id": v["vendor_id"]},
-                {"$set": v},
-                upsert=True,
-            )
-        )
-
-    coll.bulk_write(ops)
-    print("[seed] Vendors upserted.")
+    stats = sync_collection(db, SyncSpec(coll.name, ("vendor_id",), vendors))
+    print(f"[seed] Vendors synced: {format_sync(stats)}")
+    return stats
 
 
+@metrics.instrument("ensure_products_and_inventory", measure=sync_writes)
 def ensure_products_and_inventory(db):
     products = db.products
     inventory = db.inventory
@@ -424,156 +667,493 @@ def ensure_products_and_inventory(db):
         },
     ]
 
-    now = datetime.utcnow()
-    ops = []
-
-    for p in product_docs:
-        p.setdefault("created_at", now)
-        p["updated_at"] = now
-        ops.append(
-            UpdateOne(
-                {"product_id": p["product_id"]},
-                {"$set": p},
-                upsert=True,
-            )
-        )
-
-        # Inventory row
-        inv_key = {"product_id": p["product_id"], "location_id": "WH-CHI-01"}
-        inv_doc = {
+    # Stock levels are only randomized when an inventory row is first created
+    inventory_docs = [
+        {
             "product_id": p["product_id"],
             "location_id": "WH-CHI-01",
             "on_hand": rand_int(100, 500),
             "on_order": rand_int(0, 100),
             "safety_stock": 50,
-            "updated_at": now,
         }
-        inventory.update_one(inv_key, {"$set": inv_doc}, upsert=True)
+        for p in product_docs
+    ]
 
-    products.bulk_write(ops)
-    print("[seed] Products + inventory upserted.")
+    stats = {
+        "products": sync_collection(db, SyncSpec(products.name, ("product_id",), product_docs)),
+        "inventory": sync_collection(
+            db,
+            SyncSpec(
+                inventory.name,
+                ("product_id", "location_id"),
+                inventory_docs,
+                insert_only=("on_hand", "on_order"),
+            ),
+        ),
+    }
+    print(
+        f"[seed] Products synced: {format_sync(stats['products'])}; "
+        f"inventory synced: {format_sync(stats['inventory'])}"
+    )
+    return stats
 
 
-def generate_orders(db):
-    orders = db.orders
-    customers = list(db.customers.find({"status": "active"}))
-    vendors = list(db.vendors.find({"status": "active"}))
-    products = list(db.products.find({}))
+def order_watermark(orders):
+    """
+    Return (max order_date, highest SO- sequence), or (None, 0) if empty.
+
+    There is no standalone order_date index; the max is found by walking the
+    (customer_id, order_date) index: $sort + $group/$first on the index prefix
+    runs as a DISTINCT_SCAN, touching one key per customer instead of every
+    order.
+    """
+    latest = list(
+        orders.aggregate(
+            [
+                {"$sort": {"customer_id": 1, "order_date": -1}},
+                {"$group": {"_id": "$customer_id", "last": {"$first": "$order_date"}}},
+                {"$group": {"_id": None, "max_order_date": {"$max": "$last"}}},
+            ]
+        )
+    )
+    if not latest or latest[0]["max_order_date"] is None:
+        return None, 0
+
+    # order_id is zero-padded, so the unique order_id index sorts it numerically
+    top = orders.find_one({}, {"_id": 0, "order_id": 1}, sort=[("order_id", -1)])
+    return latest[0]["max_order_date"], parse_order_seq(top["order_id"])
 
-    if not customers or not vendors or not products:
+
+def load_order_generator(db, sample_size, customer_pool_max, deterministic=False):
+    # Sorted so every worker of a seeded run indexes the same entity lists
+    vendors = list(db.vendors.find({"status": "active"}, {"_id": 0, "vendor_id": 1}).sort("vendor_id", ASCENDING))
+    products = list(
+        db.products.find({}, {"_id": 0, "product_id": 1, "unit_price": 1}).sort("product_id", ASCENDING)
+    )
+
+    if db.customers.find_one({"status": "active"}, {"_id": 1}) is None or not vendors or not products:
         raise Exception("Need customers, vendors, and products before generating orders.")
 
-    print("[seed] Clearing existing orders...")
-    orders.delete_many({})
+    customers = load_customer_pool(
+        db.customers, customer_pool_max, sample_size=sample_size, deterministic=deterministic
+    )
+    print(f"[seed] Customer pool: {type(customers).__name__}")
+    return OrderBatchGenerator(customers, vendors, products)
 
+
+def open_order_writer(db, target, sink, output_dir, writer_opts=None, part=None):
+    """PipelinedWriter into collection `target`, or a file sink when target is None."""
+    if target is None:
+        return open_sink(sink, output_dir, part=part)
+    return PipelinedWriter(db[target], **(writer_opts or {}))
+
+
+def prepare_order_target(db, mode, sink, output_dir):
+    """
+    Clear (full) or stage (rebuild) the orders target for a full-range run.
+    Returns the collection name to write into, or None for file sinks.
+    """
+    if sink != "mongo":
+        print(f"[seed] Writing orders to {sink} files in {output_dir}...")
+        return None
+    if mode == "rebuild":
+        # Readers keep seeing the old orders until the swap at the end
+        print(f"[seed] Rebuilding orders into {ORDERS_STAGING}...")
+        db[ORDERS_STAGING].drop()
+        return ORDERS_STAGING
+    print("[seed] Clearing existing orders...")
+    db.orders.delete_many({})
+    return db.orders.name
+
+
+def finalize_orders(db, target):
+    """Build the order indexes and swap a staging collection into place."""
+    # A no-op when the indexes already exist; a single build on staging
+    coll = db[target]
+    coll.create_indexes(ORDER_INDEXES)
+    if target != db.orders.name:
+        print(f"[seed] Swapping {target} in as {db.orders.name}...")
+        coll.rename(db.orders.name, dropTarget=True)
+
+
+def midnight(ts):
+    """Start of the calendar day (UTC) containing `ts`."""
+    return datetime.combine(ts.date(), datetime.min.time())
+
+
+def seeded_start(now, days_back):
+    """Midnight UTC `days_back` days ago, so every worker agrees on the calendar days."""
+    return midnight(now) - timedelta(days=days_back)
+
+
+@metrics.instrument("generate_orders", measure=lambda r: {"Documents": r["docs"], "Bytes": r["bytes"]})
+def generate_orders(
+    db,
+    writer_opts=None,
+    scale=1.0,
+    days_back=DAYS_BACK,
+    chunk_size=ORDER_CHUNK_SIZE,
+    mode="full",
+    customer_pool_max=CUSTOMER_POOL_MAX,
+    sink=SINK,
+    output_dir=OUTPUT_DIR,
+    seed=None,
+    start_date=None,
+    workers=1,
+    fanout="process",
+    mongo_profile=None,
+):
+    orders = db.orders
     now = datetime.utcnow()
-    start_date = now - timedelta(days=DAYS_BACK)
 
-    global_order_seq = 1
-    total_orders = 0
+    # File sinks always write the full range into fresh files
+    watermark = None
+    if sink == "mongo" and mode == "incremental":
+        watermark, last_seq = order_watermark(orders)
+        if watermark is None:
+            print("[seed] No existing orders; falling back to a full rebuild.")
+
+    first_day_from = 0
+    if watermark is not None:
+        # Calendar days, so weekday/weekend volume lines up with full runs:
+        # the rest of the watermark's day, then every whole day up to (not
+        # including) today, so the run never produces orders in the future.
+        target_name = orders.name
+        start_date = midnight(watermark)
+        n_days = (midnight(now) - start_date).days
+        first_day_from = int((watermark - start_date).total_seconds()) + 1
+        first_seq = last_seq + 1
+        print(
+            f"[seed] Appending {n_days} calendar days from {start_date.date()} "
+            f"after watermark {watermark.isoformat()} (next SO {first_seq})..."
+        )
+    else:
+        target_name = prepare_order_target(db, mode, sink, output_dir)
+        if seed is not None:
+            start_date = start_date or seeded_start(now, days_back)
+        else:
+            start_date = now - timedelta(days=days_back)
+        n_days = days_back
+        first_seq = 1
+
+    days = day_range(start_date, n_days)
+
+    if seed is not None:
+        counts = seeded_day_counts(days, WEEKDAY_BASE_ORDERS, WEEKEND_BASE_ORDERS, scale, seed)
+        ranges = split_days(counts, workers)
+        print(
+            f"[seed] Generating {int(counts.sum())} orders over {n_days} days from {start_date.date()} "
+            f"(scale factor {scale}, seed {seed}, {len(ranges)} shards via {fanout})..."
+        )
+        shards = [
+            {
+                "index": i,
+                "days": [lo, hi],
+                "seed": seed,
+                "start_date": start_date.isoformat(),
+                "n_days": n_days,
+                "first_seq": first_seq,
+                "scale": scale,
+                "customer_pool_max": customer_pool_max,
+                "target": target_name,
+                "sink": sink,
+                "output_dir": output_dir,
+                "part": i if len(ranges) > 1 else None,
+                "writer": writer_opts or {},
+                "mongo_profile": mongo_profile,
+            }
+            for i, (lo, hi) in enumerate(ranges)
+        ]
+        if len(shards) == 1:
+            results = [generate_shard(db, shards[0])]
+        elif fanout == "lambda":
+            results = run_in_lambdas(
+                os.environ["AWS_LAMBDA_FUNCTION_NAME"],
+                shards,
+                lambda shard: {"shard": shard, "mongo_profile": shard["mongo_profile"]},
+            )
+        else:
+            results = run_in_processes(shard_worker, shards, workers)
+        stats = merge_stats(results)
+        stats["seed"] = seed
+        stats["start_date"] = start_date.isoformat()
+    else:
+        gen = load_order_generator(db, chunk_size, customer_pool_max)
+        counts = gen.day_order_counts(days, WEEKDAY_BASE_ORDERS, WEEKEND_BASE_ORDERS, scale)
+        if first_day_from and len(counts):
+            # Only the part of the first day after the watermark is left to fill
+            remaining = max(0, SECONDS_PER_DAY - first_day_from)
+            counts[0] = round(counts[0] * remaining / SECONDS_PER_DAY)
+
+        print(
+            f"[seed] Generating {int(counts.sum())} orders over {n_days} days "
+            f"(scale factor {scale}, chunk size {chunk_size})..."
+        )
 
-    for d in range(DAYS_BACK):
-        day = start_date + timedelta(days=d)
-        day_str = day.strftime("%Y-%m-%d")
-        dow = day.weekday()  # 0=Mon
+        writer = open_order_writer(db, target_name, sink, output_dir, writer_opts)
+        try:
+            for chunk in gen.iter_chunks(days, counts, first_seq, chunk_size, first_day_from):
+                writer.submit(chunk)
+        finally:
+            stats = writer.close()
 
-        base = WEEKDAY_BASE_ORDERS if dow < 5 else WEEKEND_BASE_ORDERS
-        base += rand_int(-10, 25)
-        if base < 20:
-            base = 20
+    total_orders = stats["docs"]
 
-        print(f"[seed] Generating ~{base} orders for {day_str}...")
+    if target_name is None:
+        print(f"[seed] Wrote {total_orders} orders and {stats['line_items']} line items:")
+        for path in stats["files"]:
+            print(f"[seed]   {path}")
+        print(f"[seed] Sink: {stats['bytes']} bytes, {stats['docs_per_s']} docs/s")
+        print("[seed] Orders generation complete.")
+        return stats
 
-        day_docs = []
-        for _ in range(base):
-            customer = rand_choice(customers)
-            vendor = rand_choice(vendors)
-            order_date = make_date_in_day(day)
+    finalize_orders(db, target_name)
 
-            # line items
-            used = set()
-            line_items = []
-            order_total = 0
-            n_items = rand_int(1, 5)
+    print(f"[seed] Inserted total orders: {total_orders}")
+    if "shards" in stats:
+        print(f"[seed] Shards: {stats['shards']} in {stats['wall_s']}s, {stats['docs_per_s']} docs/s")
+    else:
+        print(
+            f"[seed] Writer: {stats['batches']} batches on {stats['writers']} threads, "
+            f"{stats['docs_per_s']} docs/s, batch p50={stats['batch_ms_p50']}ms "
+            f"p95={stats['batch_ms_p95']}ms max={stats['batch_ms_max']}ms"
+        )
+    print("[seed] Orders generation complete.")
+    return stats
 
-            for _ in range(n_items):
-                for _ in range(5):
-                    product = rand_choice(products)
-                    if product["product_id"] not in used:
-                        break
-                used.add(product["product_id"])
 
-                qty = rand_int(1, 5)
-                unit_price = product["unit_price"] * (1 + rand_float(-0.05, 0.05, 4))
-                extended = qty * unit_price
+# ============================================================
+# Sharded generation (see shards.py)
+# ============================================================
+def generate_shard(db, shard):
+    """Generate one shard's day range; returns its writer or sink summary."""
+    seed = shard["seed"]
+    days = day_range(datetime.fromisoformat(shard["start_date"]), shard["n_days"])
+    counts = seeded_day_counts(days, WEEKDAY_BASE_ORDERS, WEEKEND_BASE_ORDERS, shard["scale"], seed)
+    lo, hi = shard["days"]
+    first_seq = shard["first_seq"] + int(counts[:lo].sum())
+
+    pool_max = shard.get("customer_pool_max", CUSTOMER_POOL_MAX)
+    gen = load_order_generator(db, ORDER_CHUNK_SIZE, pool_max, deterministic=True)
+    writer = open_order_writer(
+        db, shard["target"], shard["sink"], shard["output_dir"], shard["writer"], part=shard["part"]
+    )
+    try:
+        for chunk in gen.iter_seeded(days[lo:hi], counts[lo:hi], first_seq, seed):
+            writer.submit(chunk)
+    finally:
+        stats = writer.close()
 
-                order_total += extended
+    stats.update({"shard": shard["index"], "days": [lo, hi], "first_seq": first_seq})
+    return stats
 
-                line_items.append(
-                    {
-                        "product_id": product["product_id"],
-                        "quantity": qty,
-                        "unit_price": round(unit_price, 2),
-                        "extended_price": round(extended, 2),
-                    }
-                )
 
-            order_total = round(order_total, 2)
-            order_id = f"SO-{str(global_order_seq).zfill(8)}"
-            global_order_seq += 1
-
-            addr = (customer.get("addresses") or [{}])[0]
-
-            status_roll = rand_int(1, 100)
-            if status_roll > 90:
-                status = "CANCELLED"
-            elif status_roll > 70:
-                status = "SHIPPED"
-            elif status_roll > 40:
-                status = "PAID"
-            else:
-                status = "NEW"
-
-            doc = {
-                "order_id": order_id,
-                "customer_id": customer["customer_id"],
-                "vendor_id": vendor["vendor_id"],
-                "order_date": order_date,
-                "status": status,
-                "line_items": line_items,
-                "order_total": order_total,
-                "currency": "USD",
-                "payment_method": rand_choice(["visa", "mastercard", "amex", "paypal"]),
-                "sales_channel": rand_choice(["web", "mobile", "phone", "store"]),
-                "shipping_address": addr,
-                "billing_address": addr,
-                "created_at": order_date,
-                "updated_at": order_date,
-            }
+def shard_worker(shard):
+    """Process-pool entry point; each worker process opens its own client."""
+    _MONGO_CACHE.clear()
+    _, db = get_mongo(shard["mongo_profile"], shard["writer"].get("writers"))
+    return generate_shard(db, shard)
 
-            day_docs.append(doc)
 
-        if day_docs:
-            orders.insert_many(day_docs)
-            total_orders += len(day_docs)
+# ============================================================
+# Resumable runs (see checkpoint.py)
+# ============================================================
+@metrics.instrument("generate_orders", measure=lambda r: {"Documents": r["docs"], "Bytes": r["bytes"]})
+def resume_orders(db, run, deadline, writer_opts=None):
+    """
+    Generate the run's remaining days in order, checkpointing at day
+    boundaries, and stop early once the deadline is near.
+    """
+    opts = run["options"]
+    seed = opts["seed"]
+    days = day_range(opts["start_date"], opts["n_days"])
+    counts = seeded_day_counts(days, WEEKDAY_BASE_ORDERS, WEEKEND_BASE_ORDERS, opts["scale"], seed)
+    day, seq = run["next_day"], run["next_seq"]
+    target = run["target"]
+
+    if target is not None:
+        # An invocation that died after its last checkpoint may have left
+        # some later orders behind; they are regenerated identically below.
+        stale = db[target].delete_many({"order_id": {"$gte": format_order_id(seq)}}).deleted_count
+        if stale:
+            print(f"[seed] Removed {stale} orders written after the last checkpoint.")
+
+    # Deterministic so the days regenerated after a restart match the deleted ones
+    gen = load_order_generator(db, ORDER_CHUNK_SIZE, opts["customer_pool_max"], deterministic=True)
+    print(f"[seed] Generating days {day + 1}-{len(days)} of {len(days)} from SO {seq}...")
+
+    # File sinks only publish their files on close, so each invocation writes
+    # its own numbered part and checkpoints once, at the end.
+    part = run["invocations"] - 1 if target is None else None
+    writer = open_order_writer(db, target, opts["sink"], opts["output_dir"], writer_opts, part=part)
+    last_checkpoint = time.monotonic()
+    try:
+        while day < len(days) and not deadline.near():
+            for chunk in gen.iter_seeded(days[day:day + 1], counts[day:day + 1], seq, seed):
+                writer.submit(chunk)
+            seq += int(counts[day])
+            day += 1
+            if target is not None and time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL_S:
+                writer.flush()
+                save_run(db, run, next_day=day, next_seq=seq, orders_written=seq - 1)
+                last_checkpoint = time.monotonic()
+    finally:
+        stats = writer.close()
+
+    save_run(db, run, next_day=day, next_seq=seq, orders_written=seq - 1)
+    return stats
+
+
+def run_progress(run):
+    return {
+        "phase": run["phase"],
+        "days_done": run["next_day"],
+        "days_total": run["options"]["n_days"],
+        "next_seq": run["next_seq"],
+        "orders_written": run["orders_written"],
+        "invocations": run["invocations"],
+    }
+
+
+def pause_run(db, run):
+    save_run(db, run, status="paused")
+    print(f"[seed] Stopping ahead of the deadline; resume with continuation_token={run['_id']}")
+    return {
+        "status": "incomplete",
+        "message": "Stopped before the Lambda deadline; invoke again with the continuation token",
+        "continuation_token": run["_id"],
+        "progress": run_progress(run),
+    }
+
+
+def run_checkpointed(db, token, deadline, writer_opts, options, run_id=None):
+    """
+    Seed in resumable phases. Returns the usual result once the run is
+    complete, or an "incomplete" result carrying a continuation token when it
+    stops ahead of the deadline. `run_id` names a new run (API jobs reuse
+    their job id); a repeated start for an existing id resumes it instead.
+    """
+    if not token and run_id and find_run(db, run_id) is not None:
+        token = run_id
+    if token:
+        run = load_run(db, token)
+        if run["status"] == "complete":
+            print(f"[seed] Run {run['_id']} is already complete.")
+        else:
+            print(f"[seed] Resuming run {run['_id']} at phase {run['phase']} (invocation {run['invocations']})...")
+    else:
+        run = start_run(db, options, run_id=run_id)
+        print(f"[seed] Started run {run['_id']} (seed {options['seed']})...")
+    opts = run["options"]
+    order_stats = None
+
+    if run["phase"] == "reference":
+        ensure_base_customers(db)
+        ensure_vendors(db)
+        ensure_products_and_inventory(db)
+        if opts["synthetic_customers"] > 0:
+            add_synthetic_customers(db, opts["synthetic_customers"])
+        target = prepare_order_target(db, opts["mode"], opts["sink"], opts["output_dir"])
+        save_run(db, run, phase="orders", target=target)
+
+    if run["phase"] == "orders":
+        if deadline.near():
+            return pause_run(db, run)
+        order_stats = resume_orders(db, run, deadline, writer_opts)
+        if run["next_day"] < opts["n_days"]:
+            return pause_run(db, run)
+        save_run(db, run, phase="finalize")
+
+    result = {"status": "ok", "message": "Seeding complete", "run_id": run["_id"]}
+    if run["phase"] == "finalize":
+        if deadline.near():
+            return pause_run(db, run)
+        if run["target"] is not None:
+            finalize_orders(db, run["target"])
+        if opts["snapshot_uri"]:
+            manifest = write_snapshot_phase(db, opts["snapshot_uri"])
+            result["snapshot"] = {n: e["documents"] for n, e in manifest["collections"].items()}
+        save_run(db, run, phase="done", status="complete")
+
+    result["orders"] = order_stats
+    result["progress"] = run_progress(run)
+    return result
 
-    # Indexes
-    orders.create_index([("order_id", 1)], unique=True)
-    orders.create_index([("customer_id", 1), ("order_date", -1)])
-    orders.create_index([("line_items.product_id", 1), ("order_date", -1)])
 
-    print(f"[seed] Inserted total orders: {total_orders}")
-    print("[seed] Orders generation complete.")
+# ============================================================
+# Snapshots
+# ============================================================
+@metrics.instrument(
+    "write_snapshot",
+    measure=lambda m: {
+        "Documents": sum(e["documents"] for e in m["collections"].values()),
+        "Bytes": sum(e["bytes"] for e in m["collections"].values()),
+    },
+)
+def write_snapshot_phase(db, uri):
+    print(f"[seed] Writing snapshot to {uri}...")
+    return write_snapshot(db, uri)
+
+
+@metrics.instrument(
+    "restore_snapshot",
+    measure=lambda r: {
+        "Documents": sum(s["docs"] for s in r.values()),
+        "Bytes": sum(s["bytes"] for s in r.values()),
+    },
+)
+def restore_snapshot_phase(db, uri, writer_opts=None):
+    print(f"[seed] Restoring snapshot from {uri}...")
+    restored = restore_snapshot(db, uri, writer_opts)
+    # The restored documents replace whatever the recorded sync hashes describe
+    forget_hashes(db, restored)
+    return restored
 
 
 # ============================================================
 # Lambda handler
 # ============================================================
 def handler(event, context):
-    print("[seed] Starting seeding process...")
+    if is_api_request(event):
+        return handle_api(event, context)
 
+    print("[seed] Starting seeding process...")
+    job_id = (event or {}).get("job_id")
+    if job_id:
+        job_started(job_id)
+
+    # Per-phase durations, counts and batch latencies go to stdout as EMF
+    # and a summary rides along in the response.
+    with metrics.recording() as recorder:
+        with recorder.phase("handler"):
+            try:
+                result = run_seed(event, context)
+            except Exception as e:
+                if not job_id:
+                    raise
+                # An async job has nobody to raise to; record the failure
+                log.error("Seed job %s failed: %s", job_id, e, exc_info=True)
+                result = {"status": "error", "error": type(e).__name__, "details": str(e)}
+
+    result["metrics"] = recorder.summary()
+    if job_id:
+        job_finished(job_id, result)
+    return result
+
+
+def run_seed(event, context):
     try:
-        _, db = get_mongo()
+        writer_opts = writer_options(event)
+        scale_opts = scale_options(event)
+        mode = seed_mode(event)
+        sink_opts = sink_options(event, mode)
+        snapshot = snapshot_uri(event, mode, sink_opts["sink"])
+        shard_opts = shard_options(event, mode, sink_opts["sink"])
+        cp_opts = checkpoint_options(event, mode, shard_opts["workers"])
+        mongo_profile = get_setting(event, "mongo_profile", None, str)
+        # A fan-out worker writes with the coordinator's writer settings
+        shard = (event or {}).get("shard")
+        _, db = get_mongo(mongo_profile, (shard["writer"] if shard else writer_opts).get("writers"))
     except ConfigError as e:
         log.error("Configuration error: %s", e)
         return {
@@ -589,14 +1169,183 @@ def handler(event, context):
             "details": "Unexpected error while initializing Mongo",
         }
 
+    if event and event.get("shard"):
+        # A fan-out worker: generate the given day range only
+        order_stats = generate_shard(db, event["shard"])
+        return {"status": "ok", "message": "Shard complete", "orders": order_stats}
+
+    if mode == "restore":
+        try:
+            restored = restore_snapshot_phase(db, snapshot, writer_opts)
+        except SnapshotError as e:
+            log.error("Snapshot restore failed: %s", e)
+            return {"status": "error", "error": "SnapshotError", "details": str(e)}
+        print("[seed] Done.")
+        return {"status": "ok", "message": "Restore complete", "restored": restored}
+
+    if cp_opts["enabled"]:
+        # Resolved once and stored with the run; a resumed run ignores the
+        # event's generation options.
+        options = {
+            "mode": mode,
+            "sink": sink_opts["sink"],
+            "output_dir": sink_opts["output_dir"],
+            "seed": shard_opts["seed"] if shard_opts["seed"] is not None else random.randrange(2**31),
+            "start_date": shard_opts["start_date"] or seeded_start(datetime.utcnow(), scale_opts["days_back"]),
+            "n_days": scale_opts["days_back"],
+            "scale": scale_opts["scale"],
+            "synthetic_customers": scale_opts["synthetic_customers"],
+            "customer_pool_max": scale_opts["customer_pool_max"],
+            "snapshot_uri": snapshot,
+        }
+        deadline = Deadline(context, cp_opts["margin_ms"])
+        try:
+            result = run_checkpointed(
+                db, cp_opts["token"], deadline, writer_opts, options, run_id=event.get("job_id")
+            )
+        except RunNotFound as e:
+            log.error("%s", e)
+            return {"status": "error", "error": "RunNotFound", "details": str(e)}
+        print("[seed] Done." if result["status"] == "ok" else "[seed] Paused.")
+        return result
+
     ensure_base_customers(db)
     ensure_vendors(db)
     ensure_products_and_inventory(db)
 
-    if EXTRA_SYNTHETIC_CUSTOMERS > 0:
-        add_synthetic_customers(db, EXTRA_SYNTHETIC_CUSTOMERS)
+    if scale_opts["synthetic_customers"] > 0:
+        add_synthetic_customers(db, scale_opts["synthetic_customers"])
+
+    order_stats = generate_orders(
+        db,
+        writer_opts,
+        scale=scale_opts["scale"],
+        days_back=scale_opts["days_back"],
+        chunk_size=scale_opts["chunk_size"],
+        mode=mode,
+        customer_pool_max=scale_opts["customer_pool_max"],
+        mongo_profile=mongo_profile,
+        **sink_opts,
+        **shard_opts,
+    )
 
-    generate_orders(db)
+    result = {"status": "ok", "message": "Seeding complete", "orders": order_stats}
+    if snapshot:
+        manifest = write_snapshot_phase(db, snapshot)
+        result["snapshot"] = {n: e["documents"] for n, e in manifest["collections"].items()}
 
     print("[seed] Done.")
-    return {"status": "ok", "message": "Seeding complete"}
+    return result
+
+
+# ============================================================
+# HTTP API: async seed jobs (see jobs.py)
+# ============================================================
+def is_api_request(event):
+    return isinstance(event, dict) and ("httpMethod" in event or "routeKey" in event)
+
+
+def api_response(status_code, body):
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(body, default=str),
+    }
+
+
+def api_params(event):
+    """Query-string parameters overlaid with a JSON object body, if any."""
+    params = dict(event.get("queryStringParameters") or {})
+    body = event.get("body")
+    if body:
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body).decode("utf-8")
+        parsed = json.loads(body)
+        if not isinstance(parsed, dict):
+            raise ValueError("request body must be a JSON object")
+        params.update(parsed)
+    return params
+
+
+def handle_api(event, context):
+    try:
+        _, db = get_mongo()
+    except Exception as e:
+        log.error("Unable to connect to Mongo for API request: %s", e, exc_info=True)
+        return api_response(500, {"error": "InitError", "details": "Unable to connect to Mongo"})
+
+    job_id = (event.get("pathParameters") or {}).get("job_id")
+    if job_id:
+        job = get_job(db, job_id)
+        if job is None:
+            return api_response(404, {"error": "NotFound", "details": f"No seed job {job_id}"})
+        return api_response(200, job_view(job, find_run(db, job_id)))
+
+    try:
+        request = job_request(api_params(event))
+        # Validate up front so a bad request fails here, not in the worker
+        mode = seed_mode(request)
+        if mode == "restore":
+            # Snapshot locations stay with the function's configuration
+            raise ConfigError("restore is not available through the API; invoke the function directly")
+        scale_options(request)
+        sink = sink_options(request, mode)["sink"]
+        snapshot_uri(request, mode, sink)
+        shard_options(request, mode, sink)
+    except (ValueError, ConfigError) as e:
+        return api_response(400, {"error": "BadRequest", "details": str(e)})
+
+    job = create_job(db, request)
+    dispatch_job(job["_id"], request)
+    print(f"[seed] Queued job {job['_id']}: {request}")
+    return api_response(
+        202,
+        {"job_id": job["_id"], "status": job["status"], "status_url": f"/seed-sales-data/jobs/{job['_id']}"},
+    )
+
+
+def dispatch_job(job_id, request, continuation_token=None):
+    """
+    Run a job out-of-band: an asynchronous invocation of this function in
+    Lambda, or a background thread as a local stand-in.
+    """
+    payload = {**request, "job_id": job_id}
+    if continuation_token:
+        payload["continuation_token"] = continuation_token
+
+    function_name = os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+    if function_name:
+        boto3.client("lambda").invoke(
+            FunctionName=function_name,
+            InvocationType="Event",
+            Payload=json.dumps(payload, default=str).encode("utf-8"),
+        )
+    else:
+        threading.Thread(target=handler, args=(payload, None), name=f"seed-job-{job_id}").start()
+
+
+def job_started(job_id):
+    try:
+        _, db = get_mongo()
+        mark_running(db, job_id)
+    except Exception as e:
+        log.warning("Unable to mark seed job %s running: %s", job_id, e)
+
+
+def job_finished(job_id, result):
+    """Record one invocation's outcome; an incomplete run is dispatched again."""
+    try:
+        _, db = get_mongo()
+        job = record_invocation(db, job_id, result)
+    except Exception as e:
+        log.error("Unable to record seed job %s: %s", job_id, e, exc_info=True)
+        return
+    if job is not None and result.get("status") == "incomplete":
+        print(f"[seed] Job {job_id} continues in a new invocation...")
+        dispatch_job(job_id, job["request"], continuation_token=result["continuation_token"])
+
+
+# ============================================================
+# Lambda init
+# ============================================================
+warm_mongo()
@@ -0,0 +1,185 @@
+"""
+Per-phase metrics for seed-sales-data, emitted as CloudWatch Embedded Metric
+Format (EMF) JSON lines on stdout.
+
+CloudWatch Logs turns EMF lines into metrics on its own, so there is no
+PutMetricData call and nothing to configure; run locally, the same lines are
+just structured log output.
+
+Usage:
+  - wrap a function with @instrument("phase") to time it, optionally turning
+    its return value into counters via `measure`
+  - call add()/sample() from anywhere (including writer threads) to attach
+    values to the innermost running phase
+  - the handler wraps a run in recording(), which emits on exit
+
+The active recorder lives in a ContextVar, so concurrent runs in one process
+(local async jobs on background threads) each record into their own. Threads
+that should report into the caller's run start inside a copy of its context
+(see PipelinedWriter). With no recording active, instrument/add/sample are
+no-ops.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import bson
+
+DEFAULT_NAMESPACE = "SeedSalesData"
+SERVICE = "seed-sales-data"
+EMF_MAX_VALUES = 100  # EMF limit on values per metric per record
+
+_ACTIVE = contextvars.ContextVar("seed_metrics_recorder", default=None)
+
+
+class MetricsRecorder:
+    def __init__(self, namespace=None):
+        self.namespace = namespace or os.environ.get("METRICS_NAMESPACE", DEFAULT_NAMESPACE)
+        self.phases = {}  # name -> {"totals": {metric: value}, "samples": {metric: [values]}, "units": {}}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def _phase(self, name):
+        return self.phases.setdefault(name, {"totals": {}, "samples": {}, "units": {}})
+
+    @contextmanager
+    def phase(self, name):
+        with self._lock:
+            self._phase(name)
+            self._stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self._stack.remove(name)
+            self.add("Duration", elapsed_ms, "Milliseconds", phase=name)
+
+    def add(self, metric, value, unit="Count", phase=None):
+        with self._lock:
+            name = phase or (self._stack[-1] if self._stack else "handler")
+            p = self._phase(name)
+            p["totals"][metric] = p["totals"].get(metric, 0) + value
+            p["units"][metric] = unit
+
+    def sample(self, metric, value, unit="Count", phase=None):
+        with self._lock:
+            name = phase or (self._stack[-1] if self._stack else "handler")
+            p = self._phase(name)
+            p["samples"].setdefault(metric, []).append(round(value, 3))
+            p["units"][metric] = unit
+
+    # --------------------------------------------------------
+    # Output
+    # --------------------------------------------------------
+    def _record(self, phase, values, units):
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [["Service", "Phase"]],
+                        "Metrics": [{"Name": m, "Unit": units[m]} for m in values],
+                    }
+                ],
+            },
+            "Service": SERVICE,
+            "Phase": phase,
+            **values,
+        }
+
+    def emf_records(self):
+        records = []
+        for name, p in self.phases.items():
+            values = {m: round(v, 3) for m, v in p["totals"].items()}
+            first = {m: s[:EMF_MAX_VALUES] for m, s in p["samples"].items()}
+            records.append(self._record(name, {**values, **first}, p["units"]))
+
+            # Sample lists longer than the EMF limit spill into extra records
+            for metric, samples in p["samples"].items():
+                for i in range(EMF_MAX_VALUES, len(samples), EMF_MAX_VALUES):
+                    chunk = samples[i:i + EMF_MAX_VALUES]
+                    records.append(self._record(name, {metric: chunk}, p["units"]))
+        return records
+
+    def emit(self):
+        for record in self.emf_records():
+            print(json.dumps(record, separators=(",", ":"), default=str))
+
+    def summary(self):
+        out = {}
+        for name, p in self.phases.items():
+            entry = {m: round(v, 3) for m, v in p["totals"].items()}
+            for metric, samples in p["samples"].items():
+                ordered = sorted(samples)
+                entry[metric] = {
+                    "count": len(ordered),
+                    "p50": round(ordered[len(ordered) // 2], 3),
+                    "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                    "max": round(ordered[-1], 3),
+                }
+            out[name] = entry
+        return out
+
+
+@contextmanager
+def recording(namespace=None):
+    """Activate a recorder for the duration of a run; emits EMF on exit."""
+    recorder = MetricsRecorder(namespace)
+    token = _ACTIVE.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _ACTIVE.reset(token)
+        recorder.emit()
+
+
+def add(metric, value, unit="Count"):
+    recorder = _ACTIVE.get()
+    if recorder is not None:
+        recorder.add(metric, value, unit)
+
+
+def sample(metric, value, unit="Count"):
+    recorder = _ACTIVE.get()
+    if recorder is not None:
+        recorder.sample(metric, value, unit)
+
+
+def instrument(phase, measure=None):
+    """
+    Time every call of the wrapped function as `phase`. `measure` maps the
+    return value to {metric: value} counters added to that phase.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = _ACTIVE.get()
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with recorder.phase(phase):
+                result = fn(*args, **kwargs)
+                if measure is not None:
+                    for metric, value in measure(result).items():
+                        unit = "Bytes" if metric == "Bytes" else "Count"
+                        recorder.add(metric, value, unit, phase=phase)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def approx_bson_bytes(docs):
+    """Encoded size of a batch, extrapolated from its first document."""
+    if not docs:
+        return 0
+    return len(bson.encode(docs[0])) * len(docs)
@@ -0,0 +1,218 @@
+"""
+Customer pools for order generation.
+
+A pool hands out `n` random customers as parallel lists of customer ids and
+default addresses. ListPool wraps already-loaded documents; CompactPool loads
+only the projected id + default address into packed arrays backed by a
+deduplicated table of shared address values; SampledPool keeps nothing and pulls a fresh
+`$sample` from Mongo for each draw, so memory stays flat however large the
+customers collection grows. PagedPool is the reproducible counterpart of
+SampledPool for seeded runs: it keeps every Nth customer id and draws from a
+few seeded pages of the sorted collection. load_customer_pool picks between
+the last three.
+"""
+
+from array import array
+
+import numpy as np
+
+ACTIVE_CUSTOMERS = {"status": "active"}
+
+# Only the fields order generation needs: id + first (default) address
+CUSTOMER_PROJECTION = {
+    "_id": 0,
+    "customer_id": 1,
+    "address": {"$arrayElemAt": ["$addresses", 0]},
+}
+
+# Address fields unique to each customer; CompactPool stores them per customer
+# and deduplicates the rest
+PER_CUSTOMER_ADDRESS_FIELDS = ("address_id", "line1", "line2")
+
+
+class ListPool:
+    def __init__(self, ids, addrs):
+        if not ids:
+            raise ValueError("Customer pool is empty.")
+        self.ids = ids
+        self.addrs = addrs
+
+    @classmethod
+    def from_docs(cls, docs):
+        ids = [d["customer_id"] for d in docs]
+        addrs = [(d.get("addresses") or [{}])[0] for d in docs]
+        return cls(ids, addrs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def draw(self, n, rng):
+        idx = rng.integers(0, len(self.ids), size=n).tolist()
+        ids, addrs = self.ids, self.addrs
+        return [ids[i] for i in idx], [addrs[i] for i in idx]
+
+
+class StringColumn:
+    """
+    Strings packed into one UTF-8 buffer plus an array of end offsets: about
+    one byte per character plus eight, instead of a str object each.
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.ends = array("q")
+
+    def append(self, value):
+        self.buf += value.encode()
+        self.ends.append(len(self.buf))
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        start = self.ends[i - 1] if i else 0
+        return self.buf[start:self.ends[i]].decode()
+
+
+class CompactPool:
+    """
+    Customer ids plus an index into a table of distinct addresses. A table
+    row holds an address's shared values (type, city, state, postal code,
+    country, ...) against an interned tuple of its field names, so customers
+    in the same place share one row. Per-customer string fields (address id,
+    street line) live in packed StringColumns, as do the ids. The dict is
+    rebuilt only when an address is drawn.
+    """
+
+    def __init__(self, ids, addr_idx, addr_table, addr_values):
+        if not len(ids):
+            raise ValueError("Customer pool is empty.")
+        self.ids = ids
+        self.addr_idx = addr_idx
+        self.addr_table = addr_table  # (fields, per-customer fields, shared values)
+        self.addr_values = addr_values  # field -> StringColumn, one entry per customer
+
+    @classmethod
+    def load(cls, collection, query=ACTIVE_CUSTOMERS, batch_size=10000):
+        ids = StringColumn()
+        addr_idx = array("i")
+        addr_table = []
+        addr_values = {f: StringColumn() for f in PER_CUSTOMER_ADDRESS_FIELDS}
+        seen_rows = {}
+        seen_layouts = {}
+
+        # Sorted so a seeded run draws the same customers for the same indices
+        cursor = collection.aggregate(
+            [{"$match": query}, {"$sort": {"customer_id": 1}}, {"$project": CUSTOMER_PROJECTION}],
+            batchSize=batch_size,
+        )
+        for r in cursor:
+            addr = r.get("address") or {}
+            split = tuple(f for f in PER_CUSTOMER_ADDRESS_FIELDS if isinstance(addr.get(f), str))
+            for f, column in addr_values.items():
+                column.append(addr[f] if f in split else "")
+            layout = (tuple(addr), split)
+            layout = seen_layouts.setdefault(layout, layout)
+            row = (*layout, tuple(v for f, v in addr.items() if f not in split))
+            try:
+                slot = seen_rows.get(row)
+                if slot is None:
+                    slot = seen_rows[row] = len(addr_table)
+                    addr_table.append(row)
+            except TypeError:  # nested values are unhashable; store without dedup
+                slot = len(addr_table)
+                addr_table.append(row)
+            ids.append(r["customer_id"])
+            addr_idx.append(slot)
+
+        return cls(ids, np.frombuffer(addr_idx, dtype=np.int32), addr_table, addr_values)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _address(self, i, row):
+        fields, split, shared = row
+        if not split:
+            return dict(zip(fields, shared))
+        values = iter(shared)
+        return {f: self.addr_values[f][i] if f in split else next(values) for f in fields}
+
+    def draw(self, n, rng):
+        idx = rng.integers(0, len(self.ids), size=n).tolist()
+        ids, table, addr_idx = self.ids, self.addr_table, self.addr_idx
+        return [ids[i] for i in idx], [self._address(i, table[addr_idx[i]]) for i in idx]
+
+
+class SampledPool:
+    """
+    Draws from a server-side `$sample` of at most `sample_size` customers per
+    call, then picks uniformly (with replacement) from that sample.
+    """
+
+    def __init__(self, collection, sample_size=5000, query=ACTIVE_CUSTOMERS):
+        self.collection = collection
+        self.sample_size = sample_size
+        self.query = query
+
+    def _sample(self, size):
+        pipeline = [
+            {"$match": self.query},
+            {"$sample": {"size": size}},
+            {"$project": CUSTOMER_PROJECTION},
+        ]
+        rows = list(self.collection.aggregate(pipeline))
+        if not rows:
+            raise ValueError("Customer pool is empty.")
+        return [r["customer_id"] for r in rows], [r.get("address") or {} for r in rows]
+
+    def draw(self, n, rng):
+        ids, addrs = self._sample(min(n, self.sample_size))
+        return ListPool(ids, addrs).draw(n, rng)
+
+
+class PagedPool:
+    """
+    Customers in `customer_id` order, cut into pages of `page_size`. Only the
+    first id of each page is held; each draw picks enough pages with `rng` to
+    cover `sample_size` customers, fetches them by id range and picks
+    uniformly among them. The same rng state yields the same customers as
+    long as the active customers do not change, which is what seeded runs
+    need, with memory bounded by the page index plus one draw's pages.
+    """
+
+    def __init__(self, collection, sample_size=5000, page_size=1000, query=ACTIVE_CUSTOMERS):
+        self.collection = collection
+        self.query = query
+        self.page_size = page_size
+        self.pages_per_draw = max(1, sample_size // page_size)
+        cursor = collection.find(query, {"_id": 0, "customer_id": 1}).sort("customer_id", 1)
+        self.starts = [r["customer_id"] for i, r in enumerate(cursor) if i % page_size == 0]
+        if not self.starts:
+            raise ValueError("Customer pool is empty.")
+
+    def _page(self, p):
+        match = {**self.query, "customer_id": {"$gte": self.starts[p]}}
+        rows = self.collection.aggregate(
+            [{"$match": match}, {"$sort": {"customer_id": 1}}, {"$limit": self.page_size},
+             {"$project": CUSTOMER_PROJECTION}]
+        )
+        return [(r["customer_id"], r.get("address") or {}) for r in rows]
+
+    def draw(self, n, rng):
+        pages = sorted(set(rng.integers(0, len(self.starts), size=self.pages_per_draw).tolist()))
+        rows = [row for p in pages for row in self._page(p)]
+        return ListPool([r[0] for r in rows], [r[1] for r in rows]).draw(n, rng)
+
+
+def load_customer_pool(collection, max_in_memory, sample_size, deterministic=False):
+    """
+    CompactPool when the collection fits under `max_in_memory` customers
+    (judged from the metadata count, no scan). Above it, SampledPool, or
+    PagedPool when the draws must be reproducible (`$sample` cannot be).
+    """
+    estimated = collection.estimated_document_count()
+    if estimated <= max_in_memory:
+        return CompactPool.load(collection)
+    if deterministic:
+        return PagedPool(collection, sample_size=sample_size)
+    return SampledPool(collection, sample_size=sample_size)
@@ -0,0 +1,127 @@
+"""
+Declarative sync for reference collections (customers, vendors, products,
+inventory).
+
+Each collection is described by a SyncSpec: its key fields and the desired
+documents. sync_collection reads the existing keys, plus the content hashes
+recorded for them in the `ref_sync_hashes` side collection, diffs them
+against the desired set, and sends a single unordered bulk_write containing
+only new or changed documents. Unchanged data costs two reads and zero
+writes, so it produces no CDC events. The hashes live outside the business
+documents so those keep their original shape downstream.
+
+A document without a recorded hash (first sync, or after a restore) is
+compared by content instead, so it is rewritten only if it really differs.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+HASH_COLLECTION = "ref_sync_hashes"  # {_id: {collection, key}, hash, updated_at}
+SYNC_TIMESTAMPS = ("created_at", "updated_at")  # set by the sync, not part of the content
+
+
+@dataclass
+class SyncSpec:
+    collection: str
+    key: tuple
+    docs: list
+    # Fields written only when the document is first created (e.g. random
+    # starting stock levels); they are excluded from the content hash.
+    insert_only: tuple = field(default_factory=tuple)
+
+
+def content_hash(doc):
+    payload = json.dumps(doc, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def hash_id(collection, key):
+    return {"collection": collection, "key": list(key)}
+
+
+def forget_hashes(db, collections):
+    """Drop the recorded hashes for `collections`, e.g. after they were replaced wholesale."""
+    db[HASH_COLLECTION].delete_many({"_id.collection": {"$in": list(collections)}})
+
+
+def _key_of(doc, key):
+    return tuple(doc[k] for k in key)
+
+
+def _key_filter(spec, keys):
+    if len(spec.key) == 1:
+        return {spec.key[0]: {"$in": [k[0] for k in keys]}}
+    return {"$or": [dict(zip(spec.key, k)) for k in keys]}
+
+
+def _tracked(spec, doc):
+    return {k: v for k, v in doc.items() if k not in spec.insert_only}
+
+
+def sync_collection(db, spec, now=None):
+    """Bring `spec.collection` in line with `spec.docs`; return write counts."""
+    coll = db[spec.collection]
+    hashes = db[HASH_COLLECTION]
+    now = now or datetime.utcnow()
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not spec.docs:
+        return stats
+
+    keys = [_key_of(d, spec.key) for d in spec.docs]
+    projection = {k: 1 for k in spec.key}
+    projection["_id"] = 0
+    present = {_key_of(d, spec.key) for d in coll.find(_key_filter(spec, keys), projection)}
+    recorded = {
+        tuple(h["_id"]["key"]): h["hash"]
+        for h in hashes.find({"_id": {"$in": [hash_id(spec.collection, k) for k in keys]}})
+    }
+
+    # Present but never hashed: hash what is stored, ignoring the sync's own fields
+    unhashed = [k for k in keys if k in present and k not in recorded]
+    if unhashed:
+        drop = {"_id": 0, **{f: 0 for f in SYNC_TIMESTAMPS + tuple(spec.insert_only)}}
+        for d in coll.find(_key_filter(spec, unhashed), drop):
+            recorded[_key_of(d, spec.key)] = content_hash(d)
+
+    ops, hash_ops = [], []
+    for doc, key in zip(spec.docs, keys):
+        tracked = _tracked(spec, doc)
+        digest = content_hash(tracked)
+
+        if key in present and recorded.get(key) == digest:
+            stats["unchanged"] += 1
+            if key in unhashed:
+                hash_ops.append(_record(spec.collection, key, digest, now))
+            continue
+
+        stats["updated" if key in present else "inserted"] += 1
+        on_insert = {k: doc[k] for k in spec.insert_only if k in doc}
+        on_insert["created_at"] = now
+        ops.append(
+            UpdateOne(
+                dict(zip(spec.key, key)),
+                {"$set": {**tracked, "updated_at": now}, "$setOnInsert": on_insert},
+                upsert=True,
+            )
+        )
+        hash_ops.append(_record(spec.collection, key, digest, now))
+
+    # Documents first: if that fails, no hash claims the new content
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+    if hash_ops:
+        hashes.bulk_write(hash_ops, ordered=False)
+    return stats
+
+
+def _record(collection, key, digest, now):
+    return UpdateOne(
+        {"_id": hash_id(collection, key)},
+        {"$set": {"hash": digest, "updated_at": now}},
+        upsert=True,
+    )
@@ -0,0 +1,103 @@
+"""
+Sharded, reproducible order generation.
+
+A seeded run is split into contiguous day ranges ("shards") with roughly equal
+order counts. Every shard recomputes the per-day order counts from the seed,
+so it knows the SO- sequence range of its own days without talking to the
+others, and each (day, block) draws from its own RNG stream (see
+batchgen.iter_seeded). The combined output is therefore the same for any
+number of shards.
+
+Shards run in a local process pool or as parallel synchronous invocations of
+this Lambda; either way the coordinator waits for all of them, so it can
+build indexes and swap collections afterwards.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+FANOUTS = ("process", "lambda")
+LAMBDA_READ_TIMEOUT = 900  # seconds; the Lambda maximum run time
+
+
+class ShardError(Exception):
+    pass
+
+
+def split_days(counts, shards):
+    """
+    Contiguous (lo, hi) day-index ranges covering `counts`, at most `shards`
+    of them, each holding roughly the same number of orders.
+    """
+    n_days = len(counts)
+    if n_days == 0:
+        return []
+    ends = np.cumsum(counts)
+    targets = [ends[-1] * i / shards for i in range(1, shards)]
+    cuts = (np.searchsorted(ends, targets, side="left") + 1).tolist()
+    bounds = sorted({0, n_days, *(c for c in cuts if 0 < c < n_days)})
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def merge_stats(results):
+    """Combine per-shard writer/sink summaries into one."""
+    wall = max((r["wall_s"] for r in results), default=0.0)
+    docs = sum(r["docs"] for r in results)
+    merged = {
+        "docs": docs,
+        "bytes": sum(r["bytes"] for r in results),
+        "shards": len(results),
+        "wall_s": wall,
+        "docs_per_s": round(docs / wall, 1) if wall > 0 else 0.0,
+        "per_shard": [
+            {k: r[k] for k in ("shard", "days", "first_seq", "docs", "wall_s", "docs_per_s")}
+            for r in results
+        ],
+    }
+    if any("files" in r for r in results):
+        merged["files"] = [f for r in results for f in r.get("files", [])]
+        merged["line_items"] = sum(r.get("line_items", 0) for r in results)
+    return merged
+
+
+# ============================================================
+# Runners
+# ============================================================
+def run_in_processes(worker, shards, max_workers):
+    """Run `worker(shard)` for every shard in a local process pool."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(worker, shards))
+
+
+def run_in_lambdas(function_name, shards, make_event):
+    """
+    Invoke `function_name` synchronously once per shard, all in parallel, and
+    return each invocation's "orders" result.
+    """
+    import boto3
+    from botocore.config import Config
+
+    client = boto3.client(
+        "lambda",
+        config=Config(
+            read_timeout=LAMBDA_READ_TIMEOUT,
+            retries={"max_attempts": 0},  # a retried shard would insert twice
+            max_pool_connections=max(10, len(shards)),
+        ),
+    )
+
+    def invoke(shard):
+        resp = client.invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(make_event(shard)).encode("utf-8"),
+        )
+        payload = json.loads(resp["Payload"].read() or b"null")
+        if resp.get("FunctionError") or not isinstance(payload, dict) or payload.get("status") != "ok":
+            raise ShardError(f"Shard {shard['index']} failed: {payload}")
+        return payload["orders"]
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        return list(pool.map(invoke, shards))
@@ -0,0 +1,386 @@
+"""
+File sinks for generated orders, as an alternative to writing them to Mongo.
+
+Every sink has the same submit(docs)/close() interface as PipelinedWriter, so
+generate_orders can stream chunks into either. Each submitted chunk is encoded
+and written straight away (one Parquet row group / one Native block per
+chunk), so memory stays bounded by the chunk size rather than the dataset.
+
+Sinks:
+  - ndjson               orders.ndjson, one nested document per line
+  - ndjson.gz            the same, gzip-compressed
+  - parquet              orders.parquet + order_line_items.parquet (needs pyarrow)
+  - clickhouse-rowbinary orders.rowbinary + order_line_items.rowbinary
+  - clickhouse-native    orders.native + order_line_items.native
+
+The columnar sinks flatten each order: addresses become shipping_* and
+billing_* columns and line items move to their own table keyed by
+(order_id, line_no). The ClickHouse sinks also write clickhouse_schema.sql
+with matching CREATE TABLE statements.
+
+Files are written under a ".part" name and renamed into place on close, so a
+failed run never leaves a truncated file behind a complete-looking name. A
+sharded run passes `part`, which numbers each shard's files
+(orders-00003.ndjson, ...).
+"""
+
+import gzip
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+import metrics
+
+ADDRESS_FIELDS = ("address_id", "line1", "city", "state", "postal_code", "country")
+
+# Scalar order fields copied as-is into the flattened orders table
+_ORDER_FIELDS = (
+    ("order_id", "String"),
+    ("customer_id", "String"),
+    ("vendor_id", "String"),
+    ("order_date", "DateTime64(3)"),
+    ("status", "String"),
+    ("order_total", "Float64"),
+    ("currency", "String"),
+    ("payment_method", "String"),
+    ("sales_channel", "String"),
+    ("created_at", "DateTime64(3)"),
+    ("updated_at", "DateTime64(3)"),
+)
+
+ORDER_COLUMNS = (
+    *_ORDER_FIELDS,
+    *((f"shipping_{f}", "String") for f in ADDRESS_FIELDS),
+    *((f"billing_{f}", "String") for f in ADDRESS_FIELDS),
+    ("line_item_count", "UInt8"),
+)
+
+LINE_ITEM_COLUMNS = (
+    ("order_id", "String"),
+    ("line_no", "UInt8"),
+    ("order_date", "DateTime64(3)"),
+    ("product_id", "String"),
+    ("quantity", "UInt32"),
+    ("unit_price", "Float64"),
+    ("extended_price", "Float64"),
+)
+
+ORDERS_TABLE = "orders"
+LINE_ITEMS_TABLE = "order_line_items"
+
+_NUMPY_TYPES = {
+    "UInt8": "<u1",
+    "UInt32": "<u4",
+    "Float64": "<f8",
+    "DateTime64(3)": "<i8",
+}
+
+
+class SinkError(Exception):
+    pass
+
+
+def flatten_orders(docs):
+    """Split order documents into column dicts for the orders and line items tables."""
+    orders = {name: [] for name, _ in ORDER_COLUMNS}
+    items = {name: [] for name, _ in LINE_ITEM_COLUMNS}
+
+    for doc in docs:
+        for name, _ in _ORDER_FIELDS:
+            orders[name].append(doc.get(name))
+        for prefix in ("shipping", "billing"):
+            addr = doc.get(f"{prefix}_address") or {}
+            for f in ADDRESS_FIELDS:
+                orders[f"{prefix}_{f}"].append(addr.get(f))
+
+        line_items = doc.get("line_items") or []
+        orders["line_item_count"].append(len(line_items))
+        for line_no, li in enumerate(line_items, 1):
+            items["order_id"].append(doc["order_id"])
+            items["line_no"].append(line_no)
+            items["order_date"].append(doc.get("order_date"))
+            items["product_id"].append(li.get("product_id"))
+            items["quantity"].append(li.get("quantity"))
+            items["unit_price"].append(li.get("unit_price"))
+            items["extended_price"].append(li.get("extended_price"))
+
+    return orders, items
+
+
+# ============================================================
+# ClickHouse encoding
+# ============================================================
+def _varint(n):
+    if n < 0x80:
+        return bytes((n,))
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _string_values(values):
+    """Length-prefixed UTF-8 encoding of each value (None -> empty string)."""
+    # Most columns repeat a handful of values (status, city, vendor...), so
+    # each distinct value is encoded once.
+    encoded = {}
+    out = []
+    for v in values:
+        e = encoded.get(v)
+        if e is None:
+            b = b"" if v is None else str(v).encode("utf-8")
+            e = encoded[v] = _varint(len(b)) + b
+        out.append(e)
+    return out
+
+
+def _numeric_array(ch_type, values):
+    if ch_type.startswith("DateTime64"):
+        return np.asarray(values, dtype="datetime64[ms]").astype("<i8")
+    return np.asarray(values, dtype=_NUMPY_TYPES[ch_type])
+
+
+def encode_native_block(columns, schema):
+    """One ClickHouse Native block: header, then each column's values contiguously."""
+    n_rows = len(columns[schema[0][0]])
+    parts = [_varint(len(schema)), _varint(n_rows)]
+    for name, ch_type in schema:
+        parts.extend(_string_values((name, ch_type)))
+        values = columns[name]
+        if ch_type == "String":
+            parts.extend(_string_values(values))
+        else:
+            parts.append(_numeric_array(ch_type, values).tobytes())
+    return b"".join(parts)
+
+
+def encode_rowbinary(columns, schema):
+    """ClickHouse RowBinary: each row's values back to back, in schema order."""
+    per_column = []
+    for name, ch_type in schema:
+        values = columns[name]
+        if ch_type == "String":
+            per_column.append(_string_values(values))
+        else:
+            arr = _numeric_array(ch_type, values)
+            raw = arr.tobytes()
+            width = arr.itemsize
+            per_column.append([raw[i:i + width] for i in range(0, len(raw), width)])
+    return b"".join(itertools.chain.from_iterable(zip(*per_column)))
+
+
+def clickhouse_ddl(database=None):
+    prefix = f"{database}." if database else ""
+    tables = (
+        (ORDERS_TABLE, ORDER_COLUMNS, "(order_date, order_id)"),
+        (LINE_ITEMS_TABLE, LINE_ITEM_COLUMNS, "(order_date, order_id, line_no)"),
+    )
+    statements = []
+    for table, schema, order_by in tables:
+        cols = ",\n".join(f"    {name} {ch_type}" for name, ch_type in schema)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {prefix}{table}\n(\n{cols}\n)\n"
+            f"ENGINE = MergeTree\nORDER BY {order_by};\n"
+        )
+    return "\n".join(statements)
+
+
+# ============================================================
+# Sinks
+# ============================================================
+class FileSink:
+    """Base class: tracks output files, counts and per-chunk write latency."""
+
+    kind = None
+
+    def __init__(self, output_dir, part=None):
+        self.output_dir = output_dir
+        self.part = part
+        os.makedirs(output_dir, exist_ok=True)
+        self.files = {}  # final path -> open ".part" file object
+        self.docs_written = 0
+        self.rows_written = 0  # line item rows (columnar sinks only)
+        self.chunks = 0
+        self._started_at = time.perf_counter()
+
+    def _open(self, filename, opener=open, numbered=True):
+        if numbered and self.part is not None:
+            stem, _, ext = filename.partition(".")
+            filename = f"{stem}-{self.part:05d}.{ext}"
+        path = os.path.join(self.output_dir, filename)
+        self.files[path] = opener(path + ".part", "wb")
+        return self.files[path]
+
+    def submit(self, docs):
+        if not docs:
+            return
+        t0 = time.perf_counter()
+        self._write(docs)
+        elapsed = time.perf_counter() - t0
+        metrics.sample("ChunkWriteLatency", elapsed * 1000, "Milliseconds")
+        self.docs_written += len(docs)
+        self.chunks += 1
+
+    def _write(self, docs):
+        raise NotImplementedError
+
+    def _finish(self):
+        """Hook for sinks that write a footer or side files before the rename."""
+
+    def close(self):
+        """Finish every file, move it into place, and return the summary."""
+        try:
+            self._finish()
+        finally:
+            for f in self.files.values():
+                f.close()
+        for path in self.files:
+            os.replace(path + ".part", path)
+        return self.summary()
+
+    def summary(self):
+        wall = time.perf_counter() - self._started_at
+        return {
+            "sink": self.kind,
+            "docs": self.docs_written,
+            "line_items": self.rows_written,
+            "bytes": sum(os.path.getsize(p) for p in self.files if os.path.exists(p)),
+            "chunks": self.chunks,
+            "files": sorted(self.files),
+            "wall_s": round(wall, 3),
+            "docs_per_s": round(self.docs_written / wall, 1) if wall > 0 else 0.0,
+        }
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class NdjsonSink(FileSink):
+    def __init__(self, output_dir, compress=False, compresslevel=6, part=None):
+        super().__init__(output_dir, part)
+        self.kind = "ndjson.gz" if compress else "ndjson"
+        if compress:
+            opener = lambda path, mode: gzip.open(path, mode, compresslevel=compresslevel)  # noqa: E731
+            self._out = self._open("orders.ndjson.gz", opener)
+        else:
+            self._out = self._open("orders.ndjson")
+
+    def _write(self, docs):
+        lines = [json.dumps(d, separators=(",", ":"), default=_json_default) for d in docs]
+        lines.append("")
+        self._out.write("\n".join(lines).encode("utf-8"))
+
+
+class ParquetSink(FileSink):
+    """Orders and line items as two Parquet files; one row group per chunk."""
+
+    kind = "parquet"
+
+    def __init__(self, output_dir, compression="zstd", part=None):
+        pa, pq = _import_pyarrow()
+        super().__init__(output_dir, part)
+        self._pa = pa
+        types = {
+            "String": pa.string(),
+            "UInt8": pa.uint8(),
+            "UInt32": pa.uint32(),
+            "Float64": pa.float64(),
+            "DateTime64(3)": pa.timestamp("ms"),
+        }
+        self._schemas = {
+            ORDERS_TABLE: pa.schema([(n, types[t]) for n, t in ORDER_COLUMNS]),
+            LINE_ITEMS_TABLE: pa.schema([(n, types[t]) for n, t in LINE_ITEM_COLUMNS]),
+        }
+        self._writers = {
+            table: pq.ParquetWriter(
+                self._open(f"{table}.parquet"), schema, compression=compression
+            )
+            for table, schema in self._schemas.items()
+        }
+
+    def _write(self, docs):
+        orders, items = flatten_orders(docs)
+        for table, columns in ((ORDERS_TABLE, orders), (LINE_ITEMS_TABLE, items)):
+            batch = self._pa.Table.from_pydict(columns, schema=self._schemas[table])
+            self._writers[table].write_table(batch)
+        self.rows_written += len(items["order_id"])
+
+    def _finish(self):
+        for w in self._writers.values():
+            w.close()
+
+
+class ClickHouseSink(FileSink):
+    """
+    Orders and line items as ClickHouse RowBinary or Native files, ready for
+    `clickhouse-client --query "INSERT INTO orders FORMAT RowBinary" < orders.rowbinary`.
+    """
+
+    FORMATS = {"rowbinary": encode_rowbinary, "native": encode_native_block}
+
+    def __init__(self, output_dir, fmt="rowbinary", part=None):
+        if fmt not in self.FORMATS:
+            raise SinkError(f"Unsupported ClickHouse format: {fmt}")
+        super().__init__(output_dir, part)
+        self.kind = f"clickhouse-{fmt}"
+        self._encode = self.FORMATS[fmt]
+        self._out = {
+            ORDERS_TABLE: (self._open(f"{ORDERS_TABLE}.{fmt}"), ORDER_COLUMNS),
+            LINE_ITEMS_TABLE: (self._open(f"{LINE_ITEMS_TABLE}.{fmt}"), LINE_ITEM_COLUMNS),
+        }
+        if not part:  # one schema file per output directory
+            self._open("clickhouse_schema.sql", numbered=False).write(clickhouse_ddl().encode("utf-8"))
+
+    def _write(self, docs):
+        orders, items = flatten_orders(docs)
+        for table, columns in ((ORDERS_TABLE, orders), (LINE_ITEMS_TABLE, items)):
+            out, schema = self._out[table]
+            if columns["order_id"]:
+                out.write(self._encode(columns, schema))
+        self.rows_written += len(items["order_id"])
+
+
+# ============================================================
+# Factory
+# ============================================================
+SINKS = ("mongo", "ndjson", "ndjson.gz", "parquet", "clickhouse-rowbinary", "clickhouse-native")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise SinkError("The parquet sink requires pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def check_sink(kind):
+    """Fail fast on an unknown sink or a missing optional dependency."""
+    if kind not in SINKS:
+        raise SinkError(f"sink must be one of {', '.join(SINKS)}, got {kind!r}")
+    if kind == "parquet":
+        _import_pyarrow()
+
+
+def open_sink(kind, output_dir, part=None):
+    check_sink(kind)
+    if kind == "ndjson":
+        return NdjsonSink(output_dir, part=part)
+    if kind == "ndjson.gz":
+        return NdjsonSink(output_dir, compress=True, part=part)
+    if kind == "parquet":
+        return ParquetSink(output_dir, part=part)
+    if kind.startswith("clickhouse-"):
+        return ClickHouseSink(output_dir, fmt=kind.split("-", 1)[1], part=part)
+    raise SinkError(f"{kind} is not a file sink")
@@ -0,0 +1,227 @@
+"""
+Raw BSON snapshots of a seeded database, for fast repeatable reseeds.
+
+write_snapshot dumps each collection as the raw bytes the server returns
+(find_raw_batches, nothing decoded) into <collection>.bson, the same
+concatenated-document layout mongodump uses, plus a manifest.json with the
+document counts and index definitions.
+
+restore_snapshot memory-maps each file, slices it into RawBSONDocument
+batches by the length prefix of each document and streams them through a
+PipelinedWriter, so no Python dicts are ever built. Each collection is
+restored into a staging collection, indexed, and swapped in with a rename,
+exactly like the orders rebuild.
+
+A snapshot location is a local directory or an s3://bucket/prefix URI; S3
+snapshots are staged through a local directory.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import time
+from datetime import datetime
+
+from bson.raw_bson import RawBSONDocument
+from pymongo import IndexModel
+
+from writer import PipelinedWriter
+
+SNAPSHOT_COLLECTIONS = ("customers", "vendors", "products", "inventory", "orders")
+MANIFEST = "manifest.json"
+RESTORE_SUFFIX = "_restore"
+LOCAL_STAGING_DIR = "/tmp/seed-sales-snapshot"
+
+READ_BATCH_SIZE = 10000
+RESTORE_CHUNK_DOCS = 10000
+
+_INT32 = struct.Struct("<i")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def count_documents(buf):
+    """Number of concatenated BSON documents in `buf`, walking length prefixes."""
+    n = off = 0
+    size = len(buf)
+    while off < size:
+        off += _INT32.unpack_from(buf, off)[0]
+        n += 1
+    return n
+
+
+def iter_raw_chunks(path, chunk_docs=RESTORE_CHUNK_DOCS):
+    """Yield lists of RawBSONDocument read from a memory-mapped .bson file."""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        off = 0
+        chunk = []
+        while off < size:
+            (length,) = _INT32.unpack_from(mm, off)
+            if length < 5 or off + length > size:
+                raise SnapshotError(f"Corrupt BSON in {path} at offset {off}")
+            chunk.append(RawBSONDocument(mm[off:off + length]))
+            off += length
+            if len(chunk) >= chunk_docs:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _index_specs(collection):
+    """Secondary index definitions as JSON-friendly dicts (key order kept)."""
+    specs = []
+    for spec in collection.list_indexes():
+        spec = dict(spec)
+        if spec["name"] == "_id_":
+            continue
+        spec.pop("v", None)
+        spec.pop("ns", None)
+        spec["key"] = [[k, v] for k, v in spec["key"].items()]
+        specs.append(spec)
+    return specs
+
+
+def _index_models(specs):
+    models = []
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k != "key"}
+        models.append(IndexModel([tuple(kv) for kv in spec["key"]], **options))
+    return models
+
+
+# ============================================================
+# Snapshot location (local dir or s3://bucket/prefix)
+# ============================================================
+def _split_s3(location):
+    bucket, _, prefix = location[len("s3://"):].partition("/")
+    return bucket, prefix.strip("/")
+
+
+def _s3():
+    import boto3
+
+    return boto3.client("s3")
+
+
+def _upload(local_dir, location, filenames):
+    bucket, prefix = _split_s3(location)
+    s3 = _s3()
+    for name in filenames:
+        s3.upload_file(os.path.join(local_dir, name), bucket, f"{prefix}/{name}" if prefix else name)
+
+
+def _download(location, local_dir):
+    bucket, prefix = _split_s3(location)
+    s3 = _s3()
+    key = lambda name: f"{prefix}/{name}" if prefix else name  # noqa: E731
+
+    os.makedirs(local_dir, exist_ok=True)
+    manifest_path = os.path.join(local_dir, MANIFEST)
+    try:
+        s3.download_file(bucket, key(MANIFEST), manifest_path)
+    except Exception as e:
+        raise SnapshotError(f"No snapshot manifest at {location}") from e
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for entry in manifest["collections"].values():
+        s3.download_file(bucket, key(entry["file"]), os.path.join(local_dir, entry["file"]))
+
+
+# ============================================================
+# Write
+# ============================================================
+def write_snapshot(db, location, collections=SNAPSHOT_COLLECTIONS):
+    """Dump `collections` as raw BSON files plus a manifest; return the manifest."""
+    remote = location.startswith("s3://")
+    out_dir = LOCAL_STAGING_DIR if remote else location
+    if remote:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {"created_at": datetime.utcnow().isoformat(), "db": db.name, "collections": {}}
+    for name in collections:
+        coll = db[name]
+        filename = f"{name}.bson"
+        path = os.path.join(out_dir, filename)
+        n_docs = n_bytes = 0
+        t0 = time.perf_counter()
+        with open(path + ".part", "wb") as f:
+            for batch in coll.find_raw_batches({}, batch_size=READ_BATCH_SIZE):
+                f.write(batch)
+                n_docs += count_documents(batch)
+                n_bytes += len(batch)
+        os.replace(path + ".part", path)
+        manifest["collections"][name] = {
+            "file": filename,
+            "documents": n_docs,
+            "bytes": n_bytes,
+            "indexes": _index_specs(coll),
+        }
+        print(f"[seed] Snapshot {name}: {n_docs} docs, {n_bytes} bytes in {time.perf_counter() - t0:.2f}s")
+
+    # The manifest goes last: a snapshot without one is incomplete
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    if remote:
+        files = [e["file"] for e in manifest["collections"].values()] + [MANIFEST]
+        _upload(out_dir, location, files)
+        print(f"[seed] Snapshot uploaded to {location}")
+    return manifest
+
+
+# ============================================================
+# Restore
+# ============================================================
+def restore_snapshot(db, location, writer_opts=None):
+    """Replace each snapshotted collection with its snapshot; return per-collection stats."""
+    if location.startswith("s3://"):
+        src_dir = LOCAL_STAGING_DIR
+        shutil.rmtree(src_dir, ignore_errors=True)
+        _download(location, src_dir)
+    else:
+        src_dir = location
+
+    manifest_path = os.path.join(src_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise SnapshotError(f"No snapshot manifest at {location}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    stats = {}
+    for name, entry in manifest["collections"].items():
+        target = db[name]
+        staging = db[name + RESTORE_SUFFIX]
+        staging.drop()
+
+        writer = PipelinedWriter(staging, **(writer_opts or {}))
+        try:
+            for chunk in iter_raw_chunks(os.path.join(src_dir, entry["file"])):
+                writer.submit(chunk)
+        finally:
+            written = writer.close()
+
+        if written["docs"] != entry["documents"]:
+            raise SnapshotError(
+                f"Restored {written['docs']} {name} docs, manifest says {entry['documents']}"
+            )
+        if written["docs"]:
+            if entry["indexes"]:
+                staging.create_indexes(_index_models(entry["indexes"]))
+            staging.rename(target.name, dropTarget=True)
+        else:
+            # Nothing was inserted, so there is no staging collection to rename
+            staging.drop()
+            target.delete_many({})
+
+        stats[name] = {"docs": written["docs"], "bytes": entry["bytes"], "docs_per_s": written["docs_per_s"]}
+        print(f"[seed] Restored {name}: {written['docs']} docs ({written['docs_per_s']} docs/s)")
+    return stats
@@ -0,0 +1,179 @@
+"""
+Pipelined bulk writer for seed-sales-data.
+
+The generator thread submits documents; they are cut into batches and pushed
+onto a bounded queue that a pool of writer threads drains with unordered
+insert_many. A full queue blocks the producer (backpressure), so at most
+`queue_depth` batches are held in memory at once. Batch size adapts to the
+observed insert latency: it grows while batches complete well under the
+target and shrinks when they run over it.
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+
+import metrics
+
+log = logging.getLogger()
+
+_STOP = object()
+
+
+class WriterError(Exception):
+    pass
+
+
+class PipelinedWriter:
+    def __init__(
+        self,
+        collection,
+        writers=4,
+        queue_depth=8,
+        batch_size=1000,
+        min_batch_size=100,
+        max_batch_size=20000,
+        target_batch_ms=250,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_batch_s = target_batch_ms / 1000.0
+
+        self.batches = []  # (docs, seconds, batch_size_after)
+        self.docs_written = 0
+        self.bytes_written = 0
+
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._error = None
+        self._started_at = time.perf_counter()
+        # Each thread runs in a copy of the caller's context, so batch metrics
+        # land in the caller's recorder
+        self._threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(self._drain,), name=f"seed-writer-{i}", daemon=True
+            )
+            for i in range(max(1, writers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # --------------------------------------------------------
+    # Producer side
+    # --------------------------------------------------------
+    def submit(self, docs):
+        self._pending.extend(docs)
+        start = 0
+        while len(self._pending) - start >= self.batch_size:
+            end = start + self.batch_size
+            self._put(self._pending[start:end])
+            start = end
+        del self._pending[:start]
+
+    def flush(self):
+        """Write out everything submitted so far and wait until it is stored."""
+        if self._pending:
+            self._put(self._pending)
+            self._pending = []
+        self._queue.join()
+        if self._error is not None:
+            raise WriterError(f"Order insert failed: {self._error}") from self._error
+
+    def close(self):
+        """Flush buffered docs, wait for the writers, and return the summary."""
+        try:
+            if self._pending and self._error is None:
+                self._put(self._pending)
+            self._pending = []
+        finally:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for t in self._threads:
+                t.join()
+
+        if self._error is not None:
+            raise WriterError(f"Order insert failed: {self._error}") from self._error
+        return self.summary()
+
+    def _put(self, batch):
+        while True:
+            if self._error is not None:
+                raise WriterError(f"Order insert failed: {self._error}") from self._error
+            try:
+                self._queue.put(batch, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    # --------------------------------------------------------
+    # Writer side
+    # --------------------------------------------------------
+    def _drain(self):
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is _STOP:
+                    return
+                self._write(batch)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        if self._error is not None:
+            return  # keep draining so the producer never blocks forever
+        try:
+            t0 = time.perf_counter()
+            self.collection.insert_many(batch, ordered=False)
+            elapsed = time.perf_counter() - t0
+        except Exception as e:
+            log.error("Writer batch of %d docs failed: %s", len(batch), e, exc_info=True)
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            return
+        self._record(len(batch), elapsed, metrics.approx_bson_bytes(batch))
+
+    def _record(self, n_docs, elapsed, n_bytes):
+        metrics.sample("BatchLatency", elapsed * 1000, "Milliseconds")
+        with self._lock:
+            if elapsed < self.target_batch_s / 2:
+                self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5))
+            elif elapsed > self.target_batch_s:
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            self.docs_written += n_docs
+            self.bytes_written += n_bytes
+            self.batches.append((n_docs, elapsed, self.batch_size))
+            log.info(
+                "[seed] batch %d: %d docs in %.1f ms (next batch size %d)",
+                len(self.batches), n_docs, elapsed * 1000, self.batch_size,
+            )
+
+    # --------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------
+    def summary(self):
+        latencies = sorted(s for _, s, _ in self.batches)
+        wall = time.perf_counter() - self._started_at
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "docs": self.docs_written,
+            "bytes": self.bytes_written,
+            "batches": len(self.batches),
+            "writers": len(self._threads),
+            "wall_s": round(wall, 3),
+            "docs_per_s": round(self.docs_written / wall, 1) if wall > 0 else 0.0,
+            "batch_ms_p50": round(pct(0.50) * 1000, 1),
+            "batch_ms_p95": round(pct(0.95) * 1000, 1),
+            "batch_ms_max": round((latencies[-1] if latencies else 0.0) * 1000, 1),
+            "final_batch_size": self.batch_size,
+        }
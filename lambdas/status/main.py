@@ -1,7 +1,11 @@
-import json
+from openapi_runtime import contract, endpoint
 
-def handler(event, context):
-    return {
-        "statusCode": 200,
-        "body": json.dumps({"status": "ok"})
-    }
+VERSION = contract().info.get("version")
+
+
+@endpoint
+def handler(event, context, body):
+    status = {"status": "ok"}
+    if VERSION:
+        status["version"] = VERSION
+    return 200, status
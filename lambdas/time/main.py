@@ -1,8 +1,8 @@
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 
-def handler(event, context):
-    return {
-        "statusCode": 200,
-        "body": json.dumps({"time": datetime.utcnow().isoformat() + "Z"})
-    }
+from openapi_runtime import endpoint
+
+
+@endpoint
+def handler(event, context, body):
+    return 200, {"time": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Minimal API Gateway (REST, proxy) events per handler; --event overrides them.
+# seed-sales-data gets a job status lookup: it exercises the full import and
+# Mongo path but never starts a seed.
+SYNTHETIC_EVENTS = {
+    "echo": {"httpMethod": "POST", "path": "/echo", "body": json.dumps({"message": "hello"})},
+    "status": {"httpMethod": "GET", "path": "/status"},
+    "time": {"httpMethod": "GET", "path": "/time"},
+    "seed-sales-data": {
+        "httpMethod": "GET",
+        "path": "/seed-sales-data/jobs/bench-cold-start",
+        "pathParameters": {"job_id": "bench-cold-start"},
+    },
+}
+
+IMPORT_START = "--bench-import-start--"
+IMPORT_END = "--bench-import-end--"
+RESULT = "--bench-result--"
+
+# Runs inside the fresh interpreter, with the package directory as argv[1].
+# Mirrors the Lambda runtime: import the handler module (init), then invoke
+# it once cold and --warm more times.
+RUNNER = f"""
+import json, resource, sys, time
+package, handler_spec, event, warm = sys.argv[1], sys.argv[2], json.loads(sys.argv[3]), int(sys.argv[4])
+sys.path.insert(0, package)
+module_name, func_name = handler_spec.rsplit(".", 1)
+
+class Context:
+    function_name = "bench"
+    aws_request_id = "bench"
+    def get_remaining_time_in_millis(self):
+        return 900_000
+
+def rss_mb():
+    # Peak RSS of this image: ru_maxrss would carry over the parent's peak across exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+result = {{"baseline_rss_mb": rss_mb()}}
+sys.stderr.write("{IMPORT_START}\\n"); sys.stderr.flush()
+start = time.perf_counter()
+__import__(module_name)  # not importlib.import_module: -X importtime only logs import statements
+handler = getattr(sys.modules[module_name], func_name)
+result["init_ms"] = (time.perf_counter() - start) * 1000
+sys.stderr.write("{IMPORT_END}\\n"); sys.stderr.flush()
+result["init_rss_mb"] = rss_mb()
+
+def invoke():
+    start = time.perf_counter()
+    try:
+        handler(event, Context())
+        error = None
+    except Exception as e:
+        error = f"{{type(e).__name__}}: {{e}}"
+    return (time.perf_counter() - start) * 1000, error
+
+result["first_ms"], result["error"] = invoke()
+result["warm_ms"] = [invoke()[0] for _ in range(warm)]
+result["rss_mb"] = rss_mb()
+print("{RESULT}" + json.dumps(result))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Self and cumulative import time (us) per top-level package, counting
+    only imports made while loading the handler. The package whose
+    cumulative time is largest is the one to defer or trim.
+    """
+    self_us = defaultdict(int)
+    cumulative_us = defaultdict(int)
+    recording = False
+    for line in stderr.splitlines():
+        if line == IMPORT_START:
+            recording = True
+        elif line == IMPORT_END:
+            break
+        elif recording and line.startswith("import time:") and "|" in line:
+            parts = line[len("import time:"):].split("|")
+            try:
+                own, total = int(parts[0]), int(parts[1])
+            except ValueError:
+                continue  # header row
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            package = name.strip().split(".")[0]
+            self_us[package] += own
+            if depth == 1:
+                cumulative_us[package] += total
+    return {
+        pkg: {"self_ms": self_us[pkg] / 1000, "cumulative_ms": cumulative_us.get(pkg, 0) / 1000}
+        for pkg in self_us
+    }
+
+
+def run_once(python, package, handler, event, warm, env):
+    proc = subprocess.run(
+        [python, "-I", "-B", "-X", "importtime", "-c", RUNNER, str(package), handler, json.dumps(event), str(warm)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=package,
+    )
+    lines = [l for l in proc.stdout.splitlines() if l.startswith(RESULT)]
+    if not lines:
+        tail = "\n".join(proc.stderr.splitlines()[-10:])
+        raise RuntimeError(f"handler subprocess failed (exit {proc.returncode}):\n{tail}")
+    result = json.loads(lines[-1][len(RESULT):])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def lambda_env(nickname, package, extra):
+    """A clean, Lambda-like environment: no local site-packages, region set, user overrides on top."""
+    env = {
+        "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+        "LANG": "C.UTF-8",
+        "AWS_REGION": os.environ.get("AWS_REGION", "us-east-1"),
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+        "AWS_LAMBDA_FUNCTION_NAME": nickname,
+        "LAMBDA_TASK_ROOT": str(package),
+        "HOME": os.environ.get("HOME", "/tmp"),
+    }
+    env.update(extra)
+    return env
+
+
+def bench_function(nickname, args, python, extra_env):
+    if args.no_build:
+        package = ROOT / "lambdas" / nickname / "dist" / "build"
+        if not package.exists():
+            raise FileNotFoundError(f"No built package at {package}; run without --no-build")
+        return measure(nickname, package, args, python, extra_env)
+
+    # Build into a scratch dir: lambdas/<nickname>/dist and its build stamp
+    # belong to deploy_lambda, which uses them to skip unchanged deploys
+    import deploy_lambda
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{nickname}-") as tmp:
+        deploy_lambda.build_lambda(nickname, dist_dir=Path(tmp))
+        return measure(nickname, Path(tmp) / "build", args, python, extra_env)
+
+
+def measure(nickname, package, args, python, extra_env):
+    event = SYNTHETIC_EVENTS.get(nickname, {"httpMethod": "GET", "path": f"/{nickname}"})
+    for item in args.event or []:
+        name, _, path = item.partition("=")
+        if name == nickname:
+            event = json.loads(Path(path).read_text())
+
+    env = lambda_env(nickname, package, extra_env)
+    runs = [run_once(python, package, args.handler, event, args.warm, env) for _ in range(args.runs)]
+    warm = [ms for run in runs for ms in run["warm_ms"]]
+
+    imports = defaultdict(lambda: {"self_ms": 0.0, "cumulative_ms": 0.0})
+    for run in runs:
+        for pkg, times in run["imports"].items():
+            imports[pkg]["self_ms"] += times["self_ms"] / len(runs)
+            imports[pkg]["cumulative_ms"] += times["cumulative_ms"] / len(runs)
+
+    return {
+        "function": nickname,
+        "runs": len(runs),
+        "package_mb": sum(f.stat().st_size for f in package.rglob("*") if f.is_file()) / 1e6,
+        "init_ms": statistics.median(r["init_ms"] for r in runs),
+        "baseline_rss_mb": statistics.median(r["baseline_rss_mb"] for r in runs),
+        "init_rss_mb": statistics.median(r["init_rss_mb"] for r in runs),
+        "first_invoke_ms": statistics.median(r["first_ms"] for r in runs),
+        "warm_invoke_ms": statistics.median(warm) if warm else None,
+        "error": runs[-1]["error"],
+        "imports": dict(sorted(imports.items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True)),
+    }
+
+
+def print_report(results, top):
+    width = max(len(r["function"]) for r in results)
+    print(
+        f"\n{'function'.ljust(width)}  {'pkg MB':>7}  {'init ms':>8}  {'init RSS':>8}  "
+        f"{'1st ms':>8}  {'warm ms':>8}  invoke"
+    )
+    for r in results:
+        warm = f"{r['warm_invoke_ms']:8.2f}" if r["warm_invoke_ms"] is not None else f"{'-':>8}"
+        print(
+            f"{r['function'].ljust(width)}  {r['package_mb']:7.2f}  {r['init_ms']:8.1f}  "
+            f"{r['init_rss_mb']:7.1f}M  {r['first_invoke_ms']:8.2f}  {warm}  {r['error'] or 'ok'}"
+        )
+
+    for r in results:
+        heavy = [(pkg, t) for pkg, t in r["imports"].items() if t["cumulative_ms"] > 0][:top]
+        if not heavy:
+            continue
+        print(f"\n{r['function']}: slowest imports at init (cumulative / self ms)")
+        for pkg, t in heavy:
+            print(f"   {pkg:<28} {t['cumulative_ms']:8.1f}  {t['self_ms']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cold-start benchmark: init time, import breakdown, RSS and first vs warm invoke per handler."
+    )
+    parser.add_argument("nicknames", nargs="*", help="Lambdas to measure (default: every lambdas/*/main.py)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per function (default %(default)s)")
+    parser.add_argument("--warm", type=int, default=20, help="Warm invokes per run (default %(default)s)")
+    parser.add_argument("--handler", default="main.handler")
+    parser.add_argument("--runtime", default=os.environ.get("LAMBDA_RUNTIME", "python3.11"),
+                        help="Interpreter to run (default %(default)s, falling back to this Python)")
+    parser.add_argument("--event", action="append", metavar="NICKNAME=FILE", help="Event JSON for one function")
+    parser.add_argument("--env", action="append", metavar="KEY=VALUE", help="Lambda environment variable")
+    parser.add_argument("--no-build", action="store_true", help="Reuse lambdas/<nickname>/dist/build as is")
+    parser.add_argument("--top", type=int, default=8, help="Imports listed per function (default %(default)s)")
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")  # deploy_lambda creates a client at import
+    os.chdir(ROOT)  # build_lambda resolves lambdas/<nickname> from the repo root
+    python = shutil.which(args.runtime) or sys.executable
+    extra_env = dict(item.partition("=")[::2] for item in args.env or [])
+    nicknames = args.nicknames or sorted(p.parent.name for p in (ROOT / "lambdas").glob("*/main.py"))
+
+    results = [bench_function(n, args, python, extra_env) for n in nicknames]
+    print_report(results, args.top)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"python": python, "results": results}, indent=2) + "\n")
+        print(f"\n📝 Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
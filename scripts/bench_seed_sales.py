@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED_DIR = ROOT / "lambdas" / "seed-sales-data"
+sys.path[:0] = [str(SEED_DIR), str(ROOT / "shared")]
+
+from batchgen import OrderBatchGenerator, day_range  # noqa: E402
+from sinks import SINKS, open_sink  # noqa: E402
+from writer import PipelinedWriter  # noqa: E402
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+def make_entities(n_customers, n_vendors=3, n_products=5):
+    customers = [
+        {
+            "customer_id": f"C{100000 + n}",
+            "addresses": [
+                {
+                    "address_id": f"ADDR-{n}",
+                    "type": "shipping",
+                    "line1": f"{100 + (n % 900)} Demo St",
+                    "city": "Chicago",
+                    "state": "IL",
+                    "postal_code": "60601",
+                    "country": "US",
+                    "is_default": True,
+                }
+            ],
+        }
+        for n in range(1, n_customers + 1)
+    ]
+    vendors = [{"vendor_id": f"V{1000 + n}"} for n in range(1, n_vendors + 1)]
+    products = [
+        {"product_id": f"P{1000 + n}", "unit_price": round(10 + 40.5 * n, 2)}
+        for n in range(1, n_products + 1)
+    ]
+    return customers, vendors, products
+
+
+class NullCollection:
+    """insert_many sink that drops docs, to measure the pipeline without a server."""
+
+    def insert_many(self, docs, ordered=True):
+        return None
+
+
+# ============================================================
+# Baseline: the original per-order loop from main.generate_orders
+# ============================================================
+def legacy_day_orders(day, base, customers, vendors, products, seq):
+    docs = []
+    for _ in range(base):
+        customer = random.choice(customers)
+        vendor = random.choice(vendors)
+        order_date = day + timedelta(
+            hours=random.randint(0, 23),
+            minutes=random.randint(0, 59),
+            seconds=random.randint(0, 59),
+        )
+
+        used = set()
+        line_items = []
+        order_total = 0
+        n_items = random.randint(1, 5)
+
+        for _ in range(n_items):
+            for _ in range(5):
+                product = random.choice(products)
+                if product["product_id"] not in used:
+                    break
+            used.add(product["product_id"])
+
+            qty = random.randint(1, 5)
+            unit_price = product["unit_price"] * (1 + round(random.random() * 0.1 - 0.05, 4))
+            extended = qty * unit_price
+            order_total += extended
+            line_items.append(
+                {
+                    "product_id": product["product_id"],
+                    "quantity": qty,
+                    "unit_price": round(unit_price, 2),
+                    "extended_price": round(extended, 2),
+                }
+            )
+
+        status_roll = random.randint(1, 100)
+        if status_roll > 90:
+            status = "CANCELLED"
+        elif status_roll > 70:
+            status = "SHIPPED"
+        elif status_roll > 40:
+            status = "PAID"
+        else:
+            status = "NEW"
+
+        addr = (customer.get("addresses") or [{}])[0]
+        docs.append(
+            {
+                "order_id": f"SO-{str(seq).zfill(8)}",
+                "customer_id": customer["customer_id"],
+                "vendor_id": vendor["vendor_id"],
+                "order_date": order_date,
+                "status": status,
+                "line_items": line_items,
+                "order_total": round(order_total, 2),
+                "currency": "USD",
+                "payment_method": random.choice(["visa", "mastercard", "amex", "paypal"]),
+                "sales_channel": random.choice(["web", "mobile", "phone", "store"]),
+                "shipping_address": addr,
+                "billing_address": addr,
+                "created_at": order_date,
+                "updated_at": order_date,
+            }
+        )
+        seq += 1
+    return docs
+
+
+def run_legacy(days, counts, customers, vendors, products):
+    out = []
+    seq = 1
+    for day, base in zip(days, counts):
+        docs = legacy_day_orders(day, base, customers, vendors, products, seq)
+        seq += len(docs)
+        out.extend(docs)
+    return out
+
+
+def run_batch_per_day(days, counts, gen):
+    out = []
+    seq = 1
+    for day, base in zip(days, counts):
+        docs = gen.generate_day(day, base, seq)
+        seq += len(docs)
+        out.extend(docs)
+    return out
+
+
+def run_batch_whole(days, counts, gen):
+    return gen.generate_days(days, counts, 1)
+
+
+# ============================================================
+# Reporting
+# ============================================================
+def summarize(docs):
+    n = len(docs)
+    statuses = Counter(d["status"] for d in docs)
+    items = sum(len(d["line_items"]) for d in docs)
+    distinct = sum(len({li["product_id"] for li in d["line_items"]}) for d in docs)
+    return {
+        "orders": n,
+        "items/order": round(items / n, 3),
+        "distinct/order": round(distinct / n, 3),
+        "avg_total": round(sum(d["order_total"] for d in docs) / n, 2),
+        "status%": {k: round(100 * v / n, 1) for k, v in sorted(statuses.items())},
+    }
+
+
+def timed(label, fn, repeat):
+    best = None
+    docs = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        docs = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    rate = len(docs) / best
+    print(f"{label:<18} {len(docs):>9} orders  {best:8.3f}s  {rate:12,.0f} orders/sec")
+    return docs, rate
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ============================================================
+# Commands
+# ============================================================
+def cmd_generate(args):
+    random.seed(args.seed)
+    customers, vendors, products = make_entities(args.customers)
+    gen = OrderBatchGenerator(customers, vendors, products, rng=np.random.default_rng(args.seed))
+
+    days = day_range(datetime.utcnow() - timedelta(days=args.days), args.days)
+    counts = gen.day_order_counts(days, args.weekday_base, args.weekend_base).tolist()
+
+    legacy_docs, legacy_rate = timed("legacy loop", lambda: run_legacy(days, counts, customers, vendors, products), args.repeat)
+    day_docs, day_rate = timed("batch (per day)", lambda: run_batch_per_day(days, counts, gen), args.repeat)
+    _, whole_rate = timed("batch (whole run)", lambda: run_batch_whole(days, counts, gen), args.repeat)
+
+    print()
+    print(f"speedup per day:   {day_rate / legacy_rate:5.1f}x")
+    print(f"speedup whole run: {whole_rate / legacy_rate:5.1f}x")
+    print()
+    print("legacy:", summarize(legacy_docs))
+    print("batch: ", summarize(day_docs))
+
+
+def run_scale_once(scale, args):
+    """Stream one scale factor through the generator and writer; return a result row."""
+    customers, vendors, products = make_entities(args.customers)
+    gen = OrderBatchGenerator(customers, vendors, products, rng=np.random.default_rng(args.seed))
+    days = day_range(datetime.utcnow() - timedelta(days=args.days), args.days)
+    counts = gen.day_order_counts(days, args.weekday_base, args.weekend_base, scale)
+
+    baseline_rss = peak_rss_mb()
+    t0 = time.perf_counter()
+    writer = PipelinedWriter(NullCollection(), writers=args.writers)
+    for chunk in gen.iter_chunks(days, counts, 1, args.chunk_size):
+        writer.submit(chunk)
+    stats = writer.close()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "scale": scale,
+        "orders": stats["docs"],
+        "seconds": round(elapsed, 3),
+        "orders_per_s": round(stats["docs"] / elapsed, 1),
+        "rss_start_mb": round(baseline_rss, 1),
+        "rss_peak_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def cmd_scale(args):
+    if args.single is not None:
+        print(json.dumps(run_scale_once(args.single, args)))
+        return
+
+    # One subprocess per scale factor so each peak RSS reading is independent
+    print(f"{'scale':>8} {'orders':>12} {'seconds':>9} {'orders/sec':>12} {'rss start':>10} {'rss peak':>10}")
+    for scale in args.factors:
+        out = subprocess.run(
+            [
+                sys.executable, __file__,
+                "--days", str(args.days),
+                "--customers", str(args.customers),
+                "--seed", str(args.seed),
+                "scale",
+                "--single", str(scale),
+                "--chunk-size", str(args.chunk_size),
+                "--writers", str(args.writers),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{row['scale']:>8} {row['orders']:>12,} {row['seconds']:>9.2f} {row['orders_per_s']:>12,.0f} "
+            f"{row['rss_start_mb']:>8.1f}MB {row['rss_peak_mb']:>8.1f}MB"
+        )
+
+
+def connect(mongo_uri):
+    """A real server when a URI is given, otherwise an in-process mongomock stand-in."""
+    if mongo_uri:
+        from pymongo import MongoClient
+
+        return MongoClient(mongo_uri)
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("No --mongo-uri / MONGO_URI given and mongomock is not installed.")
+    return mongomock.MongoClient()
+
+
+def load_seed_main():
+    # boto3 clients created on an SSM cache miss need a region; any will do locally
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    import main
+
+    return main
+
+
+def opcounters(client):
+    try:
+        return client.admin.command("serverStatus")["opcounters"]
+    except Exception:
+        return None  # stand-ins without serverStatus
+
+
+def cmd_rebuild(args):
+    seed = load_seed_main()
+    client = connect(args.mongo_uri)
+    db = client[args.db]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed.ensure_base_customers(db)
+        seed.ensure_vendors(db)
+        seed.ensure_products_and_inventory(db)
+        seed.add_synthetic_customers(db, args.customers)
+
+    print(f"{'mode':<8} {'wall':>8} {'deleted':>9} {'inserted':>9} {'op inserts':>11} {'op deletes':>11} {'op commands':>12}")
+    for mode in ("full", "rebuild"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Prime so the measured run replaces an existing dataset
+            seed.generate_orders(db, scale=args.scale, days_back=args.days, mode=mode)
+            existing = db.orders.count_documents({})
+            ops0 = opcounters(client)
+            t0 = time.perf_counter()
+            stats = seed.generate_orders(db, scale=args.scale, days_back=args.days, mode=mode)
+            elapsed = time.perf_counter() - t0
+            ops1 = opcounters(client)
+
+        deleted = existing if mode == "full" else 0
+        if ops0 and ops1:
+            d = {k: ops1[k] - ops0[k] for k in ("insert", "delete", "command")}
+        else:
+            d = {"insert": "n/a", "delete": "n/a", "command": "n/a"}
+        print(
+            f"{mode:<8} {elapsed:>7.2f}s {deleted:>9,} {stats['docs']:>9,} "
+            f"{d['insert']:>11} {d['delete']:>11} {d['command']:>12}"
+        )
+
+
+def cmd_profiles(args):
+    if not args.mongo_uri:
+        sys.exit("profiles needs a real server: pass --mongo-uri or set MONGO_URI.")
+    seed = load_seed_main()
+    from pymongo import MongoClient
+
+    print(f"{'profile':<8} {'orders':>9} {'wall':>8} {'docs/s':>10} {'batch p50':>10} {'batch p95':>10} {'compression':>12}")
+    for profile in seed.MONGO_PROFILES:
+        client = MongoClient(args.mongo_uri, **seed.mongo_client_options(profile))
+        db = client[args.db]
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed.ensure_base_customers(db)
+            seed.ensure_vendors(db)
+            seed.ensure_products_and_inventory(db)
+            seed.add_synthetic_customers(db, int(round(seed.EXTRA_SYNTHETIC_CUSTOMERS * args.scale)))
+            t0 = time.perf_counter()
+            stats = seed.generate_orders(
+                db,
+                {"writers": args.writers},
+                scale=args.scale,
+                days_back=args.days,
+                mode="rebuild",
+            )
+            elapsed = time.perf_counter() - t0
+        compression = seed.mongo_client_options(profile).get("compressors", "none")
+        print(
+            f"{profile:<8} {stats['docs']:>9,} {elapsed:>7.2f}s {stats['docs'] / elapsed:>10,.0f} "
+            f"{stats['batch_ms_p50']:>8.1f}ms {stats['batch_ms_p95']:>8.1f}ms {compression:>12}"
+        )
+        client.close()
+
+
+# ============================================================
+# Suite: every seed phase + the handler, with write round trips
+# ============================================================
+WRITE_METHODS = {
+    "insert_one": lambda args, result: 1,
+    "insert_many": lambda args, result: len(args[0]),
+    "update_one": lambda args, result: 1,
+    "update_many": lambda args, result: getattr(result, "modified_count", 0),
+    "replace_one": lambda args, result: 1,
+    "delete_one": lambda args, result: getattr(result, "deleted_count", 0),
+    "delete_many": lambda args, result: getattr(result, "deleted_count", 0),
+    "bulk_write": lambda args, result: len(args[0]),
+    "create_index": lambda args, result: 0,
+    "create_indexes": lambda args, result: 0,
+    "drop": lambda args, result: 0,
+    "rename": lambda args, result: 0,
+}
+
+SUITE_PHASES = [
+    "ensure_base_customers",
+    "ensure_vendors",
+    "ensure_products_and_inventory",
+    "add_synthetic_customers",
+    "generate_orders",
+]
+
+
+class WriteCounter:
+    """Write calls (driver round trips) and documents touched, per phase."""
+
+    def __init__(self):
+        self.phase = "setup"
+        self.calls = Counter()
+        self.docs = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, n_docs):
+        with self._lock:
+            self.calls[self.phase] += 1
+            self.docs[self.phase] += n_docs
+
+
+class CountingCollection:
+    def __init__(self, coll, counter):
+        self._coll = coll
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._coll, name)
+        docs_of = WRITE_METHODS.get(name)
+        if docs_of is None:
+            return attr
+
+        def counted(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            self._counter.record(docs_of(args, result))
+            return result
+
+        return counted
+
+
+class CountingDatabase:
+    """Wraps a pymongo or mongomock Database so every collection counts writes."""
+
+    def __init__(self, db, counter):
+        self._db = db
+        self._counter = counter
+
+    def __getitem__(self, name):
+        return CountingCollection(self._db[name], self._counter)
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if hasattr(attr, "insert_many"):
+            return CountingCollection(attr, self._counter)
+        return attr
+
+
+def run_suite_once(scale, args):
+    seed = load_seed_main()
+    client = connect(args.mongo_uri)
+    client.drop_database(args.db)
+    counter = WriteCounter()
+    db = CountingDatabase(client[args.db], counter)
+    seed._MONGO_CACHE.update({p: (client, db) for p in seed.MONGO_PROFILES})
+
+    synthetic = int(round(seed.EXTRA_SYNTHETIC_CUSTOMERS * scale))
+    calls = {
+        "ensure_base_customers": lambda: seed.ensure_base_customers(db),
+        "ensure_vendors": lambda: seed.ensure_vendors(db),
+        "ensure_products_and_inventory": lambda: seed.ensure_products_and_inventory(db),
+        "add_synthetic_customers": lambda: seed.add_synthetic_customers(db, synthetic),
+        "generate_orders": lambda: seed.generate_orders(db, scale=scale, days_back=args.days),
+    }
+    event = {"scale_factor": scale, "days_back": args.days}
+
+    phases = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Cold: each phase on an empty database; then the whole handler again
+        # on the populated one, which is what a scheduled re-run costs.
+        for name in SUITE_PHASES + ["handler"]:
+            counter.phase = name
+            t0 = time.perf_counter()
+            if name == "handler":
+                seed.handler(event, None)
+            else:
+                calls[name]()
+            elapsed = time.perf_counter() - t0
+            phases[name] = {
+                "seconds": round(elapsed, 4),
+                "docs_written": counter.docs[name],
+                "write_round_trips": counter.calls[name],
+                "docs_per_s": round(counter.docs[name] / elapsed, 1) if elapsed > 0 else 0.0,
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+            }
+
+    return {
+        "scale": scale,
+        "days_back": args.days,
+        "orders": client[args.db].orders.count_documents({}),
+        "customers": client[args.db].customers.count_documents({}),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "phases": phases,
+    }
+
+
+def cmd_suite(args):
+    if args.single is not None:
+        print(json.dumps(run_suite_once(args.single, args)))
+        return
+
+    results = []
+    for scale in args.factors:
+        cmd = [
+            sys.executable, __file__,
+            "--days", str(args.days),
+            "suite",
+            "--single", str(scale),
+            "--db", args.db,
+        ]
+        if args.mongo_uri:
+            cmd += ["--mongo-uri", args.mongo_uri]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(row)
+
+        print(f"scale {scale}: {row['orders']:,} orders, {row['customers']:,} customers, peak RSS {row['peak_rss_mb']}MB")
+        for name, p in row["phases"].items():
+            print(
+                f"  {name:<31} {p['seconds']:>9.3f}s {p['docs_written']:>10,} docs "
+                f"{p['docs_per_s']:>12,.0f} docs/s {p['write_round_trips']:>6} writes"
+            )
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "backend": "mongodb" if args.mongo_uri else "mongomock",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.out}")
+
+
+def cmd_snapshot(args):
+    if not args.mongo_uri:
+        sys.exit("snapshot needs a real server: pass --mongo-uri or set MONGO_URI.")
+    import tempfile
+
+    seed = load_seed_main()
+    from pymongo import MongoClient
+
+    client = MongoClient(args.mongo_uri, **seed.mongo_client_options("bulk"))
+    db = client[args.db]
+    event = {"scale_factor": args.scale, "days_back": args.days}
+    seed._MONGO_CACHE.update({p: (client, db) for p in seed.MONGO_PROFILES})
+
+    with tempfile.TemporaryDirectory() as snap_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            seed.run_seed(event, None)
+            t1 = time.perf_counter()
+            manifest = seed.write_snapshot(db, snap_dir)
+            t2 = time.perf_counter()
+            seed.run_seed({"mode": "restore", "snapshot_uri": snap_dir}, None)
+            t3 = time.perf_counter()
+
+    docs = sum(e["documents"] for e in manifest["collections"].values())
+    size = sum(e["bytes"] for e in manifest["collections"].values())
+    generate = t1 - t0
+    print(f"{docs:,} docs, {size / 1e6:.1f} MB of BSON")
+    print(f"{'generate + insert':<18} {generate:>7.2f}s {docs / generate:>10,.0f} docs/s")
+    print(f"{'write snapshot':<18} {t2 - t1:>7.2f}s {docs / (t2 - t1):>10,.0f} docs/s")
+    print(f"{'restore':<18} {t3 - t2:>7.2f}s {docs / (t3 - t2):>10,.0f} docs/s")
+    print(f"restore speedup: {generate / (t3 - t2):.1f}x")
+    client.close()
+
+
+# ============================================================
+# File sinks
+# ============================================================
+def cmd_sinks(args):
+    import tempfile
+
+    customers, vendors, products = make_entities(args.customers)
+    gen = OrderBatchGenerator(customers, vendors, products, rng=np.random.default_rng(args.seed))
+    days = day_range(datetime.utcnow() - timedelta(days=args.days), args.days)
+    counts = gen.day_order_counts(days, args.weekday_base, args.weekend_base, args.scale)
+
+    # Generate once so every sink is timed on encoding + I/O alone
+    chunks = list(gen.iter_chunks(days, counts, 1, args.chunk_size))
+    total = sum(len(c) for c in chunks)
+    print(f"{total} orders in {len(chunks)} chunks of up to {args.chunk_size}")
+    print()
+    print(f"{'sink':<22} {'wall':>8} {'docs/s':>10} {'MB':>8} {'bytes/order':>12}")
+
+    for kind in args.sinks:
+        with tempfile.TemporaryDirectory() as out_dir:
+            sink = open_sink(kind, out_dir)
+            t0 = time.perf_counter()
+            for chunk in chunks:
+                sink.submit(chunk)
+            stats = sink.close()
+            wall = time.perf_counter() - t0
+        print(
+            f"{kind:<22} {wall:>7.2f}s {total / wall:>10.0f} "
+            f"{stats['bytes'] / 1e6:>8.1f} {stats['bytes'] / total:>12.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for lambdas/seed-sales-data.")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--weekday-base", type=int, default=80)
+    parser.add_argument("--weekend-base", type=int, default=40)
+    parser.add_argument("--customers", type=int, default=205)
+    parser.add_argument("--seed", type=int, default=42)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_gen = sub.add_parser("generate", help="Legacy per-order loop vs NumPy batches (orders/sec)")
+    p_gen.add_argument("--repeat", type=int, default=3)
+    p_gen.set_defaults(func=cmd_generate)
+
+    p_scale = sub.add_parser("scale", help="Streaming memory/throughput per scale factor")
+    p_scale.add_argument("--factors", type=float, nargs="+", default=[0.1, 1, 10, 100])
+    p_scale.add_argument("--chunk-size", type=int, default=5000)
+    p_scale.add_argument("--writers", type=int, default=4)
+    p_scale.add_argument("--single", type=float, help=argparse.SUPPRESS)
+    p_scale.set_defaults(func=cmd_scale)
+
+    p_rebuild = sub.add_parser("rebuild", help="In-place delete_many reseed vs stage-and-swap rebuild")
+    p_rebuild.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"), help="Default: mongomock stand-in")
+    p_rebuild.add_argument("--db", default="seed_bench")
+    p_rebuild.add_argument("--scale", type=float, default=1.0)
+    p_rebuild.set_defaults(func=cmd_rebuild)
+
+    p_prof = sub.add_parser("profiles", help="Order load throughput: default vs bulk get_mongo profile")
+    p_prof.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"))
+    p_prof.add_argument("--db", default="seed_bench")
+    p_prof.add_argument("--scale", type=float, default=5.0)
+    p_prof.add_argument("--writers", type=int, default=4)
+    p_prof.set_defaults(func=cmd_profiles)
+
+    p_snap = sub.add_parser("snapshot", help="Generate + insert vs raw BSON snapshot restore")
+    p_snap.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"))
+    p_snap.add_argument("--db", default="seed_bench")
+    p_snap.add_argument("--scale", type=float, default=5.0)
+    p_snap.set_defaults(func=cmd_snapshot)
+
+    p_suite = sub.add_parser("suite", help="Every seed phase + handler at several scales, written to JSON")
+    p_suite.add_argument("--factors", type=float, nargs="+", default=[0.1, 0.5, 1])
+    p_suite.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"), help="Default: mongomock stand-in")
+    p_suite.add_argument("--db", default="seed_bench")
+    p_suite.add_argument("--out", default="bench_seed_sales.json")
+    p_suite.add_argument("--single", type=float, help=argparse.SUPPRESS)
+    p_suite.set_defaults(func=cmd_suite)
+
+    p_sinks = sub.add_parser("sinks", help="Encode + write throughput and output size per file sink")
+    p_sinks.add_argument("--sinks", nargs="+", default=[k for k in SINKS if k != "mongo"])
+    p_sinks.add_argument("--scale", type=float, default=10.0)
+    p_sinks.add_argument("--chunk-size", type=int, default=5000)
+    p_sinks.set_defaults(func=cmd_sinks)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+OPENAPI_DIR = ROOT / "openapi"
+LAMBDAS_DIR = ROOT / "lambdas"
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PATH_PARAM = re.compile(r"\{([^{}/]+)\}")
+
+
+class SpecError(Exception):
+    def __init__(self, spec_file, problems):
+        self.problems = problems
+        super().__init__(f"{spec_file}: " + "; ".join(problems))
+
+
+# ============================================================
+# $ref resolution
+# ============================================================
+def _pointer(spec, ref):
+    if not ref.startswith("#/"):
+        raise KeyError(f"only local $refs are supported: {ref}")
+    node = spec
+    try:
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+    except (KeyError, TypeError):
+        raise KeyError(f"dangling $ref {ref}") from None
+    return node
+
+
+def resolve_refs(spec):
+    """
+    The spec with every local $ref inlined. Raises KeyError for a dangling
+    ref and ValueError for a cycle (inlining it would never terminate).
+    """
+    def resolve(node, trail):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                if ref in trail:
+                    raise ValueError(f"$ref cycle: {' -> '.join(trail + (ref,))}")
+                return resolve(_pointer(spec, ref), trail + (ref,))
+            return {k: resolve(v, trail) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v, trail) for v in node]
+        return node
+
+    resolved = resolve(spec, ())
+    # Everything referenced is now inline; only securitySchemes (referenced by name) stay
+    components = resolved.pop("components", None) or {}
+    if components.get("securitySchemes"):
+        resolved["components"] = {"securitySchemes": components["securitySchemes"]}
+    return resolved
+
+
+# ============================================================
+# Validation
+# ============================================================
+def operations(spec):
+    for path, item in (spec.get("paths") or {}).items():
+        for method in HTTP_METHODS:
+            if isinstance((item or {}).get(method), dict):
+                yield path, method, item, item[method]
+
+
+def validate(spec, lambdas_dir=LAMBDAS_DIR):
+    """Problems that would break API Gateway import or Lambda resolution (empty when valid)."""
+    problems = []
+    if not str(spec.get("openapi", "")).startswith("3."):
+        problems.append("'openapi' must be a 3.x version")
+    info = spec.get("info") or {}
+    if not info.get("title") or not info.get("version"):
+        problems.append("info.title and info.version are required")
+    if not spec.get("paths"):
+        problems.append("no paths defined")
+
+    operation_ids = set()
+    for path, method, item, op in operations(spec):
+        where = f"{method.upper()} {path}"
+        if not path.startswith("/"):
+            problems.append(f"{where}: path must start with '/'")
+        nickname = op.get("x-lambda-nickname")
+        if not nickname:
+            problems.append(f"{where}: missing x-lambda-nickname")
+        elif not (lambdas_dir / nickname).is_dir():
+            problems.append(f"{where}: x-lambda-nickname {nickname!r} has no lambdas/{nickname}/")
+        if not op.get("responses"):
+            problems.append(f"{where}: no responses")
+        op_id = op.get("operationId")
+        if op_id is not None:
+            if op_id in operation_ids:
+                problems.append(f"{where}: duplicate operationId {op_id!r}")
+            operation_ids.add(op_id)
+
+        params = list(item.get("parameters") or []) + list(op.get("parameters") or [])
+        declared = {p.get("name") for p in params if p.get("in") == "path"}
+        for name in PATH_PARAM.findall(path):
+            if name not in declared:
+                problems.append(f"{where}: path parameter {{{name}}} is not declared")
+        for p in params:
+            if p.get("in") == "path" and not p.get("required"):
+                problems.append(f"{where}: path parameter {p.get('name')!r} must be required")
+    return problems
+
+
+# ============================================================
+# Route table
+# ============================================================
+def route_table(spec):
+    """
+    One entry per operation: path, method, x-lambda-nickname, path params
+    and an anchored regex for matching request paths. Literal paths sort
+    before templated ones, so /a/b wins over /a/{id} when both exist.
+    """
+    routes = []
+    for path, method, _, op in operations(spec):
+        params = PATH_PARAM.findall(path)
+        pattern = "^" + PATH_PARAM.sub(r"(?P<\1>[^/]+)", re.escape(path).replace(r"\{", "{").replace(r"\}", "}")) + "$"
+        routes.append({
+            "path": path,
+            "method": method.upper(),
+            "lambda": op.get("x-lambda-nickname"),
+            "operation_id": op.get("operationId"),
+            "path_params": params,
+            "pattern": pattern,
+        })
+    routes.sort(key=lambda r: (len(r["path_params"]) > 0, r["path"], r["method"]))
+    return routes
+
+
+# ============================================================
+# Compile
+# ============================================================
+def minified(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def compile_spec(spec_file: Path, out_dir: Path = None, lambdas_dir=LAMBDAS_DIR):
+    """
+    Parse, validate and $ref-resolve one spec; write openapi.json (minified)
+    and routes.json next to it under dist/. Returns the artifact paths and
+    their combined content hash.
+    """
+    spec_file = Path(spec_file)
+    out_dir = Path(out_dir or spec_file.parent / "dist")
+    try:
+        spec = yaml.safe_load(spec_file.read_text())
+    except yaml.YAMLError as e:
+        raise SpecError(spec_file, [f"invalid YAML: {e}"]) from e
+    if not isinstance(spec, dict):
+        raise SpecError(spec_file, ["not an OpenAPI document"])
+
+    try:
+        resolved = resolve_refs(spec)
+    except (KeyError, ValueError) as e:
+        raise SpecError(spec_file, [str(e).strip("'\"")]) from e
+    problems = validate(resolved, lambdas_dir)
+    if problems:
+        raise SpecError(spec_file, problems)
+
+    spec_json = minified(resolved)
+    routes_json = minified(route_table(resolved))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "openapi.json").write_bytes(spec_json)
+    (out_dir / "routes.json").write_bytes(routes_json)
+
+    digest = hashlib.sha256(spec_json + b"\0" + routes_json).hexdigest()
+    return {
+        "nickname": spec_file.parent.name,
+        "source": spec_file,
+        "spec": out_dir / "openapi.json",
+        "routes": out_dir / "routes.json",
+        "sha256": digest,
+        "operations": len(json.loads(routes_json)),
+        "size": (len(spec_file.read_bytes()), len(spec_json)),
+    }
+
+
+def spec_files(nicknames=None, openapi_dir=OPENAPI_DIR):
+    if nicknames:
+        return [openapi_dir / n / "openapi.yaml" for n in nicknames]
+    return sorted(openapi_dir.glob("*/openapi.yaml"))
+
+
+def compile_all(files, workers=8):
+    """Compile specs concurrently; returns (compiled, errors)."""
+    compiled, errors = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(compile_spec, f) for f in files]
+        for f, future in zip(files, futures):
+            try:
+                compiled.append(future.result())
+            except (SpecError, OSError) as e:
+                errors.append(e)
+    return compiled, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate OpenAPI specs and compile them to JSON + route tables.")
+    parser.add_argument("nicknames", nargs="*", help="OpenAPI nicknames (default: every openapi/*/openapi.yaml)")
+    args = parser.parse_args()
+
+    compiled, errors = compile_all(spec_files(args.nicknames))
+    for c in compiled:
+        yaml_size, json_size = c["size"]
+        print(
+            f"✅ {c['nickname']}: {c['operations']} operations, "
+            f"{yaml_size:,} B yaml → {json_size:,} B json ({c['sha256'][:12]})"
+        )
+        print(f"   → {c['spec'].relative_to(ROOT)}, {c['routes'].relative_to(ROOT)}")
+    for e in errors:
+        print(f"❌ {e}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
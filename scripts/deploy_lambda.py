@@ -2,39 +2,349 @@
 
 import argparse
 import boto3
+import fnmatch
+import hashlib
 import json
+import os
+import platform
+import re
 import shutil
 import subprocess
+import sys
+import time
 from pathlib import Path
-from zipfile import ZipFile, ZIP_DEFLATED
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+import yaml
+
+from compile_openapi import minified, operations, resolve_refs, spec_files
+
+# Modules under shared/ are copied into every Lambda package
+SHARED_DIR = Path(__file__).resolve().parent.parent / "shared"
+sys.path.insert(0, str(SHARED_DIR))
+
+from ssm_runtime import default_resolver, runtime_param  # noqa: E402
+
+# Installed dependencies, one directory per requirements hash, plus pip's wheel cache
+CACHE_DIR = Path(os.environ.get("LAMBDA_BUILD_CACHE", "~/.cache/aws-openapi")).expanduser()
+BUILD_STAMP = "build.json"
+BUNDLED_SPEC = "openapi.json"  # read by shared/openapi_runtime.py
+LAYER_SUFFIX = "-deps"
+
+# ============================================================
+# Packaging defaults
+# ============================================================
+# Prune rules (gitignore-style globs): no "/" matches a file name anywhere,
+# a leading "/" anchors at the package root, "!" keeps a file an earlier
+# rule removed. lambdas/<nickname>/prune.txt appends its own rules.
+DEFAULT_PRUNE = (
+    "__pycache__/*",  # recompiled for the target runtime below
+    "*.dist-info/RECORD",
+    "*.dist-info/INSTALLER",
+    "*.dist-info/REQUESTED",
+    "*.dist-info/LICENSE*",
+    "*.dist-info/licenses/*",
+    "tests/*",
+    "*.pyi",
+    "py.typed",
+    "*.c",
+    "*.h",
+    "*.pyx",
+    "*.pxd",
+    "/bin/*",
+)
+PRUNE_FILE = "prune.txt"
+
+DEFAULT_PACKAGING = {
+    "runtime": os.environ.get("LAMBDA_RUNTIME", "python3.11"),
+    "architecture": os.environ.get("LAMBDA_ARCHITECTURE", "x86_64"),
+    "optimize": 0,  # 1/2 write sourceless, -O/-OO compiled modules
+    "compress_level": 6,
+}
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)  # fixed timestamp for reproducible zips
+MACHINES = {"x86_64": "x86_64", "arm64": "aarch64"}  # Lambda architecture -> wheel/ELF machine name
 
 lambda_client = boto3.client("lambda")
-ssm = boto3.client("ssm")
 
 
-def install_dependencies(lambda_dir: Path, build_dir: Path):
+# ============================================================
+# Hashing
+# ============================================================
+def source_files(lambda_dir: Path):
+    """Files copied into the package, in copy order (later names win)."""
+    return sorted(SHARED_DIR.glob("*.py")) + sorted(lambda_dir.glob("*.py"))
+
+
+def requirements_hash(req_file: Path) -> str:
+    """Dependencies are keyed on requirements.txt plus the interpreter pip installs for."""
+    h = hashlib.sha256()
+    h.update(f"{platform.system()}-{platform.machine()}-py{sys.version_info.major}.{sys.version_info.minor}".encode())
+    h.update(req_file.read_bytes())
+    return h.hexdigest()
+
+
+def bundled_spec(nickname: str):
+    """
+    The operations routed to this Lambda across every openapi/*/openapi.yaml,
+    $refs resolved, as minified JSON for openapi_runtime; None if no spec
+    references it.
+    """
+    paths, info, version = {}, {}, "3.0.3"
+    for spec_file in spec_files():
+        spec = resolve_refs(yaml.safe_load(spec_file.read_text()))
+        for path, method, _, op in operations(spec):
+            if op.get("x-lambda-nickname") == nickname:
+                paths.setdefault(path, {})[method] = op
+                info, version = info or spec.get("info") or {}, spec.get("openapi", version)
+    if not paths:
+        return None
+    return minified({"openapi": version, "info": info, "paths": paths})
+
+
+def build_hash(lambda_dir: Path, layer: bool = False, pkg: dict = None) -> str:
+    h = hashlib.sha256()
+    if layer:
+        h.update(b"layer\0")
+    h.update(json.dumps(pkg or DEFAULT_PACKAGING, sort_keys=True).encode() + b"\0")
+    h.update(json.dumps(prune_rules(lambda_dir)).encode() + b"\0")
+    for file in source_files(lambda_dir):
+        h.update(file.name.encode() + b"\0")
+        h.update(file.read_bytes() + b"\0")
+    h.update((bundled_spec(lambda_dir.name) or b"") + b"\0")
     req_file = lambda_dir / "requirements.txt"
     if req_file.exists():
-        print("📦 Installing dependencies from requirements.txt...")
-        subprocess.run(
-            [
-                "pip",
-                "install",
-                "--target",
-                str(build_dir),
-                "-r",
-                str(req_file),
-                "--upgrade",
-            ],
-            check=True,
+        h.update(requirements_hash(req_file).encode())
+    return h.hexdigest()
+
+
+def read_stamp(dist_dir: Path) -> dict:
+    try:
+        return json.loads((dist_dir / BUILD_STAMP).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def write_stamp(dist_dir: Path, stamp: dict):
+    (dist_dir / BUILD_STAMP).write_text(json.dumps(stamp, indent=2) + "\n")
+
+
+# ============================================================
+# Packaging: prune, precompile, deterministic zip
+# ============================================================
+def prune_rules(lambda_dir: Path):
+    rules = list(DEFAULT_PRUNE)
+    prune_file = lambda_dir / PRUNE_FILE
+    if prune_file.exists():
+        for line in prune_file.read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                rules.append(line)
+    return rules
+
+
+def _rule_matches(rule: str, rel: str) -> bool:
+    if rule.startswith("/"):
+        return fnmatch.fnmatchcase(rel, rule[1:])
+    if "/" not in rule:
+        return fnmatch.fnmatchcase(rel.rsplit("/", 1)[-1], rule)
+    return fnmatch.fnmatchcase(rel, rule) or fnmatch.fnmatchcase(rel, "*/" + rule)
+
+
+def prune(root: Path, rules, runtime: str):
+    """
+    Delete files under root matched by the rules (last matching rule wins),
+    plus extension modules built for other CPython versions than the runtime.
+
+    Raises RuntimeError, before deleting anything, if that would remove every
+    build of an extension module: the dependencies were installed for another
+    interpreter and the package would fail to import on Lambda.
+    """
+    abi = "cpython-" + runtime.replace("python", "").replace(".", "")
+    other_abi = re.compile(r"\.cpython-\d+[^.]*\.so$")
+    extension = re.compile(r"(\.(cpython-\d+[^.]*|abi3))?\.so$")
+    dropped, kept, abi_only = [], set(), set()
+    for file in sorted(root.rglob("*")):
+        if not file.is_file():
+            continue
+        rel = file.relative_to(root).as_posix()
+        wrong_abi = bool(other_abi.search(rel)) and abi not in rel
+        drop, ruled = wrong_abi, False
+        for rule in rules:
+            keep = rule.startswith("!")
+            if _rule_matches(rule[1:] if keep else rule, rel):
+                drop, ruled = not keep, True
+        if drop:
+            dropped.append(file)
+            if wrong_abi and not ruled:
+                abi_only.add(extension.sub("", rel))
+        elif rel.endswith(".so"):
+            kept.add(extension.sub("", rel))
+
+    stranded = sorted(abi_only - kept)
+    if stranded:
+        raise RuntimeError(
+            f"❌ No {abi} build of {len(stranded)} extension module(s), e.g. {stranded[0]}. "
+            f"Dependencies are installed with the interpreter running this script "
+            f"(python{sys.version_info.major}.{sys.version_info.minor}); run it with {runtime}"
+        )
+    for file in dropped:
+        file.unlink()
+
+    # Remove directories left empty, deepest first
+    for folder in sorted((d for d in root.rglob("*") if d.is_dir()), key=lambda d: len(d.parts), reverse=True):
+        if not any(folder.iterdir()):
+            folder.rmdir()
+
+
+def check_platform(root: Path, architecture: str):
+    """
+    Raise RuntimeError if a compiled dependency was installed for another
+    platform than Lambda's Linux on `architecture`. Dependencies are
+    installed with the host's pip, so a deploy from macOS or the other
+    architecture would ship wheels that cannot import.
+    """
+    machine = MACHINES[architecture]
+    wheel_platform = re.compile(rf"^(many)?linux(_\d+_\d+|\d+)?_{machine}$")
+    foreign = set()
+    for wheel in root.glob("*.dist-info/WHEEL"):
+        meta = wheel.read_text().splitlines()
+        if "Root-Is-Purelib: true" in meta:
+            continue
+        platforms = {line.split("-")[-1].strip() for line in meta if line.startswith("Tag:")}
+        if platforms and not any(wheel_platform.match(p) for platform in platforms for p in platform.split(".")):
+            foreign.add(f"{wheel.parent.name.split('-')[0]} ({', '.join(sorted(platforms))})")
+    for so in root.rglob("*.cpython-*.so"):
+        if not so.name.endswith(f"-{machine}-linux-gnu.so"):
+            foreign.add(so.relative_to(root).as_posix())
+    if foreign:
+        raise RuntimeError(
+            f"❌ Dependencies built for another platform than linux/{architecture}: {', '.join(sorted(foreign)[:5])}. "
+            f"Build on (or in a container for) Linux {machine}, or pass a matching --architecture"
         )
 
 
-def build_lambda(nickname: str) -> Path:
+def precompile(root: Path, runtime: str, optimize: int):
+    """
+    Compile every module with the runtime's interpreter, so cold starts
+    never compile on Lambda's read-only filesystem.
+
+    optimize=0 writes __pycache__ .pyc files with unchecked hashes: the
+    runtime loads them without comparing source timestamps, which the
+    fixed zip timestamps would otherwise invalidate. optimize=1/2 strips
+    asserts (and docstrings) and writes sourceless .pyc files next to the
+    modules, replacing the .py sources, because Lambda's interpreter only
+    loads __pycache__ .opt-N files under -O.
+    """
+    python = shutil.which(runtime)
+    if python is None:
+        print(f"⚠️  {runtime} not found on PATH; skipping bytecode precompilation")
+        return False
+
+    cmd = [python, "-m", "compileall", "-q", "-j", "0", "--invalidation-mode", "unchecked-hash"]
+    if optimize:
+        cmd += ["-b", "-o", str(optimize)]
+    subprocess.run(cmd + [str(root)], check=True)
+
+    if optimize:
+        for source in root.rglob("*.py"):
+            if source.with_suffix(".pyc").exists():
+                source.unlink()
+    return True
+
+
+def write_zip(root: Path, zip_path: Path, compress_level: int, prefix: str = ""):
+    """Zip root's files in sorted order with fixed timestamps and permissions."""
+    with ZipFile(zip_path, "w", compression=ZIP_DEFLATED, compresslevel=compress_level, allowZip64=True) as zipf:
+        for file in sorted(f for f in root.rglob("*") if f.is_file()):
+            info = ZipInfo(prefix + file.relative_to(root).as_posix(), date_time=ZIP_EPOCH)
+            info.compress_type = ZIP_DEFLATED
+            mode = 0o755 if os.access(file, os.X_OK) else 0o644
+            info.external_attr = (0o100000 | mode) << 16
+            with open(file, "rb") as f:
+                zipf.writestr(info, f.read(), compresslevel=compress_level)
+
+
+def tree_size(root: Path):
+    files = [f for f in root.rglob("*") if f.is_file()]
+    return len(files), sum(f.stat().st_size for f in files)
+
+
+def package(root: Path, zip_path: Path, rules, pkg: dict, prefix: str = "") -> Path:
+    """Prune, precompile and zip root into zip_path, printing sizes after each step."""
+    steps = [("staged", *tree_size(root))]
+    check_platform(root, pkg.get("architecture", DEFAULT_PACKAGING["architecture"]))
+    prune(root, rules, pkg["runtime"])
+    steps.append(("pruned", *tree_size(root)))
+    if precompile(root, pkg["runtime"], pkg["optimize"]):
+        steps.append((f"compiled (-O{pkg['optimize']})" if pkg["optimize"] else "compiled", *tree_size(root)))
+
+    print(f"📦 Creating ZIP file: {zip_path}")
+    write_zip(root, zip_path, pkg["compress_level"], prefix)
+    steps.append((f"zipped (level {pkg['compress_level']})", steps[-1][1], zip_path.stat().st_size))
+
+    print(f"📏 {zip_path.name}")
+    for step, files, size in steps:
+        print(f"   {step:<18} {files:>7} files  {size / 1e6:9.2f} MB")
+    return zip_path
+
+
+# ============================================================
+# Build
+# ============================================================
+def cached_dependencies(lambda_dir: Path):
+    """
+    Install requirements.txt once per requirements hash into CACHE_DIR/deps/<hash>
+    and return that directory (None without requirements). Wheels go through
+    pip's cache in CACHE_DIR/pip, so a changed requirements file only
+    downloads what is new.
+    """
+    req_file = lambda_dir / "requirements.txt"
+    if not req_file.exists():
+        return None
+
+    deps_dir = CACHE_DIR / "deps" / requirements_hash(req_file)
+    if (deps_dir / ".complete").exists():
+        print(f"📦 Reusing cached dependencies: {deps_dir}")
+        return deps_dir
+
+    print("📦 Installing dependencies from requirements.txt...")
+    # Per-process temp dir: parallel builds may share a requirements hash
+    tmp_dir = deps_dir.with_name(f"{deps_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--target",
+            str(tmp_dir),
+            "-r",
+            str(req_file),
+            "--cache-dir",
+            str(CACHE_DIR / "pip"),
+        ],
+        check=True,
+    )
+    (tmp_dir / ".complete").touch()
+    if (deps_dir / ".complete").exists():
+        shutil.rmtree(tmp_dir)  # another build finished the same install first
+    else:
+        shutil.rmtree(deps_dir, ignore_errors=True)
+        tmp_dir.rename(deps_dir)
+    return deps_dir
+
+
+def build_lambda(
+    nickname: str, digest: str = None, layer: bool = False, pkg: dict = None, dist_dir: Path = None
+) -> Path:
     lambda_dir = Path(f"lambdas/{nickname}").resolve()
 
-    # dist/ holds the zip; build/ holds the actual payload contents
-    dist_dir = lambda_dir / "dist"
+    # dist/ holds the zip; build/ holds the actual payload contents. Callers
+    # that only need the payload (benchmarks) pass their own dist_dir so the
+    # deployed build and its stamp are left alone.
+    dist_dir = Path(dist_dir) if dist_dir else lambda_dir / "dist"
     build_dir = dist_dir / "build"
     dist_zip = dist_dir / f"{nickname}.zip"
 
@@ -43,25 +353,130 @@ def build_lambda(nickname: str) -> Path:
         shutil.rmtree(dist_dir)
     build_dir.mkdir(parents=True)
 
-    # Copy handler .py files into build_dir
-    for file in lambda_dir.glob("*.py"):
+    # Copy cached deps (unless they ship as a layer), then shared modules,
+    # handler .py files and the Lambda's slice of the spec, into build_dir
+    deps_dir = None if layer else cached_dependencies(lambda_dir)
+    if deps_dir:
+        shutil.copytree(deps_dir, build_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".complete"))
+    for file in source_files(lambda_dir):
         shutil.copy(file, build_dir)
+    spec = bundled_spec(nickname)
+    if spec:
+        (build_dir / BUNDLED_SPEC).write_bytes(spec)
 
-    # Install deps into build_dir
-    install_dependencies(lambda_dir, build_dir)
-
-    print(f"📦 Creating ZIP file: {dist_zip}")
-    # Zip only the build_dir contents, enable Zip64 + compression
-    with ZipFile(dist_zip, "w", compression=ZIP_DEFLATED, allowZip64=True) as zipf:
-        for file in build_dir.rglob("*"):
-            if file.is_file():
-                arcname = file.relative_to(build_dir)
-                zipf.write(file, arcname=arcname)
+    # Zip only the build_dir contents
+    pkg = pkg or DEFAULT_PACKAGING
+    package(build_dir, dist_zip, prune_rules(lambda_dir), pkg)
 
+    write_stamp(dist_dir, {"build_hash": digest or build_hash(lambda_dir, layer, pkg), "zip": dist_zip.name})
     return dist_zip
 
 
-def publish_lambda(nickname: str, zip_path: Path) -> str:
+# ============================================================
+# Dependency layer
+# ============================================================
+def layer_name(nickname: str) -> str:
+    return f"{nickname}{LAYER_SUFFIX}"
+
+
+def build_layer_zip(nickname: str, pkg: dict = None) -> Path:
+    """Package the cached dependencies under python/, where the runtime puts layers on sys.path."""
+    lambda_dir = Path(f"lambdas/{nickname}").resolve()
+    deps_dir = cached_dependencies(lambda_dir)
+    layer_dir = lambda_dir / "dist" / "layer"
+    layer_zip = lambda_dir / "dist" / f"{layer_name(nickname)}.zip"
+
+    shutil.rmtree(layer_dir, ignore_errors=True)
+    shutil.copytree(deps_dir, layer_dir, ignore=shutil.ignore_patterns(".complete"))
+    return package(layer_dir, layer_zip, prune_rules(lambda_dir), pkg or DEFAULT_PACKAGING, prefix="python/")
+
+
+def ensure_layer(nickname: str, pkg: dict = None):
+    """
+    Layer version ARN holding the Lambda's requirements (None without a
+    requirements.txt). A new version is only built and published when the
+    requirements hash differs from the latest version's description.
+    """
+    req_file = Path(f"lambdas/{nickname}/requirements.txt")
+    if not req_file.exists():
+        return None
+
+    name = layer_name(nickname)
+    layer_hash = hashlib.sha256()
+    layer_hash.update(requirements_hash(req_file).encode())
+    layer_hash.update(json.dumps([pkg or DEFAULT_PACKAGING, prune_rules(req_file.parent)], sort_keys=True).encode())
+    description = f"requirements+packaging sha256:{layer_hash.hexdigest()}"
+    latest = lambda_client.list_layer_versions(LayerName=name, MaxItems=1).get("LayerVersions", [])
+    if latest and latest[0].get("Description") == description:
+        print(f"📦 Reusing layer {name} v{latest[0]['Version']}")
+        return latest[0]["LayerVersionArn"]
+
+    layer_zip = build_layer_zip(nickname, pkg)
+    print(f"🚀 Publishing layer: {name}")
+    with open(layer_zip, "rb") as f:
+        response = lambda_client.publish_layer_version(
+            LayerName=name,
+            Description=description,
+            Content={"ZipFile": f.read()},
+        )
+    return response["LayerVersionArn"]
+
+
+def has_dependency_layer(nickname: str, config: dict) -> bool:
+    marker = f":layer:{layer_name(nickname)}:"
+    return any(marker in layer["Arn"] for layer in config.get("Layers", []))
+
+
+def attach_layer(nickname: str, layer_arn: str = None, config: dict = None):
+    """
+    Point the function at `layer_arn`, replacing older versions of its
+    dependency layer; with None, detach that layer (switching back to
+    bundled dependencies). Other layers are left alone. `config` is the
+    function's current configuration, fetched if not given.
+    """
+    config = config or lambda_client.get_function_configuration(FunctionName=nickname)
+    current = [layer["Arn"] for layer in config.get("Layers", [])]
+    marker = f":layer:{layer_name(nickname)}:"
+    layers = [arn for arn in current if marker not in arn] + ([layer_arn] if layer_arn else [])
+    if layers == current:
+        return
+
+    print(f"🔗 Updating layers for {nickname}: {layers or 'none'}")
+    lambda_client.update_function_configuration(FunctionName=nickname, Layers=layers)
+    lambda_client.get_waiter("function_updated").wait(FunctionName=nickname)
+
+
+# ============================================================
+# Publish
+# ============================================================
+def function_config(nickname: str) -> dict:
+    """The function's current configuration, or None if it does not exist."""
+    try:
+        return lambda_client.get_function_configuration(FunctionName=nickname)
+    except lambda_client.exceptions.ResourceNotFoundException:
+        return None
+
+
+def published_unchanged(stamp: dict, digest: str, config: dict) -> bool:
+    """
+    True when the last build published from here has the same content hash
+    and is still the function's code (nobody deployed something else since).
+    """
+    if stamp.get("build_hash") != digest or not stamp.get("code_sha256") or config is None:
+        return False
+    if stamp.get("layer_arn") and stamp["layer_arn"] not in [l["Arn"] for l in config.get("Layers", [])]:
+        return False
+    return config["CodeSha256"] == stamp["code_sha256"]
+
+
+def publish_lambda(nickname: str, zip_path: Path, layer: bool = False, pkg: dict = None, config: dict = None) -> str:
+    # Layer first, so the published version pairs the new code with its deps.
+    # Without --layer the configuration is only touched when switching back
+    # from layer mode.
+    layer_arn = ensure_layer(nickname, pkg) if layer else None
+    if layer or config is None or has_dependency_layer(nickname, config):
+        attach_layer(nickname, layer_arn, config)
+
     print(f"🚀 Publishing Lambda: {nickname}")
     with open(zip_path, "rb") as f:
         response = lambda_client.update_function_code(
@@ -69,18 +484,70 @@ def publish_lambda(nickname: str, zip_path: Path) -> str:
             ZipFile=f.read(),
             Publish=True,
         )
+
+    dist_dir = zip_path.parent
+    stamp = read_stamp(dist_dir)
+    stamp.update(
+        code_sha256=response["CodeSha256"],
+        function_arn=response["FunctionArn"],
+        layer_arn=layer_arn,
+        published_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    )
+    write_stamp(dist_dir, stamp)
     return response["FunctionArn"]
 
 
+def unversioned_arn(arn: str) -> str:
+    # arn:aws:lambda:region:acct:function:name:version -> strip version
+    return ":".join(arn.split(":")[:7])
+
+
+def put_ssm_parameters(arns: dict):
+    """
+    Point /iac/lambda/<nickname>/runtime at each nickname's unversioned ARN,
+    skipping parameters that already hold it. Current values are re-read
+    (one batched call), so a cached value never hides a missing write.
+    """
+    resolver = default_resolver()
+    params = {nickname: runtime_param("lambda", nickname) for nickname in arns}
+    current = resolver.get_many(list(params.values()), refresh=True, missing_ok=True)
+    for nickname, arn in arns.items():
+        if current.get(params[nickname]) == {"arn": arn}:
+            continue
+        print(f"📝 Writing runtime ARN to SSM: {params[nickname]}")
+        resolver.put(params[nickname], {"arn": arn})
+
+
 def put_ssm_parameter(nickname: str, arn: str):
-    param_path = f"/iac/lambda/{nickname}/runtime"
-    print(f"📝 Writing runtime ARN to SSM: {param_path}")
-    ssm.put_parameter(
-        Name=param_path,
-        Value=json.dumps({"arn": arn}),
-        Type="String",
-        Overwrite=True,
+    put_ssm_parameters({nickname: arn})
+
+
+def add_packaging_args(parser):
+    parser.add_argument(
+        "--runtime", default=DEFAULT_PACKAGING["runtime"],
+        help="Target Lambda runtime; bytecode is compiled with the matching local interpreter (default %(default)s)",
+    )
+    parser.add_argument(
+        "--architecture", choices=sorted(MACHINES), default=DEFAULT_PACKAGING["architecture"],
+        help="Target Lambda architecture; compiled dependencies must match it (default %(default)s)",
     )
+    parser.add_argument(
+        "--optimize", type=int, choices=[0, 1, 2], default=DEFAULT_PACKAGING["optimize"],
+        help="Bytecode optimization level; 1/2 ship sourceless .pyc files (default %(default)s)",
+    )
+    parser.add_argument(
+        "--compress-level", type=int, choices=range(10), default=DEFAULT_PACKAGING["compress_level"],
+        metavar="0-9", help="ZIP deflate level (default %(default)s)",
+    )
+
+
+def packaging_from_args(args) -> dict:
+    return {
+        "runtime": args.runtime,
+        "architecture": args.architecture,
+        "optimize": args.optimize,
+        "compress_level": args.compress_level,
+    }
 
 
 def main():
@@ -88,13 +555,32 @@ def main():
     parser.add_argument(
         "nickname", help="Lambda nickname (directory name under lambdas/)"
     )
+    parser.add_argument("--force", action="store_true", help="Rebuild and publish even if nothing changed")
+    parser.add_argument(
+        "--layer", action="store_true", help="Ship requirements.txt as a separate layer; the zip holds only .py files"
+    )
+    add_packaging_args(parser)
     args = parser.parse_args()
+    pkg = packaging_from_args(args)
 
-    zip_path = build_lambda(args.nickname)
-    versioned_arn = publish_lambda(args.nickname, zip_path)
-    # arn:aws:lambda:region:acct:function:name:version -> strip version
-    unversioned_arn = ":".join(versioned_arn.split(":")[:7])
-    put_ssm_parameter(args.nickname, unversioned_arn)
+    lambda_dir = Path(f"lambdas/{args.nickname}").resolve()
+    digest = build_hash(lambda_dir, args.layer, pkg)
+    stamp = read_stamp(lambda_dir / "dist")
+    config = function_config(args.nickname)
+
+    if not args.force and published_unchanged(stamp, digest, config):
+        print(f"✅ Lambda {args.nickname} unchanged ({digest[:12]}) → {stamp['function_arn']}")
+        # A run that published but failed before writing the parameter left it stale
+        put_ssm_parameter(args.nickname, unversioned_arn(stamp["function_arn"]))
+        return
+
+    zip_path = lambda_dir / "dist" / f"{args.nickname}.zip"
+    if args.force or stamp.get("build_hash") != digest or not zip_path.exists():
+        zip_path = build_lambda(args.nickname, digest, args.layer, pkg)
+    else:
+        print(f"📦 Reusing built ZIP file: {zip_path}")
+    versioned_arn = publish_lambda(args.nickname, zip_path, args.layer, pkg, config)
+    put_ssm_parameter(args.nickname, unversioned_arn(versioned_arn))
 
     print(f"✅ Lambda {args.nickname} deployed → {versioned_arn}")
 
@@ -2,75 +2,192 @@
 
 import argparse
 import boto3
-import json
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
-ssm = boto3.client("ssm")
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+
+from compile_openapi import SpecError, compile_spec  # noqa: E402
+from ssm_runtime import ParameterNotFound, default_resolver, runtime_param  # noqa: E402
+
 s3 = boto3.client("s3")
 
+HASH_METADATA = "sha256"  # S3 user metadata holding the compiled content hash
+SOURCE_HASH_METADATA = "source-sha256"  # ... and the hash of the YAML it was compiled from
+
 
 def get_ssm_parameter(name):
     try:
-        response = ssm.get_parameter(Name=name)
-        return json.loads(response["Parameter"]["Value"])
-    except ssm.exceptions.ParameterNotFound:
+        return default_resolver().get(name)
+    except ParameterNotFound:
         raise RuntimeError(f"SSM parameter not found: {name}")
 
 
 def put_ssm_parameter(name, value, dry_run=False):
-    if dry_run:
-        print(f"[dry-run] Would put SSM parameter: {name} = {json.dumps(value)}")
-        return
-    ssm.put_parameter(
-        Name=name,
-        Value=json.dumps(value),
-        Type="String",
-        Overwrite=True,
-        Tier="Standard"
-    )
+    default_resolver().put(name, value, dry_run=dry_run)
 
 
-def upload_openapi(bucket, key, local_path, dry_run=False):
+def published_hashes(bucket, key):
+    """(compiled, source) hashes recorded on the S3 object; (None, None) if it does not exist yet."""
+    try:
+        head = s3.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None, None
+        raise
+    metadata = head.get("Metadata", {})
+    return metadata.get(HASH_METADATA), metadata.get(SOURCE_HASH_METADATA)
+
+
+def upload_openapi(bucket, key, local_path, metadata=None, dry_run=False):
     if dry_run:
         print(f"[dry-run] Would upload {local_path} to s3://{bucket}/{key}")
         return
     print(f"📤 Uploading {local_path} to s3://{bucket}/{key}")
-    s3.upload_file(str(local_path), bucket, key)
+    content_type = "application/yaml" if Path(local_path).suffix in (".yaml", ".yml") else "application/json"
+    extra = {"ContentType": content_type}
+    if metadata:
+        extra["Metadata"] = metadata
+    s3.upload_file(str(local_path), bucket, key, ExtraArgs=extra)
+
+
+# ============================================================
+# Compile + change-aware publish
+# ============================================================
+def publish_compiled(nickname, compiled, bucket_name, current_pointer, dry_run=False):
+    """
+    Upload one spec (the YAML source, its compiled JSON and route table)
+    under `nickname` unless the S3 copy already carries the same content
+    hashes, and write the SSM pointer unless it already points there.
+    Returns what was done.
+    """
+    digest = compiled["sha256"]
+    source_digest = hashlib.sha256(Path(compiled["source"]).read_bytes()).hexdigest()
+    source_key = f"openapi/{nickname}/openapi.yaml"
+    spec_key = f"openapi/{nickname}/openapi.json"
+    routes_key = f"openapi/{nickname}/routes.json"
+    pointer = {
+        "source": f"s3://{bucket_name}/{source_key}",
+        "compiled": f"s3://{bucket_name}/{spec_key}",
+        "routes": f"s3://{bucket_name}/{routes_key}",
+        "sha256": digest,
+    }
+
+    uploaded = published_hashes(bucket_name, spec_key) != (digest, source_digest)
+    if uploaded:
+        # The compiled spec goes last and carries both hashes, so a failed run is retried
+        upload_openapi(bucket_name, source_key, compiled["source"], dry_run=dry_run)
+        upload_openapi(bucket_name, routes_key, compiled["routes"], dry_run=dry_run)
+        upload_openapi(
+            bucket_name, spec_key, compiled["spec"],
+            {HASH_METADATA: digest, SOURCE_HASH_METADATA: source_digest}, dry_run=dry_run,
+        )
+
+    param = runtime_param("openapi", nickname)
+    pointed = current_pointer != pointer
+    if pointed:
+        put_ssm_parameter(param, pointer, dry_run=dry_run)
+
+    return {"nickname": nickname, "param": param, "source": pointer["source"], "sha256": digest,
+            "uploaded": uploaded, "pointer_updated": pointed}
+
+
+def publish_all(targets, dry_run=False, workers=8):
+    """
+    Compile and publish (nickname, bucket_nickname, spec_file) targets
+    concurrently. Bucket names and current pointers for every target are
+    read in one batched SSM lookup. Returns (results, errors).
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        compiled = list(pool.map(lambda t: _compile(t[2]), targets))
+    errors = [c for c in compiled if isinstance(c, Exception)]
+    ready = [(t, c) for t, c in zip(targets, compiled) if not isinstance(c, Exception)]
+    if not ready:
+        return [], errors
+
+    bucket_params = {t[0]: runtime_param("s3-bucket", t[1] or t[0]) for t, _ in ready}
+    pointer_params = {t[0]: runtime_param("openapi", t[0]) for t, _ in ready}
+    resolver = default_resolver()
+    current = resolver.get_many(list(bucket_params.values()) + list(pointer_params.values()), missing_ok=True)
+    missing = sorted(p for p in bucket_params.values() if p not in current)
+    if missing:
+        raise RuntimeError(f"SSM parameter not found: {', '.join(missing)}")
+
+    def publish(item):
+        (nickname, _, _), c = item
+        bucket_name = current[bucket_params[nickname]]["bucket_name"]
+        return publish_compiled(nickname, c, bucket_name, current.get(pointer_params[nickname]), dry_run)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(publish, ready))
+    return results, errors
+
+
+def _compile(spec_file):
+    try:
+        return compile_spec(spec_file)
+    except (SpecError, OSError) as e:
+        return e
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Deploy an OpenAPI spec to S3 and update the runtime pointer.")
-    parser.add_argument("openapi_nickname", help="OpenAPI nickname (e.g. demo-api)")
-    parser.add_argument("--bucket-nickname", help="S3 bucket nickname (default: same as OpenAPI nickname)")
-    parser.add_argument("--file", help="Path to openapi.yaml (default: openapi/<nickname>/openapi.yaml)")
-    parser.add_argument("--region", default="us-east-1")
-    parser.add_argument("--dry-run", action="store_true", help="Show what would happen without making changes")
+def publish_openapi(openapi_nickname, bucket_nickname=None, openapi_file=None, dry_run=False):
+    """Compile and publish a single spec; raises on an invalid spec."""
+    openapi_file = Path(openapi_file or f"openapi/{openapi_nickname}/openapi.yaml")
+    if not openapi_file.exists():
+        raise FileNotFoundError(f"❌ OpenAPI file not found: {openapi_file}")
 
-    args = parser.parse_args()
+    results, errors = publish_all([(openapi_nickname, bucket_nickname, openapi_file)], dry_run=dry_run)
+    if errors:
+        raise errors[0]
+    return results[0]
 
-    openapi_nickname = args.openapi_nickname
-    bucket_nickname = args.bucket_nickname or openapi_nickname
-    openapi_file = Path(args.file or f"openapi/{openapi_nickname}/openapi.yaml")
 
-    if not openapi_file.exists():
-        raise FileNotFoundError(f"❌ OpenAPI file not found: {openapi_file}")
+def print_result(result):
+    if not result["uploaded"] and not result["pointer_updated"]:
+        print(f"✅ {result['nickname']} unchanged ({result['sha256'][:12]}) → {result['source']}")
+        return
+    print(f"✅ Published OpenAPI to {result['param']}")
+    print(f"   → {result['source']}")
 
-    # Step 1: Get bucket from runtime param
-    bucket_param_path = f"/iac/s3-bucket/{bucket_nickname}/runtime"
-    bucket_data = get_ssm_parameter(bucket_param_path)
-    bucket_name = bucket_data["bucket_name"]
 
-    key = f"openapi/{openapi_nickname}/openapi.yaml"
-    upload_openapi(bucket_name, key, openapi_file, dry_run=args.dry_run)
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile OpenAPI specs and publish the changed ones to S3 with their runtime pointers."
+    )
+    parser.add_argument(
+        "openapi_nicknames", nargs="*", metavar="openapi_nickname",
+        help="OpenAPI nicknames, e.g. demo-api (default: every openapi/*/openapi.yaml)",
+    )
+    parser.add_argument("--bucket-nickname", help="S3 bucket nickname (default: same as each OpenAPI nickname)")
+    parser.add_argument("--file", help="Path to openapi.yaml (single nickname only)")
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would happen without making changes")
 
-    # Step 2: Write runtime param
-    runtime_param_path = f"/iac/openapi/{openapi_nickname}/runtime"
-    openapi_ref = f"s3://{bucket_name}/{key}"
-    put_ssm_parameter(runtime_param_path, {"source": openapi_ref}, dry_run=args.dry_run)
+    args = parser.parse_args()
 
-    print(f"✅ Published OpenAPI to {runtime_param_path}")
-    print(f"   → {openapi_ref}")
+    nicknames = args.openapi_nicknames or sorted(p.parent.name for p in Path("openapi").glob("*/openapi.yaml"))
+    if args.file and len(nicknames) != 1:
+        parser.error("--file needs exactly one openapi_nickname")
+    targets = [
+        (n, args.bucket_nickname, Path(args.file or f"openapi/{n}/openapi.yaml"))
+        for n in nicknames
+    ]
+    for _, _, spec_file in targets:
+        if not spec_file.exists():
+            raise FileNotFoundError(f"❌ OpenAPI file not found: {spec_file}")
+
+    results, errors = publish_all(targets, dry_run=args.dry_run)
+    for result in results:
+        print_result(result)
+    for e in errors:
+        print(f"❌ {e}")
+    if errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
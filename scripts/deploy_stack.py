@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import yaml
+
+import deploy_lambda
+import deploy_openapi
+from compile_openapi import operations
+
+
+def spec_lambdas(spec_file: Path):
+    """Every x-lambda-nickname referenced by the spec, in first-seen order."""
+    spec = yaml.safe_load(spec_file.read_text())
+    nicknames = {}
+    for path, method, _, op in operations(spec):
+        if op.get("x-lambda-nickname"):
+            nicknames.setdefault(op["x-lambda-nickname"], []).append(f"{method.upper()} {path}")
+    return nicknames
+
+
+# ============================================================
+# Phases
+# ============================================================
+def check_lambda(nickname, force, layer, pkg):
+    """(nickname, digest, stamp, config, unchanged) using deploy_lambda's build hash."""
+    lambda_dir = Path(f"lambdas/{nickname}").resolve()
+    digest = deploy_lambda.build_hash(lambda_dir, layer, pkg)
+    stamp = deploy_lambda.read_stamp(lambda_dir / "dist")
+    config = deploy_lambda.function_config(nickname)
+    unchanged = not force and deploy_lambda.published_unchanged(stamp, digest, config)
+    return nickname, digest, stamp, config, unchanged
+
+
+def build_lambda(nickname, digest, stamp, force, layer, pkg):
+    """Process-pool worker: build (or reuse) the zip; returns (nickname, zip, seconds, reused)."""
+    start = time.perf_counter()
+    zip_path = Path(f"lambdas/{nickname}/dist/{nickname}.zip").resolve()
+    reused = not force and stamp.get("build_hash") == digest and zip_path.exists()
+    if not reused:
+        zip_path = deploy_lambda.build_lambda(nickname, digest, layer, pkg)
+    return nickname, zip_path, time.perf_counter() - start, reused
+
+
+def publish_lambda(nickname, zip_path, layer, pkg, config):
+    start = time.perf_counter()
+    arn = deploy_lambda.publish_lambda(nickname, zip_path, layer, pkg, config)
+    return nickname, arn, time.perf_counter() - start
+
+
+def deploy_lambdas(nicknames, build_workers, publish_workers, force=False, dry_run=False, layer=False, pkg=None):
+    """
+    Check every Lambda's build hash, build the changed ones in a process pool
+    and publish each as soon as its build finishes, through a bounded thread
+    pool. Returns a per-nickname report.
+    """
+    report = {n: {"status": "unchanged", "build_s": 0.0, "publish_s": 0.0} for n in nicknames}
+
+    with ThreadPoolExecutor(max_workers=publish_workers) as pool:
+        checks = list(pool.map(lambda n: check_lambda(n, force, layer, pkg), nicknames))
+    pending = [(n, digest, stamp) for n, digest, stamp, _, unchanged in checks if not unchanged]
+    configs = {n: config for n, _, _, config, _ in checks}
+    for n, _, stamp, _, unchanged in checks:
+        if unchanged:
+            report[n]["arn"] = stamp["function_arn"]
+
+    if dry_run:
+        for n, _, _ in pending:
+            report[n]["status"] = "would deploy"
+        return report
+    if not pending:
+        return report
+
+    with ProcessPoolExecutor(max_workers=min(build_workers, len(pending))) as builders, \
+            ThreadPoolExecutor(max_workers=publish_workers) as publishers:
+        builds = [builders.submit(build_lambda, n, digest, stamp, force, layer, pkg) for n, digest, stamp in pending]
+        publishes = []
+        for future in as_completed(builds):
+            nickname, zip_path, build_s, reused = future.result()
+            report[nickname].update(status="reused zip" if reused else "built", build_s=build_s)
+            publishes.append(publishers.submit(publish_lambda, nickname, zip_path, layer, pkg, configs[nickname]))
+        for future in as_completed(publishes):
+            nickname, arn, publish_s = future.result()
+            report[nickname].update(status=f"{report[nickname]['status']} + published", publish_s=publish_s, arn=arn)
+
+    return report
+
+
+def update_runtime_params(report):
+    """
+    Write /iac/lambda/<nickname>/runtime for every Lambda with a known ARN,
+    unchanged ones included: a run that published and then crashed left
+    theirs unwritten. Parameters that already match are skipped.
+    """
+    deploy_lambda.put_ssm_parameters(
+        {nickname: deploy_lambda.unversioned_arn(entry["arn"]) for nickname, entry in report.items() if entry.get("arn")}
+    )
+
+
+def print_report(report, wall_s):
+    width = max(len(n) for n in report)
+    print(f"\n{'lambda'.ljust(width)}  {'build s':>8}  {'publish s':>9}  status")
+    for nickname, entry in report.items():
+        print(f"{nickname.ljust(width)}  {entry['build_s']:8.2f}  {entry['publish_s']:9.2f}  {entry['status']}")
+    print(f"\n⏱  Total {wall_s:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deploy every Lambda referenced by an OpenAPI spec in parallel, then publish the spec."
+    )
+    parser.add_argument("openapi_nickname", help="OpenAPI nickname (e.g. demo-api)")
+    parser.add_argument("--bucket-nickname", help="S3 bucket nickname (default: same as OpenAPI nickname)")
+    parser.add_argument("--file", help="Path to openapi.yaml (default: openapi/<nickname>/openapi.yaml)")
+    parser.add_argument("--only", action="append", metavar="NICKNAME", help="Limit to these Lambdas (repeatable)")
+    parser.add_argument("--build-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--publish-workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Rebuild and publish even if nothing changed")
+    parser.add_argument("--layer", action="store_true", help="Ship each Lambda's requirements as a layer")
+    parser.add_argument("--skip-openapi", action="store_true", help="Deploy the Lambdas only")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would happen without making changes")
+    deploy_lambda.add_packaging_args(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    spec_file = Path(args.file or f"openapi/{args.openapi_nickname}/openapi.yaml")
+    if not spec_file.exists():
+        raise FileNotFoundError(f"❌ OpenAPI file not found: {spec_file}")
+
+    referenced = spec_lambdas(spec_file)
+    nicknames = [n for n in referenced if not args.only or n in args.only]
+    missing = [n for n in nicknames if not Path(f"lambdas/{n}").is_dir()]
+    if missing:
+        raise FileNotFoundError(f"❌ No lambdas/<nickname> directory for: {', '.join(missing)}")
+
+    print(f"🔎 {spec_file} references {len(referenced)} Lambdas: {', '.join(referenced)}")
+    report = deploy_lambdas(
+        nicknames, args.build_workers, args.publish_workers, args.force, args.dry_run, args.layer,
+        deploy_lambda.packaging_from_args(args),
+    )
+    if not args.dry_run:
+        update_runtime_params(report)
+
+    if not args.skip_openapi:
+        result = deploy_openapi.publish_openapi(
+            args.openapi_nickname, args.bucket_nickname, spec_file, dry_run=args.dry_run
+        )
+        deploy_openapi.print_result(result)
+
+    print_report(report, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import base64
+import importlib.util
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from compile_openapi import compile_spec, operations, resolve_refs
+
+ROOT = Path(__file__).resolve().parent.parent
+SHARED_DIR = ROOT / "shared"
+DEFAULT_SPEC = ROOT / "openapi" / "demo-api" / "openapi.yaml"
+
+API_GATEWAY_TIMEOUT_S = 29  # REST API integration timeout
+
+
+# ============================================================
+# Handlers
+# ============================================================
+class Context:
+    """The parts of the Lambda context object the handlers use."""
+
+    def __init__(self, nickname, timeout_s):
+        self.function_name = nickname
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{nickname}"
+        self.memory_limit_in_mb = 128
+        self.aws_request_id = uuid.uuid4().hex
+        self._deadline = time.monotonic() + timeout_s
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def load_handler(nickname, handler_spec="main.handler"):
+    """
+    Import lambdas/<nickname>/<module>.py under a unique module name (every
+    Lambda's module is called main) with its directory on sys.path for its
+    sibling imports, as the Lambda runtime would.
+    """
+    lambda_dir = ROOT / "lambdas" / nickname
+    module_file, func_name = handler_spec.rsplit(".", 1)
+    for path in (str(SHARED_DIR), str(lambda_dir)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(f"lambda_{nickname.replace('-', '_')}", lambda_dir / f"{module_file}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, func_name)
+
+
+class Function:
+    """A handler plus its concurrency limit: a bounded thread pool, optionally throttling when full."""
+
+    def __init__(self, nickname, handler, concurrency, throttle, timeout_s):
+        self.nickname = nickname
+        self.handler = handler
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=nickname)
+        self.slots = asyncio.BoundedSemaphore(concurrency)
+        self.throttle = throttle
+        self.timeout_s = timeout_s
+
+    def invoke(self, event):
+        return self.handler(event, Context(self.nickname, self.timeout_s))
+
+    async def __call__(self, event):
+        """Proxy response dict, or None when throttled. Queueing counts against the timeout."""
+        if self.throttle and self.slots.locked():
+            return None
+        return await asyncio.wait_for(self._run(event), self.timeout_s)
+
+    async def _run(self, event):
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        # The slot is held until the handler thread finishes, even if the request timed out
+        future = self.pool.submit(self.invoke, event)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.slots.release))
+        return await asyncio.wrap_future(future)
+
+
+# ============================================================
+# Proxy events
+# ============================================================
+def proxy_event(route, method, target, headers, body, match):
+    """A REST API (v1) Lambda proxy integration event."""
+    url = urlsplit(target)
+    query = parse_qs(url.query, keep_blank_values=True)
+    multi_headers = defaultdict(list)
+    for name, value in headers:
+        multi_headers[name].append(value)
+    try:
+        text, is_b64 = body.decode(), False
+    except UnicodeDecodeError:
+        text, is_b64 = base64.b64encode(body).decode(), True
+
+    return {
+        "resource": route["path"],
+        "path": url.path,
+        "httpMethod": method,
+        "headers": {k: v[-1] for k, v in multi_headers.items()} or None,
+        "multiValueHeaders": dict(multi_headers) or None,
+        "queryStringParameters": {k: v[-1] for k, v in query.items()} or None,
+        "multiValueQueryStringParameters": query or None,
+        "pathParameters": match.groupdict() or None,
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": route["path"],
+            "httpMethod": method,
+            "path": url.path,
+            "stage": "local",
+            "requestId": uuid.uuid4().hex,
+            "requestTimeEpoch": int(time.time() * 1000),
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": text if body else None,
+        "isBase64Encoded": is_b64,
+    }
+
+
+def gateway_error(status, message):
+    return {"statusCode": status, "headers": {"Content-Type": "application/json"}, "body": json.dumps({"message": message})}
+
+
+# ============================================================
+# Server
+# ============================================================
+class Gateway:
+    def __init__(self, spec_file, concurrency=10, overrides=None, throttle=False, timeout_s=API_GATEWAY_TIMEOUT_S):
+        # Compiled once: the routes, and the spec openapi_runtime validates against
+        compiled = compile_spec(spec_file)
+        os.environ.setdefault("OPENAPI_SPEC", str(compiled["spec"]))
+        routes = json.loads(compiled["routes"].read_text())
+        self.routes = [dict(r, regex=re.compile(r["pattern"])) for r in routes]
+        self.functions = {}
+        for nickname in dict.fromkeys(r["lambda"] for r in self.routes):
+            limit = (overrides or {}).get(nickname, concurrency)
+            self.functions[nickname] = Function(nickname, load_handler(nickname), limit, throttle, timeout_s)
+
+    def match(self, method, path):
+        """(route, match) for the request, or (None, allowed) where allowed lists methods on a matching path."""
+        allowed = []
+        for route in self.routes:
+            m = route["regex"].match(path)
+            if m:
+                if route["method"] == method:
+                    return route, m
+                allowed.append(route["method"])
+        return None, allowed
+
+    async def dispatch(self, method, target, headers, body):
+        route, match = self.match(method, urlsplit(target).path)
+        if route is None:
+            if match:
+                return gateway_error(405, "Method Not Allowed")
+            return gateway_error(404, "Missing Authentication Token")  # what API Gateway says for unknown routes
+
+        event = proxy_event(route, method, target, headers, body, match)
+        try:
+            response = await self.functions[route["lambda"]](event)
+        except asyncio.TimeoutError:
+            return gateway_error(504, "Endpoint request timed out")
+        except Exception as e:
+            print(f"❌ {route['lambda']}: {type(e).__name__}: {e}", file=sys.stderr)
+            return gateway_error(502, "Internal server error")
+        if response is None:
+            return gateway_error(429, "Too Many Requests")
+        if not isinstance(response, dict) or "statusCode" not in response:
+            return gateway_error(502, "Internal server error")
+        return response
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                response = await self.dispatch(method, target, headers, body)
+                keep_alive = version == "HTTP/1.1" and dict_get(headers, "connection", "").lower() != "close"
+                writer.write(encode_response(response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        print(f"🚀 Local API on http://{host}:{port}", flush=True)
+        for route in self.routes:
+            print(f"   {route['method']:<6} {route['path']:<40} → {route['lambda']}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def dict_get(headers, name, default=None):
+    for key, value in headers:
+        if key.lower() == name.lower():
+            return value
+    return default
+
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, version = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    headers = await read_headers(reader)
+    length = int(dict_get(headers, "content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version, headers, body
+
+
+async def read_headers(reader):
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers.append((name.strip(), value.strip()))
+
+
+def encode_response(response, keep_alive):
+    status = int(response["statusCode"])
+    body = response.get("body") or ""
+    body = base64.b64decode(body) if response.get("isBase64Encoded") else body.encode()
+    headers = dict(response.get("headers") or {})
+    for name, values in (response.get("multiValueHeaders") or {}).items():
+        headers[name] = ", ".join(values)
+    headers.setdefault("Content-Type", "application/json")
+    headers["Content-Length"] = str(len(body))
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    head = f"HTTP/1.1 {status} {reason}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+    return head.encode("latin-1") + body
+
+
+# ============================================================
+# Load generator
+# ============================================================
+def example_value(schema):
+    if "example" in schema:
+        return schema["example"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    return {"object": {}, "array": [], "string": "load-test", "integer": 1, "number": 1, "boolean": True}.get(
+        schema.get("type"), {}
+    )
+
+
+def load_targets(spec_file, selected=None):
+    """
+    Requests to replay: one per operation, filled in from the spec's
+    examples. Without --route, operations marked x-local-skip (they start
+    jobs or need external state such as MongoDB) are left out.
+    """
+    spec = resolve_refs(yaml.safe_load(Path(spec_file).read_text()))
+    targets = []
+    for path, method, item, op in operations(spec):
+        name = f"{method.upper()} {path}"
+        if selected and name not in selected:
+            continue
+        if not selected and op.get("x-local-skip"):
+            print(f"⏭️  Skipping {name}: {op['x-local-skip']}")
+            continue
+        params = list(item.get("parameters") or []) + list(op.get("parameters") or [])
+        url = path
+        for p in params:
+            if p.get("in") == "path":
+                url = url.replace("{" + p["name"] + "}", str(p.get("example", example_value(p.get("schema", {})))))
+        body = b""
+        media = ((op.get("requestBody") or {}).get("content") or {}).get("application/json")
+        if media is not None:
+            body = json.dumps(media.get("example", example_value(media.get("schema", {})))).encode()
+        targets.append({"route": name, "method": method.upper(), "url": url, "body": body})
+    return targets
+
+
+def percentile(sorted_ms, q):
+    if not sorted_ms:
+        return None
+    return sorted_ms[min(len(sorted_ms) - 1, max(0, round(q / 100 * len(sorted_ms)) - 1))]
+
+
+async def client_worker(host, port, targets, offset, deadline, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            target = targets[i % len(targets)]
+            i += 1
+            head = (
+                f"{target['method']} {target['url']} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(target['body'])}\r\n\r\n"
+            )
+            start = time.perf_counter()
+            writer.write(head.encode() + target["body"])
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = await read_headers(reader)
+            await reader.readexactly(int(dict_get(headers, "Content-Length", 0)))
+            route = stats[target["route"]]
+            route["latency_ms"].append((time.perf_counter() - start) * 1000)
+            route["status"][status] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(url, targets, connections, duration_s):
+    parts = urlsplit(url)
+    stats = defaultdict(lambda: {"latency_ms": [], "status": defaultdict(int)})
+    deadline = time.perf_counter() + duration_s
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client_worker(parts.hostname, parts.port or 80, targets, n, deadline, stats) for n in range(connections)
+    ))
+    return stats, time.perf_counter() - start
+
+
+def summarize(stats, wall_s):
+    rows = {}
+    for route, s in sorted(stats.items()):
+        lat = sorted(s["latency_ms"])
+        rows[route] = {
+            "requests": len(lat),
+            "rps": len(lat) / wall_s,
+            "p50_ms": percentile(lat, 50),
+            "p95_ms": percentile(lat, 95),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": lat[-1] if lat else None,
+            "status": dict(s["status"]),
+        }
+    return rows
+
+
+def print_summary(rows, wall_s):
+    width = max([len(r) for r in rows] + [5])
+    print(f"\n{'route'.ljust(width)}  {'reqs':>7}  {'req/s':>8}  {'p50 ms':>7}  {'p95 ms':>7}  {'p99 ms':>7}  status")
+    for route, r in rows.items():
+        codes = " ".join(f"{code}×{n}" for code, n in sorted(r["status"].items()))
+        print(
+            f"{route.ljust(width)}  {r['requests']:7d}  {r['rps']:8.1f}  "
+            f"{r['p50_ms']:7.2f}  {r['p95_ms']:7.2f}  {r['p99_ms']:7.2f}  {codes}"
+        )
+    total = sum(r["requests"] for r in rows.values())
+    print(f"\n⏱  {total} requests in {wall_s:.1f}s → {total / wall_s:.1f} req/s")
+
+
+def wait_for_port(host, port, proc, timeout_s=30):
+    import socket
+
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"local API exited with status {proc.returncode}")
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"local API did not start on {host}:{port}")
+
+
+# ============================================================
+# CLI
+# ============================================================
+def parse_overrides(items):
+    return {name: int(value) for name, _, value in (item.partition("=") for item in items or [])}
+
+
+def cmd_serve(args):
+    gateway = Gateway(args.spec, args.concurrency, parse_overrides(args.function_concurrency), args.throttle, args.timeout)
+    try:
+        asyncio.run(gateway.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_load(args):
+    targets = load_targets(args.spec, args.route)
+    if not targets:
+        sys.exit("No routes to load; pass --route 'METHOD /path'")
+
+    server = None
+    url = args.url
+    if args.spawn:
+        # Server in its own process so it does not share the client's GIL and event loop;
+        # run `serve` separately to see handler logs
+        cmd = [sys.executable, __file__, "--spec", str(args.spec), "--port", str(args.port)]
+        cmd += ["--concurrency", str(args.concurrency)]
+        for item in args.function_concurrency or []:
+            cmd += ["--function-concurrency", item]
+        if args.throttle:
+            cmd.append("--throttle")
+        cmd.append("serve")
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ, MONGO_WARM_ON_INIT="0"))
+        url = f"http://127.0.0.1:{args.port}"
+        wait_for_port("127.0.0.1", args.port, server)
+
+    try:
+        print(f"🔥 {args.connections} connections × {args.duration}s against {url}: {', '.join(t['route'] for t in targets)}")
+        stats, wall_s = asyncio.run(run_load(url, targets, args.connections, args.duration))
+    finally:
+        if server:
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=10)
+
+    rows = summarize(stats, wall_s)
+    print_summary(rows, wall_s)
+    if args.out:
+        Path(args.out).write_text(json.dumps({"url": url, "connections": args.connections, "routes": rows}, indent=2) + "\n")
+        print(f"📝 Wrote {args.out}")
+
+    errors = sum(n for r in rows.values() for code, n in r["status"].items() if code >= 500)
+    if args.fail_on_errors and errors:
+        sys.exit(f"❌ {errors} 5xx responses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local API Gateway emulator and load generator for an OpenAPI spec.")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, type=Path, help="Default: openapi/demo-api/openapi.yaml")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent invocations per function (default 10)")
+    parser.add_argument("--function-concurrency", action="append", metavar="NICKNAME=N", help="Per-function limit")
+    parser.add_argument("--throttle", action="store_true", help="Return 429 when a function is at its limit instead of queueing")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Serve the spec's routes with their in-process handlers")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--timeout", type=float, default=API_GATEWAY_TIMEOUT_S, help="Integration timeout in seconds")
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_load = sub.add_parser("load", help="Drive routes with keep-alive connections and report latency per route")
+    p_load.add_argument("--url", default="http://127.0.0.1:8080")
+    p_load.add_argument("--spawn", action="store_true", help="Start the local API in a subprocess first")
+    p_load.add_argument("--route", action="append", metavar="'METHOD /path'", help="Routes to drive (repeatable)")
+    p_load.add_argument("--connections", type=int, default=32)
+    p_load.add_argument("--duration", type=float, default=10.0, help="Seconds (default 10)")
+    p_load.add_argument("--out", help="Also write the results as JSON")
+    p_load.add_argument("--fail-on-errors", action="store_true", help="Exit 1 if any request got a 5xx")
+    p_load.set_defaults(func=cmd_load)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
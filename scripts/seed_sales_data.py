@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED_DIR = ROOT / "lambdas" / "seed-sales-data"
+SHARED_DIR = ROOT / "shared"
+
+
+def build_event(args):
+    event = {
+        "mode": args.mode,
+        "scale_factor": args.scale_factor,
+        "days_back": args.days_back,
+        "seed": args.seed,
+        "start_date": args.start_date,
+        "workers": args.workers,
+        "fanout": "process",
+        "sink": args.sink,
+        "output_dir": args.output_dir,
+        "snapshot_uri": args.snapshot_uri,
+        "mongo_profile": args.mongo_profile,
+    }
+    for item in args.set or []:
+        key, _, value = item.partition("=")
+        event[key] = value
+    return {k: v for k, v in event.items() if v is not None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the seed-sales-data Lambda locally.")
+    parser.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"), help="Default: $MONGO_URI")
+    parser.add_argument("--mode", choices=["full", "rebuild", "incremental", "restore"])
+    parser.add_argument("--scale-factor", type=float)
+    parser.add_argument("--days-back", type=int)
+    parser.add_argument("--seed", type=int, help="Reproducible generation; same seed + days = same orders")
+    parser.add_argument("--start-date", help="First day to generate (YYYY-MM-DD), seeded runs only")
+    parser.add_argument("--workers", type=int, help="Shards run in a local process pool (default 1)")
+    parser.add_argument("--sink", help="mongo, ndjson, ndjson.gz, parquet, clickhouse-rowbinary, clickhouse-native")
+    parser.add_argument("--output-dir")
+    parser.add_argument("--snapshot-uri")
+    parser.add_argument("--mongo-profile", choices=["default", "bulk"], default="bulk")
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE", help="Any other event key")
+    args = parser.parse_args()
+
+    if not args.mongo_uri:
+        sys.exit("Pass --mongo-uri or set MONGO_URI.")
+
+    # Configure the environment the Lambda would have before importing it
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ.setdefault("MONGO_WARM_ON_INIT", "0")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    sys.path[:0] = [str(SEED_DIR), str(SHARED_DIR)]
+    import main as seed
+
+    result = seed.handler(build_event(args), None)
+    print(json.dumps(result, indent=2, default=str))
+    if result.get("status") != "ok":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Request/response contracts from the OpenAPI spec, enforced in Lambda handlers.
+
+At cold start the spec is loaded once and every operation's JSON request
+body and response schemas are compiled into nested validator closures, so a
+request costs a handful of isinstance/dict checks instead of a walk over the
+schema. Handlers opt in with @endpoint.
+
+Spec lookup (first found):
+
+  $OPENAPI_SPEC            compiled spec (JSON, $refs resolved); local_api.py sets it
+  openapi.json (bundled)   this Lambda's operations, written next to this module
+                           by deploy_lambda at build time
+
+Without a spec, handlers still get JSON parsing and serialization but
+nothing is validated.
+
+- Supported keywords: type, nullable, enum, properties, required,
+  additionalProperties, items, minItems/maxItems, minLength/maxLength,
+  pattern, minimum/maximum (+ exclusiveMinimum/exclusiveMaximum),
+  format date/date-time, allOf/anyOf/oneOf. Others are ignored.
+- JSON goes through orjson when it is installed, else the stdlib C codec.
+- Response validation can be turned off with OPENAPI_VALIDATE_RESPONSES=0.
+"""
+
+import base64
+import functools
+import json
+import logging
+import os
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+BUNDLED_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openapi.json")
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PATH_PARAM = re.compile(r"\{([^{}/]+)\}")
+
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATE_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:?\d{2})?$")
+
+
+class ValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+# ============================================================
+# JSON
+# ============================================================
+if orjson is not None:
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+else:
+    loads = json.loads
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def dumps(obj) -> str:
+        return _encoder.encode(obj)
+
+
+# ============================================================
+# Schema compiler
+# ============================================================
+def _accept(value, at, errors):
+    pass
+
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+_FORMATS = {"date": DATE, "date-time": DATE_TIME}
+
+
+def compile_schema(schema):
+    """
+    A validator(value, at, errors) for an OpenAPI 3.0 schema object. It
+    appends one message per problem to `errors`, prefixed with the JSON
+    path `at`, and returns nothing.
+    """
+    if not schema:
+        return _accept
+
+    checks = []
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append(lambda v, at, errors: v in allowed or errors.append(f"{at}: must be one of {allowed}"))
+    if any(k in schema for k in ("properties", "required", "additionalProperties")):
+        checks.append(_object_check(schema))
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        checks.append(_array_check(schema))
+    if any(k in schema for k in ("minLength", "maxLength", "pattern", "format")):
+        checks.append(_string_check(schema))
+    if "minimum" in schema or "maximum" in schema:
+        checks.append(_number_check(schema))
+    for keyword in ("allOf", "anyOf", "oneOf"):
+        if schema.get(keyword):
+            checks.append(_combinator_check(keyword, [compile_schema(s) for s in schema[keyword]]))
+
+    type_name = schema.get("type")
+    is_type = _TYPES.get(type_name)
+    nullable = bool(schema.get("nullable"))
+    checks = tuple(checks)
+
+    def validate(value, at, errors):
+        if value is None and nullable:
+            return
+        if is_type is not None and not is_type(value):
+            errors.append(f"{at}: expected {type_name}")
+            return
+        for check in checks:
+            check(value, at, errors)
+
+    return validate
+
+
+def _object_check(schema):
+    properties = {name: compile_schema(s) for name, s in (schema.get("properties") or {}).items()}
+    required = tuple(schema.get("required") or ())
+    extra = schema.get("additionalProperties", True)
+    validate_extra = compile_schema(extra) if isinstance(extra, dict) else None
+
+    def check(value, at, errors):
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                errors.append(f"{at}.{name}: required")
+        for name, item in value.items():
+            validate = properties.get(name)
+            if validate is not None:
+                validate(item, f"{at}.{name}", errors)
+            elif extra is False:
+                errors.append(f"{at}.{name}: unexpected property")
+            elif validate_extra is not None:
+                validate_extra(item, f"{at}.{name}", errors)
+
+    return check
+
+
+def _array_check(schema):
+    validate_item = compile_schema(schema.get("items"))
+    lo, hi = schema.get("minItems"), schema.get("maxItems")
+
+    def check(value, at, errors):
+        if not isinstance(value, list):
+            return
+        if lo is not None and len(value) < lo:
+            errors.append(f"{at}: at least {lo} items")
+        if hi is not None and len(value) > hi:
+            errors.append(f"{at}: at most {hi} items")
+        if validate_item is not _accept:
+            for i, item in enumerate(value):
+                validate_item(item, f"{at}[{i}]", errors)
+
+    return check
+
+
+def _string_check(schema):
+    lo, hi = schema.get("minLength"), schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    fmt_name = schema.get("format")
+    fmt = _FORMATS.get(fmt_name)
+
+    def check(value, at, errors):
+        if not isinstance(value, str):
+            return
+        if lo is not None and len(value) < lo:
+            errors.append(f"{at}: shorter than {lo}")
+        if hi is not None and len(value) > hi:
+            errors.append(f"{at}: longer than {hi}")
+        if pattern is not None and not pattern.search(value):
+            errors.append(f"{at}: does not match {pattern.pattern}")
+        if fmt is not None and not fmt.match(value):
+            errors.append(f"{at}: not a {fmt_name}")
+
+    return check
+
+
+def _number_check(schema):
+    lo, hi = schema.get("minimum"), schema.get("maximum")
+    lo_open, hi_open = bool(schema.get("exclusiveMinimum")), bool(schema.get("exclusiveMaximum"))
+
+    def check(value, at, errors):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        if lo is not None and (value <= lo if lo_open else value < lo):
+            errors.append(f"{at}: below minimum {lo}")
+        if hi is not None and (value >= hi if hi_open else value > hi):
+            errors.append(f"{at}: above maximum {hi}")
+
+    return check
+
+
+def _combinator_check(keyword, validators):
+    def passes(validate, value, at):
+        errors = []
+        validate(value, at, errors)
+        return not errors
+
+    def check(value, at, errors):
+        if keyword == "allOf":
+            for validate in validators:
+                validate(value, at, errors)
+            return
+        matched = sum(passes(validate, value, at) for validate in validators)
+        if keyword == "anyOf" and not matched:
+            errors.append(f"{at}: matches none of anyOf")
+        elif keyword == "oneOf" and matched != 1:
+            errors.append(f"{at}: matches {matched} of oneOf, expected exactly 1")
+
+    return check
+
+
+# ============================================================
+# Operations
+# ============================================================
+def parse_body(event, required=False, validate=None):
+    raw = event.get("body")
+    if raw in (None, ""):
+        if required:
+            raise ValidationError(["body: required"])
+        return None
+    if event.get("isBase64Encoded"):
+        raw = base64.b64decode(raw)
+    try:
+        body = loads(raw)
+    except ValueError:
+        raise ValidationError(["body: invalid JSON"]) from None
+    if validate is not None:
+        errors = []
+        validate(body, "body", errors)
+        if errors:
+            raise ValidationError(errors)
+    return body
+
+
+def _json_schema(content):
+    media = (content or {}).get("application/json")
+    if media is None:
+        return None
+    return compile_schema(media.get("schema"))
+
+
+class Operation:
+    def __init__(self, method, path, op):
+        self.method = method
+        self.path = path
+        body = op.get("requestBody") or {}
+        self.body_required = bool(body.get("required"))
+        self.validate_request = _json_schema(body.get("content"))
+        self.responses = {str(code): _json_schema((resp or {}).get("content")) for code, resp in (op.get("responses") or {}).items()}
+
+    def parse_request(self, event):
+        """The decoded JSON body (None when absent); raises ValidationError."""
+        return parse_body(event, self.body_required, self.validate_request)
+
+    def response_errors(self, status, payload):
+        code = str(status)
+        for key in (code, code[0] + "XX", "default"):
+            if key in self.responses:
+                validate = self.responses[key]
+                if validate is None:
+                    return []
+                errors = []
+                validate(payload, "response", errors)
+                return errors
+        return [f"response: status {status} is not declared for {self.method} {self.path}"]
+
+
+class Contract:
+    """Every operation in a spec, looked up by (method, resource) from a proxy event."""
+
+    def __init__(self, spec):
+        self.info = spec.get("info") or {}
+        self.routes = {}
+        self.templated = []
+        for path, item in (spec.get("paths") or {}).items():
+            for method in HTTP_METHODS:
+                if isinstance((item or {}).get(method), dict):
+                    op = Operation(method.upper(), path, item[method])
+                    self.routes[(op.method, path)] = op
+                    if PATH_PARAM.search(path):
+                        pattern = "^" + PATH_PARAM.sub("[^/]+", re.escape(path).replace(r"\{", "{").replace(r"\}", "}")) + "$"
+                        self.templated.append((re.compile(pattern), op))
+
+    def operation(self, event):
+        method = (event.get("httpMethod") or "").upper()
+        op = self.routes.get((method, event.get("resource"))) or self.routes.get((method, event.get("path")))
+        if op is None:
+            path = event.get("path") or ""
+            op = next((o for pattern, o in self.templated if o.method == method and pattern.match(path)), None)
+        return op
+
+
+def load_contract(spec_file=None):
+    spec_file = spec_file or os.environ.get("OPENAPI_SPEC")
+    if not spec_file and os.path.exists(BUNDLED_SPEC):
+        spec_file = BUNDLED_SPEC
+    if spec_file:
+        with open(spec_file, "rb") as f:
+            return Contract(loads(f.read()))
+    log.warning("No OpenAPI spec found (set OPENAPI_SPEC or bundle openapi.json); requests are not validated")
+    return Contract({})
+
+
+@functools.lru_cache(maxsize=None)
+def contract():
+    """The process-wide contract, loaded and compiled on first use (cold start)."""
+    return load_contract()
+
+
+# ============================================================
+# Handler decorator
+# ============================================================
+def error_response(status, error, details):
+    return {"statusCode": status, "headers": {"Content-Type": "application/json"},
+            "body": dumps({"error": error, "details": details})}
+
+
+def endpoint(func):
+    """
+    Wrap func(event, context, body) -> (status, payload[, headers]) as a
+    Lambda proxy handler. The request body is parsed and checked against
+    the operation's schema (400 with the problems if it fails), and the
+    payload against the documented response for its status (500 if it
+    fails) before being serialized. A returned proxy dict passes through.
+    """
+    api = contract()  # compile at import, during init
+    check_responses = os.environ.get("OPENAPI_VALIDATE_RESPONSES", "1") == "1"
+
+    @functools.wraps(func)
+    def handler(event, context):
+        op = api.operation(event)
+        try:
+            body = op.parse_request(event) if op is not None else parse_body(event)
+        except ValidationError as e:
+            return error_response(400, "BadRequest", e.errors)
+
+        result = func(event, context, body)
+        if isinstance(result, dict):
+            return result
+        status, payload, headers = (tuple(result) + ({},))[:3]
+
+        if check_responses and op is not None:
+            errors = op.response_errors(status, payload)
+            if errors:
+                log.error("%s %s returned an undocumented response: %s", op.method, op.path, "; ".join(errors))
+                return error_response(500, "ResponseValidationError", errors)
+
+        return {"statusCode": status, "headers": {"Content-Type": "application/json", **headers}, "body": dumps(payload)}
+
+    return handler
+
@@ -0,0 +1,200 @@
+"""
+Shared resolver for IaC runtime parameters in SSM:
+
+  /<prefix>/<type>/<nickname>/runtime   (JSON values, prefix defaults to /iac)
+
+Used by the deploy scripts and by Lambdas (deploy_lambda copies shared/*.py
+into every package).
+
+- Lookups are batched: get_many() fetches up to 10 names per get_parameters call.
+- Values are cached in-process for `ttl` seconds. An expired entry is
+  refreshed on its next read; if that refresh fails, the stale value is
+  served (with a warning) rather than failing the caller.
+- An optional JSON file cache (`disk_cache`) lets short-lived CLI runs share
+  lookups for the same TTL. It holds decrypted values, so it is written
+  readable by its owner only.
+- The boto3 SSM client is only created on the first actual SSM call, so
+  callers that never miss the cache never pay for it.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "/iac"
+DEFAULT_TTL = 300  # seconds
+MAX_BATCH = 10  # get_parameters limit
+
+
+class ParameterNotFound(LookupError):
+    pass
+
+
+class InvalidRuntimeValue(ValueError):
+    pass
+
+
+def runtime_param(kind, nickname, prefix=None):
+    prefix = (prefix or os.environ.get("IAC_PREFIX", DEFAULT_PREFIX)).rstrip("/")
+    return f"{prefix}/{kind}/{nickname}/runtime"
+
+
+class RuntimeResolver:
+    def __init__(self, ttl=DEFAULT_TTL, disk_cache=None, client=None, clock=time.time):
+        self.ttl = ttl
+        self.disk_cache = Path(disk_cache).expanduser() if disk_cache else None
+        self._client = client
+        self._clock = clock
+        self._cache = {}  # name -> (fetched_at, value)
+        self._lock = threading.Lock()
+        self.calls = 0  # SSM API calls made, for diagnostics
+        if self.disk_cache:
+            self._load_disk()
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("ssm")
+        return self._client
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    def get(self, name, refresh=False):
+        return self.get_many([name], refresh=refresh)[name]
+
+    def resolve(self, kind, nickname, refresh=False):
+        return self.get(runtime_param(kind, nickname), refresh=refresh)
+
+    def get_many(self, names, refresh=False, missing_ok=False):
+        """
+        Parsed values for `names`, fetching every missing or expired one in
+        batches. With missing_ok, parameters that do not exist are left out
+        instead of raising ParameterNotFound.
+        """
+        now = self._clock()
+        found, stale = {}, {}
+        with self._lock:
+            for name in dict.fromkeys(names):
+                entry = self._cache.get(name)
+                if entry is None:
+                    continue
+                if not refresh and now - entry[0] < self.ttl:
+                    found[name] = entry[1]
+                else:
+                    stale[name] = entry[1]
+
+        missing = [n for n in dict.fromkeys(names) if n not in found]
+        if missing:
+            try:
+                fetched = self._fetch(missing, missing_ok)
+            except Exception as e:
+                if any(n not in stale for n in missing):
+                    raise
+                log.warning("SSM refresh failed, serving cached values for %s: %s", missing, e)
+                fetched = {n: stale[n] for n in missing}
+            found.update(fetched)
+        return found
+
+    def _fetch(self, names, missing_ok=False):
+        values = {}
+        invalid = []
+        for i in range(0, len(names), MAX_BATCH):
+            batch = names[i:i + MAX_BATCH]
+            self.calls += 1
+            resp = self.client.get_parameters(Names=batch, WithDecryption=True)
+            invalid.extend(resp.get("InvalidParameters", []))
+            for param in resp.get("Parameters", []):
+                try:
+                    values[param["Name"]] = json.loads(param["Value"])
+                except json.JSONDecodeError as e:
+                    raise InvalidRuntimeValue(f"Invalid runtime JSON at {param['Name']}") from e
+        if invalid and not missing_ok:
+            raise ParameterNotFound(f"SSM parameter not found: {', '.join(invalid)}")
+
+        self._store(values)
+        return values
+
+    # --------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------
+    def put(self, name, value, dry_run=False):
+        if dry_run:
+            print(f"[dry-run] Would put SSM parameter: {name} = {json.dumps(value)}")
+            return
+        self.calls += 1
+        self.client.put_parameter(
+            Name=name,
+            Value=json.dumps(value),
+            Type="String",
+            Overwrite=True,
+            Tier="Standard",
+        )
+        self._store({name: value})
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+        self._save_disk()
+
+    # --------------------------------------------------------
+    # Cache storage
+    # --------------------------------------------------------
+    def _store(self, values):
+        now = self._clock()
+        with self._lock:
+            for name, value in values.items():
+                self._cache[name] = (now, value)
+        self._save_disk()
+
+    def _load_disk(self):
+        try:
+            data = json.loads(self.disk_cache.read_text())
+        except (OSError, ValueError):
+            return
+        for name, entry in data.items():
+            self._cache[name] = (entry["fetched_at"], entry["value"])
+
+    def _save_disk(self):
+        if not self.disk_cache:
+            return
+        with self._lock:
+            data = {n: {"fetched_at": t, "value": v} for n, (t, v) in self._cache.items()}
+        try:
+            self.disk_cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.disk_cache.with_suffix(".tmp")
+            # Owner-only: values are fetched WithDecryption (SecureString credentials)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(data))
+            os.chmod(tmp, 0o600)  # an older tmp file keeps its mode through O_CREAT
+            os.replace(tmp, self.disk_cache)
+        except OSError as e:
+            log.warning("Unable to write SSM cache %s: %s", self.disk_cache, e)
+
+
+_DEFAULT = None
+
+
+def default_resolver():
+    """
+    Process-wide resolver. IAC_RUNTIME_TTL sets the TTL; IAC_RUNTIME_CACHE
+    names a disk cache file (off by default).
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = RuntimeResolver(
+            ttl=float(os.environ.get("IAC_RUNTIME_TTL", DEFAULT_TTL)),
+            disk_cache=os.environ.get("IAC_RUNTIME_CACHE") or None,
+        )
+    return _DEFAULT
@@ -0,0 +1,133 @@
+import json
+import os
+import stat
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+
+from ssm_runtime import MAX_BATCH, ParameterNotFound, RuntimeResolver, runtime_param  # noqa: E402
+
+
+class StubSSM:
+    """Counts get_parameters calls and serves values from a dict."""
+
+    def __init__(self, store):
+        self.store = store
+        self.calls = []
+        self.fail = False
+
+    def get_parameters(self, Names, WithDecryption):
+        self.calls.append(list(Names))
+        if self.fail:
+            raise RuntimeError("throttled")
+        return {
+            "Parameters": [{"Name": n, "Value": json.dumps(self.store[n])} for n in Names if n in self.store],
+            "InvalidParameters": [n for n in Names if n not in self.store],
+        }
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(n):
+    return {runtime_param("lambda", f"fn{i}"): {"arn": f"arn:{i}"} for i in range(n)}
+
+
+def test_get_many_batches_names():
+    store = make_store(3)
+    ssm = StubSSM(store)
+    resolver = RuntimeResolver(client=ssm)
+
+    assert resolver.get_many(list(store)) == store
+    assert ssm.calls == [list(store)]
+
+
+def test_get_many_splits_at_max_batch():
+    store = make_store(MAX_BATCH * 2 + 3)
+    ssm = StubSSM(store)
+    resolver = RuntimeResolver(client=ssm)
+
+    assert resolver.get_many(list(store)) == store
+    assert [len(c) for c in ssm.calls] == [MAX_BATCH, MAX_BATCH, 3]
+
+
+def test_hit_within_ttl_makes_no_call():
+    store = make_store(2)
+    name = next(iter(store))
+    ssm, clock = StubSSM(store), Clock()
+    resolver = RuntimeResolver(ttl=60, client=ssm, clock=clock)
+
+    resolver.get(name)
+    clock.now += 59
+    assert resolver.get(name) == store[name]
+    assert len(ssm.calls) == 1
+
+
+def test_expired_entry_is_refetched():
+    store = make_store(1)
+    name = next(iter(store))
+    ssm, clock = StubSSM(store), Clock()
+    resolver = RuntimeResolver(ttl=60, client=ssm, clock=clock)
+
+    resolver.get(name)
+    clock.now += 61
+    store[name] = {"arn": "arn:new"}
+    assert resolver.get(name) == {"arn": "arn:new"}
+    assert ssm.calls == [[name], [name]]
+
+
+def test_failed_refresh_serves_stale_value():
+    store = make_store(1)
+    name = next(iter(store))
+    ssm, clock = StubSSM(store), Clock()
+    resolver = RuntimeResolver(ttl=60, client=ssm, clock=clock)
+
+    resolver.get(name)
+    clock.now += 61
+    ssm.fail = True
+    assert resolver.get(name) == store[name]
+
+
+def test_missing_parameter_raises():
+    resolver = RuntimeResolver(client=StubSSM({}))
+    try:
+        resolver.get(runtime_param("lambda", "missing"))
+    except ParameterNotFound:
+        pass
+    else:
+        raise AssertionError("expected ParameterNotFound")
+    assert resolver.get_many([runtime_param("lambda", "missing")], missing_ok=True) == {}
+
+
+def test_disk_cache_is_reused(tmp_path):
+    store = make_store(1)
+    name = next(iter(store))
+    cache, clock = tmp_path / "ssm.json", Clock()
+
+    first = StubSSM(store)
+    RuntimeResolver(ttl=60, client=first, disk_cache=cache, clock=clock).get(name)
+    assert len(first.calls) == 1
+
+    second = StubSSM(store)
+    assert RuntimeResolver(ttl=60, client=second, disk_cache=cache, clock=clock).get(name) == store[name]
+    assert second.calls == []
+
+    clock.now += 61
+    third = StubSSM(store)
+    RuntimeResolver(ttl=60, client=third, disk_cache=cache, clock=clock).get(name)
+    assert third.calls == [[name]]
+
+
+def test_disk_cache_is_owner_only(tmp_path):
+    store = make_store(1)
+    cache = tmp_path / "ssm.json"
+    (tmp_path / "ssm.tmp").write_text("{}")
+    os.chmod(tmp_path / "ssm.tmp", 0o644)
+
+    RuntimeResolver(client=StubSSM(store), disk_cache=cache).get(next(iter(store)))
+    assert stat.S_IMODE(cache.stat().st_mode) == 0o600